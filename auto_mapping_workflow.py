@@ -11,14 +11,21 @@ Three-step process:
 Usage:
   python auto_mapping_workflow.py --extract    # Find all unmatched
   python auto_mapping_workflow.py --suggest    # Generate suggestions
+  python auto_mapping_workflow.py --suggest --batch   # Same suggestions, TF-IDF-seeded search
   python auto_mapping_workflow.py --import     # Batch import
 """
 
 import pandas as pd
 import sys
+import os
 from difflib import SequenceMatcher
 import re
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'recipe_pipeline'))
+from bls_loader import load_bls
+from bls_search import TfidfIndex
+from ingredient_parser import parse_many
+
 def extract_unmatched_ingredients():
     """Extract all unmatched ingredients from recipes with frequency."""
     print("=" * 80)
@@ -62,12 +69,12 @@ def extract_unmatched_ingredients():
                     except:
                         pass
         
-        # Deduplicate and count
-        from collections import Counter
-        ingredient_counts = Counter([s.lower().strip() for s in unmatched_list])
+        # Normalize (quantity, unit, modifiers removed), deduplicate and count
+        base_names = pd.Series(parse_many(unmatched_list).base_names, dtype=object)
+        ingredient_counts = base_names[base_names.str.len() > 1].value_counts()
         
-        # Sort by frequency
-        sorted_items = sorted(ingredient_counts.items(), key=lambda x: x[1], reverse=True)
+        # Sorted by frequency
+        sorted_items = list(ingredient_counts.items())
         
         print(f"\n✓ Found {len(sorted_items)} unique unmatched ingredients")
         print("\nTop 20 by frequency:")
@@ -90,10 +97,8 @@ def extract_unmatched_ingredients():
         return []
 
 
-def fuzzy_match_bls(ingredient_name, bls_df, threshold=0.6):
-    """Find best BLS matches using fuzzy string matching."""
-    ingredient_clean = ingredient_name.lower().strip()
-    
+def base_words_of(ingredient_clean):
+    """Words of a lowercased ingredient name without common modifiers."""
     # Remove common modifiers
     clean_terms = [
         'frisch', 'getrocknet', 'gemahlen', 'pulver', 'powder', 'roh', 'raw',
@@ -106,21 +111,40 @@ def fuzzy_match_bls(ingredient_name, bls_df, threshold=0.6):
         ingredient_base = ingredient_base.replace(term, ' ').strip()
     
     # Get base words (split and remove small words)
-    base_words = [w for w in ingredient_base.split() if len(w) > 2]
+    return [w for w in ingredient_base.split() if len(w) > 2]
+
+
+RATIO_WEIGHT = 0.7
+WORD_MATCH_WEIGHT = 0.3
+
+
+def fuzzy_score(ingredient_clean, base_words, bls_name):
+    """Combined score of a lowercased ingredient against a lowercased BLS name."""
+    # Calculate similarity with original name
+    ratio = SequenceMatcher(None, ingredient_clean, bls_name).ratio()
+    
+    # Also check if base words are in BLS name
+    word_match = sum(1 for word in base_words if word in bls_name) / len(base_words) if base_words else 0
+    
+    # Combined score
+    return (ratio * RATIO_WEIGHT) + (word_match * WORD_MATCH_WEIGHT)
+
+
+def fuzzy_score_bound(ratio_bound):
+    """Upper bound of fuzzy_score from an upper bound of the ratio (word match is at most 1)."""
+    return ratio_bound * RATIO_WEIGHT + WORD_MATCH_WEIGHT
+
+
+def fuzzy_match_bls(ingredient_name, bls_df, threshold=0.6):
+    """Find best BLS matches using fuzzy string matching."""
+    ingredient_clean = ingredient_name.lower().strip()
+    base_words = base_words_of(ingredient_clean)
     
     best_matches = []
     
     for idx, row in bls_df.iterrows():
         bls_name = row['Lebensmittelbezeichnung'].lower()
-        
-        # Calculate similarity with original name
-        ratio = SequenceMatcher(None, ingredient_clean, bls_name).ratio()
-        
-        # Also check if base words are in BLS name
-        word_match = sum(1 for word in base_words if word in bls_name) / len(base_words) if base_words else 0
-        
-        # Combined score
-        score = (ratio * 0.7) + (word_match * 0.3)
+        score = fuzzy_score(ingredient_clean, base_words, bls_name)
         
         if score > threshold:
             best_matches.append({
@@ -134,7 +158,35 @@ def fuzzy_match_bls(ingredient_name, bls_df, threshold=0.6):
     return best_matches[:3]  # Return top 3
 
 
-def generate_suggestions():
+def fuzzy_match_bls_batch(ingredient_names, bls_df, threshold=0.6):
+    """
+    fuzzy_match_bls for many ingredients at once.
+
+    One TF-IDF pass (bls_search.TfidfIndex) plus the trigram shortlist seed
+    the search for all ingredients; other BLS names are only scored while
+    fuzzy_score_bound can still reach the top 3, so the result equals
+    fuzzy_match_bls.
+    """
+    bls_tfidf = TfidfIndex(bls_df['Lebensmittelbezeichnung'])
+    codes = {}
+    for name, code in zip(bls_df['Lebensmittelbezeichnung'], bls_df.get('Code', [''] * len(bls_df))):
+        codes.setdefault(name, code)
+
+    base_words = {}
+
+    def score(ingredient_clean, bls_name):
+        if ingredient_clean not in base_words:
+            base_words[ingredient_clean] = base_words_of(ingredient_clean)
+        return fuzzy_score(ingredient_clean, base_words[ingredient_clean], bls_name)
+
+    return [
+        [{'score': s, 'bls_name': name, 'bls_code': codes.get(name, '')} for s, name in matches]
+        for matches in bls_tfidf.search_batch(ingredient_names, threshold=threshold, k=3,
+                                               score=score, bound=fuzzy_score_bound)
+    ]
+
+
+def generate_suggestions(batch=False):
     """Generate BLS suggestions for unmatched ingredients."""
     print("\n" + "=" * 80)
     print("STEP 2: GENERATE BLS SUGGESTIONS")
@@ -146,7 +198,7 @@ def generate_suggestions():
         
         # Load BLS database
         print("\nLoading BLS database...")
-        bls_df = pd.read_csv('BLS_4_0_Daten_2025_DE.csv', low_memory=False)
+        bls_df = load_bls('BLS_4_0_Daten_2025_DE.csv', columns=['Code'])
         bls_df = bls_df[['Code', 'Lebensmittelbezeichnung']].drop_duplicates()
         print(f"✓ Loaded {len(bls_df)} BLS entries")
         
@@ -157,6 +209,11 @@ def generate_suggestions():
         suggestions = []
         
         print(f"\nGenerating suggestions for {len(unmatched)} ingredients...")
+        if batch:
+            # Score all not yet mapped ingredients in one TF-IDF pass
+            pending = [name for name in unmatched['ingredient_name'] if name.lower() not in existing_ingredients]
+            batch_matches = dict(zip(pending, fuzzy_match_bls_batch(pending, bls_df)))
+        
         for idx, row in unmatched.iterrows():
             ingredient = row['ingredient_name']
             
@@ -165,7 +222,10 @@ def generate_suggestions():
                 continue
             
             # Find matches
-            matches = fuzzy_match_bls(ingredient, bls_df)
+            if batch:
+                matches = batch_matches[ingredient]
+            else:
+                matches = fuzzy_match_bls(ingredient, bls_df)
             
             if matches:
                 for i, match in enumerate(matches, 1):
@@ -253,16 +313,17 @@ def main():
         sys.exit(1)
     
     command = sys.argv[1]
+    batch = '--batch' in sys.argv[2:]
     
     if command == '--extract':
         extract_unmatched_ingredients()
     elif command == '--suggest':
-        generate_suggestions()
+        generate_suggestions(batch=batch)
     elif command == '--import':
         bulk_import_suggestions()
     elif command == '--all':
         extract_unmatched_ingredients()
-        generate_suggestions()
+        generate_suggestions(batch=batch)
         bulk_import_suggestions()
     else:
         print(__doc__)
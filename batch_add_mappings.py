@@ -11,11 +11,14 @@ import pandas as pd
 import sys
 import os
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'recipe_pipeline'))
+from bls_loader import load_bls_foods
+
 # Load BLS database for validation
 print("Loading BLS database...")
 try:
-    bls_df = pd.read_csv('BLS_4_0_Daten_2025_DE.csv', low_memory=False)
-    print(f"✓ Loaded {len(bls_df)} BLS entries\n")
+    bls_foods = load_bls_foods('BLS_4_0_Daten_2025_DE.csv', columns=[])
+    print(f"✓ Loaded {len(bls_foods)} BLS entries\n")
 except FileNotFoundError:
     print("Error: BLS_4_0_Daten_2025_DE.csv not found")
     sys.exit(1)
@@ -61,9 +64,7 @@ for idx, row in suggested_df.iterrows():
         continue
 
     # Validate BLS entry exists
-    bls_match = bls_df[bls_df['Lebensmittelbezeichnung'] == bls_entry]
-
-    if len(bls_match) == 0:
+    if not bls_foods.has_food(bls_entry):
         print(f"✗ FAIL: '{ingredient_name}' → '{bls_entry}'")
         print(f"   BLS entry not found in database")
         failed += 1
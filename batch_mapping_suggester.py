@@ -14,13 +14,18 @@ Workflow:
 
 Usage:
   python batch_mapping_suggester.py
+  python batch_mapping_suggester.py --batch   # all ingredients in one TF-IDF pass, same matches as the default search
 """
 
 import pandas as pd
 import sys
-from difflib import SequenceMatcher
+import os
 from collections import Counter
-from ingredient_parser import normalize_ingredient
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'recipe_pipeline'))
+from bls_loader import load_bls
+from bls_search import TfidfIndex, TrigramIndex
+from ingredient_parser import parse_many
 
 def extract_unmatched_from_audit_trail():
     """Extract unmatched ingredients from recipe audit trails."""
@@ -49,8 +54,8 @@ def extract_unmatched_from_audit_trail():
         # Normalize and deduplicate
         print("\nCleaning and deduplicating...")
         normalized = {}
-        for raw in unmatched_list:
-            clean = normalize_ingredient(raw)
+        # Each distinct raw string is parsed once
+        for raw, clean in zip(unmatched_list, parse_many(unmatched_list).base_names):
             if clean and len(clean) > 1:  # Skip empty/single-char
                 if clean not in normalized:
                     normalized[clean] = {
@@ -88,34 +93,23 @@ def extract_unmatched_from_audit_trail():
         return []
 
 
-def find_bls_candidates(ingredient_name, bls_df, threshold=0.5):
-    """Find best BLS matches using fuzzy matching."""
-    ingredient_lower = ingredient_name.lower().strip()
-
-    best_matches = []
-
-    for idx, row in bls_df.iterrows():
-        bls_name = row['Lebensmittelbezeichnung'].lower()
+def find_bls_candidates(ingredient_name, bls_index, threshold=0.5):
+    """Find best BLS matches using fuzzy matching (bls_search.TrigramIndex over the BLS names)."""
+    return [
+        {'score': score, 'bls_name': bls_name}
+        for score, bls_name in bls_index.search(ingredient_name, threshold=threshold, k=3)  # Top 3
+    ]
 
-        # Simple similarity ratio
-        ratio = SequenceMatcher(None, ingredient_lower, bls_name).ratio()
 
-        # Bonus for substring match
-        if ingredient_lower in bls_name:
-            ratio = min(1.0, ratio + 0.2)
+def find_bls_candidates_batch(ingredient_names, bls_tfidf, threshold=0.5):
+    """find_bls_candidates for many ingredients at once (bls_search.TfidfIndex, same results)."""
+    return [
+        [{'score': score, 'bls_name': bls_name} for score, bls_name in matches]
+        for matches in bls_tfidf.search_batch(ingredient_names, threshold=threshold, k=3)  # Top 3
+    ]
 
-        if ratio > threshold:
-            best_matches.append({
-                'score': ratio,
-                'bls_name': row['Lebensmittelbezeichnung'],
-            })
 
-    # Sort by score
-    best_matches.sort(key=lambda x: x['score'], reverse=True)
-    return best_matches[:3]  # Top 3
-
-
-def generate_suggestions(unmatched_items, limit=None):
+def generate_suggestions(unmatched_items, limit=None, batch=False):
     """Generate BLS suggestions for unmatched ingredients."""
     print("\n" + "=" * 80)
     print("STEP 2: GENERATE BLS SUGGESTIONS")
@@ -124,8 +118,12 @@ def generate_suggestions(unmatched_items, limit=None):
     try:
         # Load BLS database
         print("\nLoading BLS database...")
-        bls_df = pd.read_csv('BLS_4_0_Daten_2025_DE.csv', low_memory=False)
+        bls_df = load_bls('BLS_4_0_Daten_2025_DE.csv', columns=[])
         print(f"✓ Loaded {len(bls_df)} BLS entries")
+        if batch:
+            bls_index = TfidfIndex(bls_df['Lebensmittelbezeichnung'])
+        else:
+            bls_index = TrigramIndex(bls_df['Lebensmittelbezeichnung'])
 
         # Load existing mappings to skip already-mapped
         existing = pd.read_csv('ingredient_mappings.csv')
@@ -137,8 +135,13 @@ def generate_suggestions(unmatched_items, limit=None):
         suggestions = []
         items_to_process = unmatched_items[:limit] if limit else unmatched_items
 
+        if batch:
+            # Seed all ingredients from one sparse TF-IDF product
+            names = [ingredient for ingredient, _ in items_to_process if ingredient.lower() not in existing_names]
+            batch_matches = dict(zip(names, find_bls_candidates_batch(names, bls_index, threshold=0.4)))
+
         for i, (ingredient, data) in enumerate(items_to_process):
-            if (i + 1) % 50 == 0:
+            if not batch and (i + 1) % 50 == 0:
                 print(f"  Processed {i+1}/{len(items_to_process)}...")
 
             # Skip if already mapped
@@ -146,7 +149,10 @@ def generate_suggestions(unmatched_items, limit=None):
                 continue
 
             # Find matches
-            matches = find_bls_candidates(ingredient, bls_df, threshold=0.4)
+            if batch:
+                matches = batch_matches[ingredient]
+            else:
+                matches = find_bls_candidates(ingredient, bls_index, threshold=0.4)
 
             if matches:
                 for rank, match in enumerate(matches, 1):
@@ -213,8 +219,11 @@ def main():
         print("No unmatched ingredients found")
         sys.exit(0)
 
-    # Generate suggestions (limit to top 100 for first pass)
-    generate_suggestions(unmatched_items, limit=100)
+    # Generate suggestions (limit to top 100 for first pass; --batch: all at once)
+    if '--batch' in sys.argv:
+        generate_suggestions(unmatched_items, batch=True)
+    else:
+        generate_suggestions(unmatched_items, limit=100)
 
 
 if __name__ == '__main__':
@@ -16,14 +16,21 @@ Examples:
 
 import pandas as pd
 import sys
+import os
 import argparse
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'recipe_pipeline'))
+from bls_loader import load_bls_foods
+
+_bls_foods = None  # Loaded once on first validation
+
 def validate_bls_entry(bls_name):
     """Validate that a BLS entry exists in the database."""
+    global _bls_foods
     try:
-        bls_df = pd.read_csv('BLS_4_0_Daten_2025_DE.csv', low_memory=False, nrows=None)
-        match = bls_df[bls_df['Lebensmittelbezeichnung'] == bls_name]
-        return len(match) > 0
+        if _bls_foods is None:
+            _bls_foods = load_bls_foods('BLS_4_0_Daten_2025_DE.csv', columns=[])
+        return _bls_foods.has_food(bls_name)
     except Exception as e:
         print(f"  Warning: Could not validate BLS entry: {e}")
         return False
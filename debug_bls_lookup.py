@@ -5,9 +5,13 @@ Debug BLS Lookups
 Check what's actually in the BLS database for common ingredients
 """
 
-import pandas as pd
+import os
+import sys
 
-bls_df = pd.read_csv('BLS_4_0_Daten_2025_DE.csv', low_memory=False)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'recipe_pipeline'))
+from bls_loader import load_bls
+
+bls_df = load_bls('BLS_4_0_Daten_2025_DE.csv', columns=[])
 
 # Check for these common items
 search_terms = [
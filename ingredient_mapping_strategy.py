@@ -12,8 +12,12 @@ Usage:
 import pandas as pd
 import json
 import sys
+import os
 from collections import Counter
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'recipe_pipeline'))
+from bls_loader import load_bls
+
 # ==========================================
 # 1. LOAD DATABASES
 # ==========================================
@@ -26,7 +30,7 @@ except FileNotFoundError:
 
 print("Loading BLS database...")
 try:
-    bls_df = pd.read_csv('BLS_4_0_Daten_2025_DE.csv', low_memory=False)
+    bls_df = load_bls('BLS_4_0_Daten_2025_DE.csv', columns=[])
 except FileNotFoundError:
     print("Error: BLS_4_0_Daten_2025_DE.csv not found.")
     sys.exit(1)
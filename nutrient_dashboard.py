@@ -1,5 +1,11 @@
 import pandas as pd
 import re
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'recipe_pipeline'))
+from bls_loader import load_bls, get_nutrient_columns
+from weight_rules import resolve_weights
 
 # ==========================================
 # 1. KONFIGURATION & DATEN LADEN
@@ -8,15 +14,13 @@ FILE_NAME = 'BLS_4_0_Daten_2025_DE.csv'
 
 # Lade die Datenbank (behebt Dtype-Warnungen)
 try:
-    df = pd.read_csv(FILE_NAME, low_memory=False)
+    df = load_bls(FILE_NAME)
 except FileNotFoundError:
     print(f"Fehler: Die Datei '{FILE_NAME}' wurde nicht gefunden.")
     exit()
 
-# Nährstoffspalten identifizieren und numerisch säubern
-all_nutrient_cols = [col for col in df.columns if '[' in col]
-for col in all_nutrient_cols:
-    df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+# Nährstoffspalten identifizieren (bereits numerisch gesäubert)
+all_nutrient_cols = get_nutrient_columns(df.columns)
 
 # ==========================================
 # 2. DEINE ZUTATENLISTE
@@ -64,26 +68,17 @@ manual_map = {
     'zwiebel': 'Speisezwiebel roh'
 }
 
-def get_weight(name, qty):
-    ln = name.lower()
-    if qty >= 10: return qty
-    if 'avocado' in ln: return qty * 180
-    if 'zwiebel' in ln: return qty * 100
-    if 'tomate' in ln: return qty * 400
-    if 'kichererbsen' in ln or 'bohne' in ln or 'linse' in ln: return qty * 400
-    if 'limette' in ln: return qty * 50
-    if 'eigelb' in ln: return qty * 18
-    if 'tortilla' in ln: return qty * 40
-    return qty
-
 # ==========================================
 # 4. ANALYSE-DURCHLAUF
 # ==========================================
+matches = [re.match(r'^([\d\.]+)\s+(.*)', line) for line in raw_ingredients]
+item_names = [m.group(2).strip() if m else line.strip() for m, line in zip(matches, raw_ingredients)]
+qtys = [float(m.group(1)) if m else 1.0 for m in matches]
+# Gewichte für alle Zutaten auf einmal (Regeln aus recipe_config.py, siehe weight_rules.py)
+weights = resolve_weights(item_names, qtys, has_qty=[m is not None for m in matches]).weights
+
 results = []
-for line in raw_ingredients:
-    match = re.match(r'^([\d\.]+)\s+(.*)', line)
-    qty, item_name = (float(match.group(1)), match.group(2).strip()) if match else (1.0, line.strip())
-    weight = get_weight(item_name, qty)
+for line, item_name, weight in zip(raw_ingredients, item_names, weights.tolist()):
     
     # Matching
     matched_bls_key = None
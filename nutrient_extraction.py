@@ -1,5 +1,10 @@
 import pandas as pd
 import re
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'recipe_pipeline'))
+from bls_loader import load_bls
 
 def convert_xlsx_to_csv(input_file, output_file):
     try:
@@ -20,7 +25,7 @@ convert_xlsx_to_csv('BLS_4_0_Daten_2025_DE.xlsx', 'BLS_4_0_Daten_2025_DE.csv')
 # 1. Datei laden
 # Ersetze den Dateinamen, falls er lokal anders heißt
 FILE_NAME = 'BLS_4_0_Daten_2025_DE.csv'
-df = pd.read_csv(FILE_NAME, low_memory=False)
+df = load_bls(FILE_NAME)
 
 # 2. Relevante Nährstoffspalten definieren (Mapping)
 nutrient_map = {
@@ -36,10 +41,6 @@ nutrient_map = {
     'Calcium [mg]': 'CA Calcium [mg/100g]'
 }
 
-# Daten bereinigen (Strings in Zahlen umwandeln)
-for col in nutrient_map.values():
-    df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
-
 # 3. Deine Zutatenliste
 raw_ingredients = [
     "200 Auberginen", "2 Avocados", "15 Balsamico, dunkel", "50 Butter", 
@@ -1,5 +1,10 @@
 import pandas as pd
 import re
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'recipe_pipeline'))
+from bls_loader import load_bls, get_nutrient_columns
 
 # ==========================================
 # 1. DATEN LADEN & VORBEREITEN
@@ -7,15 +12,13 @@ import re
 FILE_NAME = 'BLS_4_0_Daten_2025_DE.csv'
 
 try:
-    df = pd.read_csv(FILE_NAME, low_memory=False)
+    df = load_bls(FILE_NAME)
 except FileNotFoundError:
     print(f"Fehler: '{FILE_NAME}' nicht gefunden.")
     exit()
 
 # Nährstoffspalten identifizieren (alle mit Einheiten in Klammern)
-nutrient_cols = [col for col in df.columns if '[' in col]
-for col in nutrient_cols:
-    df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+nutrient_cols = get_nutrient_columns(df.columns)
 
 # ==========================================
 # 2. NEUE ZUTATENLISTE
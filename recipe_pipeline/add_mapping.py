@@ -111,12 +111,12 @@ def show_categories():
 def validate_before_add(ingredient_name, bls_entry):
     """Check if mapping would be valid before adding."""
     try:
-        import pandas as pd
         from recipe_config import BLS_DATABASE
-        bls_df = pd.read_csv(BLS_DATABASE, low_memory=False)
+        from bls_loader import load_bls_foods
+        bls_foods = load_bls_foods(BLS_DATABASE, columns=[])
+        bls_df = bls_foods.df
 
-        match = bls_df[bls_df['Lebensmittelbezeichnung'] == bls_entry]
-        if len(match) == 0:
+        if not bls_foods.has_food(bls_entry):
             print(f"\n⚠️  WARNING: BLS entry not found: '{bls_entry}'")
             similar = bls_df[bls_df['Lebensmittelbezeichnung'].str.contains(bls_entry[:10], case=False, na=False)]
             if len(similar) > 0:
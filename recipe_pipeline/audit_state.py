@@ -0,0 +1,186 @@
+"""
+Audit Trail Recompute State
+===========================
+
+Remembers what recipe_add_audit_trails.py applied last time so a rerun
+after a mapping change only re-processes the recipes it can affect.
+
+Stored in data/.cache/audit_trail_state.json:
+  - the mapping table (ingredient_name → bls_entry_name) last applied, in
+    order (equal-length keys are tried in mapping order)
+  - the BLS CSV hash and the nutrient columns the totals were computed with
+  - a hash of the weight tables (weight_rules.py / recipe_config.py)
+  - per recipe (keyed by recipe_url): hash of its schema_org_json and the
+    lowercased parsed ingredient names
+
+From the per-recipe names an inverted index parsed name → recipes is
+built. A mapping key can only change the match of a parsed name that
+contains it, so the affected recipes are those with such a name, plus
+recipes whose schema_org_json is new or changed. Moving a key before or
+behind another key of the same length counts as a change of both.
+
+Usage:
+  from audit_state import load_audit_state
+  state = load_audit_state(PATH_INGREDIENT_MAPPINGS)
+  reason = state.full_pass_reason(manual_map, bls_sha256, nutrient_cols, recipes_df)
+  if reason is None:
+      positions = state.affected_positions(manual_map, recipes_df)
+"""
+
+import hashlib
+import json
+import os
+
+from ingredient_matcher import PATH_INGREDIENT_MAPPINGS, KeywordAutomaton, _cache_path, _write_cache_json
+from weight_rules import WEIGHT_TABLES_SHA1
+
+AUDIT_STATE_FILE = 'audit_trail_state.json'
+# Bump when parsing, matching or weighting changes, so stored results are recomputed
+AUDIT_STATE_VERSION = 4  # 2: shared ingredient grammar, 3: weight_rules.py, 4: pieces without amount
+
+
+def recipe_key(row):
+    """Stable recipe identity: URL, falling back to the recipe name."""
+    url = row.get('recipe_url')
+    return url if isinstance(url, str) and url else str(row.get('recipe_name'))
+
+
+def schema_hash(schema_json):
+    text = schema_json if isinstance(schema_json, str) else ''
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def reordered_mapping_keys(old_map, new_map):
+    """
+    Keys whose order relative to another key of the same length changed.
+
+    Equal-length keys are tried in mapping order (IngredientMatcher), so
+    swapping two of them can change the match of a name containing both.
+    """
+    new_rank = {key: rank for rank, key in enumerate(new_map)}
+    groups = {}
+    for key in old_map:
+        if key in new_rank:
+            groups.setdefault(len(key) if isinstance(key, str) else None, []).append(key)
+
+    reordered = set()
+    for keys in groups.values():
+        ranks = [new_rank[key] for key in keys]
+        # A key is out of order if an earlier key now comes after it, or a later one before it
+        max_before = float('-inf')
+        for key, rank in zip(keys, ranks):
+            if max_before > rank:
+                reordered.add(key)
+            max_before = max(max_before, rank)
+        min_after = float('inf')
+        for key, rank in zip(reversed(keys), reversed(ranks)):
+            if min_after < rank:
+                reordered.add(key)
+            min_after = min(min_after, rank)
+    return reordered
+
+
+def changed_mapping_keys(old_map, new_map):
+    """Keys added, removed, pointing to a different BLS entry or reordered among equal-length keys."""
+    keys = set(old_map) | set(new_map)
+    reordered = reordered_mapping_keys(old_map, new_map)
+    return sorted(key for key in keys if old_map.get(key) != new_map.get(key) or key in reordered)
+
+
+class AuditState:
+    """Last-applied mappings + per-recipe parsed names (see module docstring)."""
+
+    def __init__(self, path=None, data=None):
+        self.path = path
+        data = data or {}
+        self.version = data.get('version')
+        self.mappings = data.get('mappings', {})
+        self.bls_sha256 = data.get('bls_sha256')
+        self.nutrient_cols = data.get('nutrient_cols', [])
+        self.weight_tables_sha1 = data.get('weight_tables_sha1')
+        self.recipes = data.get('recipes', {})
+
+    def full_pass_reason(self, manual_map, bls_sha256, nutrient_cols, recipes_df):
+        """Why stored results cannot be reused (None if an incremental pass is safe)."""
+        if self.version is None:
+            return "no previous run recorded"
+        if self.version != AUDIT_STATE_VERSION:
+            return "audit trail format changed"
+        if self.bls_sha256 != bls_sha256:
+            return "BLS database changed"
+        if list(self.nutrient_cols) != list(nutrient_cols):
+            return "nutrient columns changed"
+        if self.weight_tables_sha1 != WEIGHT_TABLES_SHA1:
+            return "weight tables changed"
+        missing = [col for col in ['ingredient_audit_trail', 'match_rate_%', *nutrient_cols]
+                   if col not in recipes_df.columns]
+        if missing:
+            return f"{len(missing)} result columns missing in recipe database"
+        return None
+
+    def inverted_index(self):
+        """parsed ingredient name → set of recipe keys."""
+        index = {}
+        for key, entry in self.recipes.items():
+            for name in entry['names']:
+                index.setdefault(name, set()).add(key)
+        return index
+
+    def affected_positions(self, manual_map, recipes_df):
+        """
+        Row positions of recipes that must be re-processed.
+
+        Returns (positions, changed_keys).
+        """
+        changed = changed_mapping_keys(self.mappings, manual_map)
+        changed = [key for key in changed if isinstance(key, str)]
+
+        affected_keys = set()
+        if changed:
+            automaton = KeywordAutomaton([key.lower() for key in changed])
+            for name, keys in self.inverted_index().items():
+                if automaton.best(name) is not None:
+                    affected_keys |= keys
+
+        positions = []
+        for pos, row in enumerate(recipes_df.to_dict('records')):
+            key = recipe_key(row)
+            entry = self.recipes.get(key)
+            if key in affected_keys or entry is None or entry['schema_sha1'] != schema_hash(row.get('schema_org_json')):
+                positions.append(pos)
+        return positions, changed
+
+    def record(self, row, names):
+        """Remember the parsed names of a (re-)processed recipe."""
+        self.recipes[recipe_key(row)] = {
+            'schema_sha1': schema_hash(row.get('schema_org_json')),
+            'names': sorted({name.lower() for name in names}),
+        }
+
+    def save(self, manual_map, bls_sha256, nutrient_cols, recipes_df):
+        """Persist the applied mappings; forget recipes no longer in the database."""
+        if not self.path:
+            return
+        current = {recipe_key(row) for row in recipes_df.to_dict('records')}
+        data = {
+            'version': AUDIT_STATE_VERSION,
+            'mappings': {key: value for key, value in manual_map.items() if isinstance(key, str)},
+            'bls_sha256': bls_sha256,
+            'nutrient_cols': list(nutrient_cols),
+            'weight_tables_sha1': WEIGHT_TABLES_SHA1,
+            'recipes': {key: entry for key, entry in self.recipes.items() if key in current},
+        }
+        try:
+            _write_cache_json(self.path, data)
+        except OSError as e:
+            print(f"  Warning: could not persist audit trail state: {e}")
+
+
+def load_audit_state(mappings_path=PATH_INGREDIENT_MAPPINGS):
+    """AuditState persisted next to ingredient_mappings.csv (data/.cache/)."""
+    path = _cache_path(mappings_path, AUDIT_STATE_FILE)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return AuditState(path, json.load(f))
+    except (OSError, ValueError):
+        return AuditState(path)
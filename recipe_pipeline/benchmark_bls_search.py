@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+BLS Name Search Benchmark
+=========================
+
+Compares bls_search.TrigramIndex.search (trigram shortlist + bounded
+re-ranking) with the suggesters' old full scan (SequenceMatcher against
+every BLS food) and checks that both return the same top 3. Also times the
+batch mode (bls_search.TfidfIndex.search_batch) with both suggester scores:
+  - default score (SequenceMatcher ratio + substring bonus): must equal
+    the exact search for every ingredient
+  - auto_mapping_workflow.fuzzy_score (pruned with fuzzy_score_bound): must
+    equal the full fuzzy_score scan for every sampled ingredient
+Exit code 1 if a check fails.
+
+Ingredient names come from unmatched_ingredients_extracted.csv
+(ingredient_name column). BLS names come from the BLS CSV in data/; without
+it, synthetic names of BLS size are built from the mapping table entries.
+The full scans are run on samples only (--linear-sample, --fuzzy-sample),
+they take hundreds of ms per ingredient.
+
+Usage:
+  python benchmark_bls_search.py
+  python benchmark_bls_search.py --queries ../unmatched_ingredients_extracted.csv --linear-sample 200 --fuzzy-sample 500
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+import pandas as pd
+
+from bls_loader import NAME_COLUMN, load_bls
+from bls_search import TFIDF_CANDIDATES, TfidfIndex, TrigramIndex
+from ingredient_mapping_config import MANUAL_INGREDIENT_MAP
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+from auto_mapping_workflow import base_words_of, fuzzy_score, fuzzy_score_bound  # noqa: E402
+
+DEFAULT_QUERIES = os.path.join(ROOT_DIR, 'unmatched_ingredients_extracted.csv')
+FUZZY_THRESHOLD = 0.6  # auto_mapping_workflow.fuzzy_match_bls default
+SYNTHETIC_SUFFIXES = ['', ' roh', ' gekocht', ' Konserve', ' tiefgefroren', ', 3,5 % Fett', ' getrocknet',
+                      ' gebraten', ' ungesalzen', ' mit Fett und Salz', ' püriert', ' abgetropft']
+
+
+def synthetic_bls_names(size, rng):
+    """BLS-like food names: the mapping table entries plus variants up to `size` names."""
+    base = sorted(set(MANUAL_INGREDIENT_MAP.values()))
+    names = list(base)
+    while len(names) < size:
+        name = rng.choice(base).split(',')[0] + rng.choice(SYNTHETIC_SUFFIXES)
+        if rng.random() < 0.5:
+            name += ' ' + rng.choice(base).split()[0]
+        names.append(name)
+    return names
+
+
+def load_bls_names(size, rng):
+    try:
+        return load_bls(columns=[])[NAME_COLUMN].dropna().astype(str).tolist(), 'BLS CSV'
+    except FileNotFoundError:
+        return synthetic_bls_names(size, rng), 'synthetic (no BLS CSV found)'
+
+
+def load_queries(path):
+    if os.path.exists(path):
+        return pd.read_csv(path)['ingredient_name'].dropna().astype(str).tolist()
+    return list(MANUAL_INGREDIENT_MAP)
+
+
+def fuzzy_scan(query, names, lowered):
+    """Reference: auto_mapping_workflow.fuzzy_match_bls over every food, top 3 as (score, name)."""
+    query = query.lower().strip()
+    base_words = base_words_of(query)
+    matches = [(fuzzy_score(query, base_words, low), name) for name, low in zip(names, lowered)]
+    matches = [match for match in matches if match[0] > FUZZY_THRESHOLD]
+    matches.sort(key=lambda match: match[0], reverse=True)
+    return matches[:3]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark BLS candidate search')
+    parser.add_argument('--queries', default=DEFAULT_QUERIES, help='CSV with an "ingredient_name" column')
+    parser.add_argument('--bls-size', type=int, default=7140, help='synthetic BLS size (no BLS CSV)')
+    parser.add_argument('--threshold', type=float, default=0.4)
+    parser.add_argument('--linear-sample', type=int, default=100)
+    parser.add_argument('--fuzzy-sample', type=int, default=300, help='ingredients for the fuzzy_score check')
+    parser.add_argument('--candidates', type=int, default=TFIDF_CANDIDATES, help='TF-IDF shortlist per ingredient')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    names, source = load_bls_names(args.bls_size, rng)
+    queries = load_queries(args.queries)
+
+    print("BLS NAME SEARCH BENCHMARK")
+    print("=" * 64)
+    print(f"BLS names: {len(names)} ({source}), ingredients: {len(queries)}")
+
+    start = time.perf_counter()
+    index = TrigramIndex(names)
+    build_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = [index.search(query, threshold=args.threshold, k=3) for query in queries]
+    index_s = time.perf_counter() - start
+
+    sample = rng.sample(range(len(queries)), min(args.linear_sample, len(queries)))
+    start = time.perf_counter()
+    reference = {i: index.search_linear(queries[i], threshold=args.threshold, k=3) for i in sample}
+    linear_s = (time.perf_counter() - start) / len(sample) * len(queries)
+    mismatches = [i for i in sample if results[i] != reference[i]]
+
+    start = time.perf_counter()
+    tfidf = TfidfIndex(names)
+    tfidf_build_s = time.perf_counter() - start
+    start = time.perf_counter()
+    batch_results = tfidf.search_batch(queries, threshold=args.threshold, k=3, candidates=args.candidates)
+    batch_s = time.perf_counter() - start
+    batch_mismatches = [i for i, (a, b) in enumerate(zip(batch_results, results)) if a != b]
+
+    # Custom score: pruned with its bound, must equal the full fuzzy_score scan
+    base_words = {}
+
+    def score(query, name):
+        if query not in base_words:
+            base_words[query] = base_words_of(query)
+        return fuzzy_score(query, base_words[query], name)
+
+    sample_queries = rng.sample(queries, min(args.fuzzy_sample, len(queries)))
+    start = time.perf_counter()
+    fuzzy_results = tfidf.search_batch(sample_queries, threshold=FUZZY_THRESHOLD, k=3,
+                                       candidates=args.candidates, score=score, bound=fuzzy_score_bound)
+    fuzzy_s = time.perf_counter() - start
+    lowered = [name.lower() for name in names]
+    fuzzy_reference = [fuzzy_scan(query, names, lowered) for query in sample_queries]
+    fuzzy_mismatches = [j for j, (a, b) in enumerate(zip(fuzzy_results, fuzzy_reference)) if a != b]
+
+    print("-" * 64)
+    print(f"{'Index build':<28} {build_s:>10.2f} s")
+    print(f"{'Trigram index, all':<28} {index_s:>10.2f} s  ({index_s / len(queries) * 1000:.2f} ms/ingredient)")
+    print(f"{'Full scan, all (estimated)':<28} {linear_s:>10.2f} s  ({linear_s / len(queries) * 1000:.2f} ms/ingredient)")
+    print(f"{'Speedup (index)':<28} {linear_s / index_s:>10.1f}x")
+    print(f"{'TF-IDF build':<28} {tfidf_build_s:>10.2f} s")
+    print(f"{'Batch, default score, all':<28} {batch_s:>10.2f} s  ({batch_s / len(queries) * 1000:.2f} ms/ingredient)")
+    print(f"{'Batch, fuzzy_score, sample':<28} {fuzzy_s:>10.2f} s  ({fuzzy_s / len(sample_queries) * 1000:.2f} ms/ingredient)")
+    print("-" * 64)
+    failed = False
+    if mismatches:
+        i = mismatches[0]
+        print(f"✗ {len(mismatches)}/{len(sample)} sampled ingredients with a different top 3, e.g. '{queries[i]}':")
+        print(f"    index: {results[i]}")
+        print(f"    scan:  {reference[i]}")
+        failed = True
+    else:
+        print(f"✓ Same top 3 as the full scan on {len(sample)} sampled ingredients")
+    if batch_mismatches:
+        i = batch_mismatches[0]
+        print(f"✗ Batch mode (default score): {len(batch_mismatches)}/{len(queries)} ingredients with a different "
+              f"top 3 than the exact search, e.g. '{queries[i]}':")
+        print(f"    batch: {batch_results[i]}")
+        print(f"    exact: {results[i]}")
+        failed = True
+    else:
+        print(f"✓ Batch mode (default score): same top 3 as the exact search on all {len(queries)} ingredients")
+    if fuzzy_mismatches:
+        j = fuzzy_mismatches[0]
+        print(f"✗ Batch mode (fuzzy_score > {FUZZY_THRESHOLD}): {len(fuzzy_mismatches)}/{len(sample_queries)} sampled "
+              f"ingredients with a different top 3 than the full scan, e.g. '{sample_queries[j]}':")
+        print(f"    batch: {fuzzy_results[j]}")
+        print(f"    scan:  {fuzzy_reference[j]}")
+        failed = True
+    else:
+        print(f"✓ Batch mode (fuzzy_score > {FUZZY_THRESHOLD}): same top 3 as the full scan on "
+              f"{len(sample_queries)} sampled ingredients")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
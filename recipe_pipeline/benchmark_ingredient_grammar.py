@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Ingredient Grammar Harness
+==========================
+
+Checks the shared ingredient grammar (ingredient_parser.parse_recipe_ingredient)
+against the previous regex pipeline of recipe_schema_extraction.py /
+recipe_add_audit_trails.py (kept below as parse_recipe_ingredient_legacy).
+The grammar is about consistency, not speed: ingredients/second is printed
+for reference only. Without the cache the shared grammar is within noise of
+the legacy pipeline; the lru_cache on parse_recipe_ingredient only pays off
+for lines that repeat across recipes.
+
+Corpus: every recipeIngredient in the stored schema_org_json column of
+recipe_final.csv / recipe_database.csv (or --corpus files). Without a
+recipe database, the raw strings of unmatched_ingredients.csv are used.
+
+Differences are expected only where the grammar was extended, and are
+reported per category:
+  range      "1 - 2 EL"          → mean instead of "- 2 EL …" in the name
+  fraction   "1 ½", "1/2", "1,5", ⅓ …
+  no amount  lines without amount get the same name cleanup (", frisch", "(…)")
+  unit       unit as whole word ("2 Lauchzwiebeln" is not "2 l" + "auchzwiebeln")
+             and units outside the old list (Prisen, Dose, Tropfen, Msp., …)
+  amount     other leading amounts the old pattern missed ("¾ Pck. …")
+Any other difference is reported as unexpected (exit code 1).
+
+The same check runs for ingredient_parser.parse_ingredient, whose step 1
+now uses the shared AMOUNT_RE: against the unchanged
+benchmark_ingredient_parser.parse_ingredient_legacy on TEST_CASES and
+unmatched_ingredients.csv. A difference is a grammar extension if the
+legacy steps 2–5 on the AMOUNT_RE split give the new result.
+
+Usage:
+  python benchmark_ingredient_grammar.py
+  python benchmark_ingredient_grammar.py --corpus data/recipe_database.csv --examples 10
+"""
+
+import argparse
+import html
+import json
+import os
+import re
+import sys
+import time
+from collections import Counter
+
+import pandas as pd
+
+from benchmark_ingredient_parser import DEFAULT_CORPUS as PARSER_CORPUS
+from benchmark_ingredient_parser import QUANTITY_UNITS as LEGACY_QUANTITY_UNITS
+from benchmark_ingredient_parser import load_corpus as load_parser_corpus
+from benchmark_ingredient_parser import parse_ingredient_legacy
+from ingredient_parser import (AMOUNT_RE, COLOR_MAPPING, FRACTIONS, PREPARATION_MODIFIERS, TEST_CASES,
+                               parse_ingredient, parse_recipe_ingredient)
+from recipe_config import RECIPE_DATABASE_OUTPUT, RECIPE_FINAL_OUTPUT
+
+UNMATCHED_CORPUS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                'unmatched_ingredients.csv')
+LEGACY_UNITS = {'g', 'kg', 'ml', 'l', 'tsp', 'tbsp', 'cup', 'stück', 'prise', 'tl', 'el'}
+
+
+def parse_recipe_ingredient_legacy(ingredient_str):
+    """Reference: previous per-ingredient regex pipeline → (name, qty, qty_str)."""
+    match = re.match(r'^([\d\.\s½¼¾]+\s*(?:g|kg|ml|l|tsp|tbsp|cup|stück|prise|tl|el)?)\s*(.*)', ingredient_str, re.IGNORECASE)
+    if not match:
+        return ingredient_str, 1.0, '1'
+    qty_str = match.group(1).strip()
+    ingredient_name = match.group(2).strip()
+    ingredient_name = re.sub(r',\s*(frisch|getrocknet|gefroren|roh|gekocht|tk|tiefgekühlt)', '', ingredient_name, flags=re.IGNORECASE)
+    ingredient_name = re.sub(r'\s+(frisch|getrocknet|gefroren|roh|gekocht|tk|tiefgekühlt)$', '', ingredient_name, flags=re.IGNORECASE)
+    ingredient_name = re.sub(r'^(stängel|stengel|bund|blatt|blätter)\s+', '', ingredient_name, flags=re.IGNORECASE)
+    ingredient_name = re.sub(r'\s*\(.*?\)', '', ingredient_name)
+    ingredient_name = ingredient_name.strip()
+    qty_match = re.match(r'([\d\.½¼¾]+)', qty_str)
+    if qty_match:
+        qty_str_parsed = qty_match.group(1).replace('½', '.5').replace('¼', '.25').replace('¾', '.75')
+        qty = float(qty_str_parsed) if qty_str_parsed else 1.0
+    else:
+        qty = 1.0
+    return ingredient_name, qty, qty_str
+
+
+def parse_ingredient_amount_grammar(ingredient_str):
+    """parse_ingredient_legacy with step 1 replaced by AMOUNT_RE (steps 2–5 as before)."""
+    if not ingredient_str or not isinstance(ingredient_str, str):
+        return "", "", ""
+
+    original = ingredient_str.strip()
+    quantity = ""
+    variant = ""
+
+    match = AMOUNT_RE.match(original)
+    if match:
+        quantity = match.group('amount').strip()
+        cleaned = original[match.end():].strip()
+    else:
+        cleaned = original
+
+    for color_term, color_variant in COLOR_MAPPING.items():
+        if cleaned.lower().startswith(color_term + ' '):
+            variant = color_variant
+            cleaned = cleaned[len(color_term):].strip()
+            break
+
+    for modifier in sorted(PREPARATION_MODIFIERS, key=len, reverse=True):
+        pattern = rf'(\s+|,\s*){modifier}(\s|,|$)'
+        if re.search(pattern, cleaned, re.IGNORECASE):
+            if not variant:
+                variant = modifier
+            cleaned = re.sub(pattern, '', cleaned, flags=re.IGNORECASE).strip()
+
+    if cleaned.lower().startswith('ge') and len(cleaned) > 3:
+        potential = cleaned[2:]
+        if potential.lower() in PREPARATION_MODIFIERS:
+            variant = variant or potential.lower()
+            cleaned = potential
+
+    base_name = cleaned.lower().strip()
+    base_name = re.sub(r'\s+', ' ', base_name)
+    base_name = base_name.rstrip('.,')
+
+    return base_name, quantity, variant
+
+
+def load_corpus(paths):
+    """recipeIngredient strings (HTML-unescaped) from schema_org_json columns."""
+    strings = []
+    for path in paths:
+        df = pd.read_csv(path)
+        if 'schema_org_json' in df.columns:
+            for schema_json in df['schema_org_json'].dropna():
+                try:
+                    ingredients = json.loads(schema_json).get('recipeIngredient', [])
+                except (ValueError, AttributeError):
+                    continue
+                if isinstance(ingredients, str):
+                    ingredients = [ingredients]
+                strings.extend(html.unescape(item) for item in ingredients)
+        elif 'original' in df.columns:
+            strings.extend(df['original'].dropna().astype(str))
+    return strings
+
+
+def classify(ingredient_str, legacy, new, legacy_units=LEGACY_UNITS):
+    """Why the new grammar differs from the legacy pipeline (None = unexplained)."""
+    _, _, new_qty_str = new
+    _, _, legacy_qty_str = legacy
+    if new_qty_str == '1' and not re.match(r'\s*[\d' + ''.join(FRACTIONS) + ']', ingredient_str):
+        return 'no amount'
+    if re.search(r'\d\s*[-–]\s*[\d' + ''.join(FRACTIONS) + ']', new_qty_str):
+        return 'range'
+    if re.search(r'[/,' + ''.join(ch for ch in FRACTIONS if ch not in '½¼¾') + r']|\d\s+[½¼¾]', new_qty_str):
+        return 'fraction'
+    legacy_unit = re.sub(r'^[\d.\s½¼¾]+', '', legacy_qty_str).lower()
+    new_unit = re.sub(r'^[\d.,/\s' + ''.join(FRACTIONS) + r']+', '', new_qty_str).rstrip('.').lower()
+    if legacy_unit != new_unit and (new_unit not in legacy_units or re.match(re.escape(legacy_qty_str) + r'\w', ingredient_str)):
+        return 'unit'
+    return None
+
+
+def compare(items, legacy_func, new_func, explain):
+    """(category counts, examples per category) of legacy vs. new results on distinct items."""
+    categories = Counter()
+    examples = {}
+    for item in dict.fromkeys(items):
+        legacy, new = legacy_func(item), new_func(item)
+        if legacy == new:
+            categories['identical'] += 1
+            continue
+        category = explain(item, legacy, new) or 'UNEXPECTED'
+        categories[category] += 1
+        examples.setdefault(category, []).append((item, legacy, new))
+    return categories, examples
+
+
+def print_categories(categories, examples, limit):
+    for category, count in categories.most_common():
+        print(f"{category:<12} {count:>6}")
+        for item, legacy, new in examples.get(category, [])[:limit]:
+            print(f"    {item!r}")
+            print(f"      alt: {legacy}")
+            print(f"      neu: {new}")
+
+
+def explain_parse_ingredient(item, legacy, new):
+    """Difference of parse_ingredient explained by the amount grammar (step 1) only?"""
+    if parse_ingredient_amount_grammar(item) != new:
+        return None
+    return classify(item, (None, None, legacy[1]), (None, None, new[1] or '1'),
+                    legacy_units=LEGACY_QUANTITY_UNITS) or 'amount'
+
+
+def ingredients_per_second(func, items, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        if hasattr(func, 'cache_clear'):
+            func.cache_clear()
+        start = time.perf_counter()
+        for item in items:
+            func(item)
+        best = min(best, time.perf_counter() - start)
+    return len(items) / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Shared ingredient grammar: equivalence check')
+    parser.add_argument('--corpus', nargs='+', help='CSV files with schema_org_json (or original) column')
+    parser.add_argument('--examples', type=int, default=3, help='examples per difference category')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    paths = args.corpus or [path for path in (RECIPE_FINAL_OUTPUT, RECIPE_DATABASE_OUTPUT) if os.path.exists(path)][:1]
+    if not paths and os.path.exists(UNMATCHED_CORPUS):
+        paths = [UNMATCHED_CORPUS]
+    items = load_corpus(paths)
+    if not items:
+        print("✗ Kein Korpus gefunden (recipe_database.csv / unmatched_ingredients.csv)")
+        sys.exit(1)
+
+    print("INGREDIENT GRAMMAR HARNESS")
+    print("=" * 80)
+    print(f"Corpus: {len(items)} ingredients ({len(set(items))} distinct) from "
+          f"{', '.join(os.path.basename(path) for path in paths)}")
+
+    # (name, qty, qty_str) as before
+    categories, examples = compare(items, parse_recipe_ingredient_legacy,
+                                   lambda item: parse_recipe_ingredient(item)[:3], classify)
+    print("-" * 80)
+    print("parse_recipe_ingredient")
+    print_categories(categories, examples, args.examples)
+
+    parser_items = list(TEST_CASES) + (load_parser_corpus(PARSER_CORPUS) if os.path.exists(PARSER_CORPUS) else [])
+    parser_categories, parser_examples = compare(parser_items, parse_ingredient_legacy, parse_ingredient,
+                                                 explain_parse_ingredient)
+    print("-" * 80)
+    print(f"parse_ingredient ({len(set(parser_items))} distinct strings: TEST_CASES + "
+          f"{os.path.basename(PARSER_CORPUS)})")
+    print_categories(parser_categories, parser_examples, args.examples)
+
+    legacy_rate = ingredients_per_second(parse_recipe_ingredient_legacy, items, args.repeat)
+    uncached_rate = ingredients_per_second(parse_recipe_ingredient.__wrapped__, items, args.repeat)
+    cached_rate = ingredients_per_second(parse_recipe_ingredient, items, args.repeat)
+    print("-" * 80)
+    print(f"{'Legacy (inline re.sub passes)':<36} {legacy_rate:>12,.0f} ingredients/s")
+    print(f"{'Shared grammar (no cache)':<36} {uncached_rate:>12,.0f} ingredients/s")
+    print(f"{'Shared grammar (lru_cache)':<36} {cached_rate:>12,.0f} ingredients/s")
+    print("-" * 80)
+
+    unexpected = categories['UNEXPECTED'] + parser_categories['UNEXPECTED']
+    if unexpected:
+        print(f"✗ {unexpected} unexpected differences")
+        sys.exit(1)
+    print(f"✓ {categories['identical']} + {parser_categories['identical']} identical, "
+          f"all other differences are grammar extensions")
+
+
+if __name__ == '__main__':
+    main()
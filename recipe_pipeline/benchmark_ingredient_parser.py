@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Ingredient Parser Benchmark
+===========================
+
+Compares strings/second of ingredient_parser.parse_ingredient (compiled
+tokenizer) with the previous implementation (kept below unchanged as
+parse_ingredient_legacy) and counts identical (base_name, quantity,
+variant) tuples on:
+
+  - the built-in test cases (ingredient_parser.TEST_CASES)
+  - the unmatched_ingredients.csv corpus (column 'original', and the
+    already parsed 'parsed_name')
+
+Differences come from the shared amount grammar (ranges, fractions,
+whole-word units); benchmark_ingredient_grammar.py explains them per
+category.
+
+No BLS data needed.
+
+Usage:
+  python benchmark_ingredient_parser.py
+  python benchmark_ingredient_parser.py --corpus ../unmatched_ingredients.csv --repeat 5
+"""
+
+import argparse
+import os
+import re
+import time
+
+import pandas as pd
+
+from ingredient_parser import COLOR_MAPPING, PREPARATION_MODIFIERS, TEST_CASES, parse_ingredient
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                              'unmatched_ingredients.csv')
+
+# ingredient_parser.QUANTITY_UNITS as used by parse_ingredient_legacy (before the shared grammar)
+QUANTITY_UNITS = ['g', 'kg', 'mg', 'ml', 'l', 'dl', 'cl', 'tl', 'el', 'esslöffel', 'teelöffel', 'essl', 'teel',
+                  'prise', 'prisen', 'pack', 'packs', 'dose', 'dosen', 'bund', 'bündel', 'blatt', 'blätter',
+                  'strand', 'strang', 'stück', 'stücke', 'scheibe', 'scheiben', 'tropfen', 'halter', 'zweig',
+                  'zweige']
+
+
+def parse_ingredient_legacy(ingredient_str):
+    """Reference: parse_ingredient before the compiled tokenizer (unchanged)."""
+    if not ingredient_str or not isinstance(ingredient_str, str):
+        return "", "", ""
+
+    original = ingredient_str.strip()
+    quantity = ""
+    variant = ""
+
+    quantity_pattern = r'^([\d½⅓¼\s]+(?:' + '|'.join(sorted(QUANTITY_UNITS, key=len, reverse=True)) + r')?\s*(?:,|\.)?\s*)'
+    match = re.match(quantity_pattern, original, re.IGNORECASE)
+    if match:
+        quantity = match.group(1).strip()
+        cleaned = original[match.end():].strip()
+    else:
+        number_match = re.match(r'^([\d½⅓¼]+)\s+', original)
+        if number_match:
+            quantity = number_match.group(1).strip()
+            cleaned = original[number_match.end():].strip()
+        else:
+            cleaned = original
+
+    for color_term, color_variant in COLOR_MAPPING.items():
+        if cleaned.lower().startswith(color_term + ' '):
+            variant = color_variant
+            cleaned = cleaned[len(color_term):].strip()
+            break
+
+    for modifier in sorted(PREPARATION_MODIFIERS, key=len, reverse=True):
+        pattern = rf'(\s+|,\s*){modifier}(\s|,|$)'
+        if re.search(pattern, cleaned, re.IGNORECASE):
+            if not variant:
+                variant = modifier
+            cleaned = re.sub(pattern, '', cleaned, flags=re.IGNORECASE).strip()
+
+    if cleaned.lower().startswith('ge') and len(cleaned) > 3:
+        potential = cleaned[2:]
+        if potential.lower() in PREPARATION_MODIFIERS:
+            variant = variant or potential.lower()
+            cleaned = potential
+
+    base_name = cleaned.lower().strip()
+    base_name = re.sub(r'\s+', ' ', base_name)
+    base_name = base_name.rstrip('.,')
+
+    return base_name, quantity, variant
+
+
+def load_corpus(path):
+    df = pd.read_csv(path)
+    strings = []
+    for col in ('original', 'parsed_name'):
+        if col in df.columns:
+            strings.extend(df[col].dropna().astype(str))
+    return strings
+
+
+def strings_per_second(func, items, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in items:
+            func(item)
+        best = min(best, time.perf_counter() - start)
+    return len(items) / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark ingredient_parser.parse_ingredient')
+    parser.add_argument('--corpus', default=DEFAULT_CORPUS, help='CSV with an "original" column')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus) if os.path.exists(args.corpus) else []
+    print("INGREDIENT PARSER BENCHMARK")
+    print("=" * 60)
+    print(f"Test cases: {len(TEST_CASES)}, corpus: {len(corpus)} strings "
+          f"({os.path.basename(args.corpus) if corpus else 'not found'})")
+
+    items = list(TEST_CASES) + corpus
+    mismatches = [(s, parse_ingredient_legacy(s), parse_ingredient(s)) for s in items
+                  if parse_ingredient_legacy(s) != parse_ingredient(s)]
+
+    legacy_rate = strings_per_second(parse_ingredient_legacy, items, args.repeat)
+    compiled_rate = strings_per_second(parse_ingredient, items, args.repeat)
+    print("-" * 60)
+    print(f"{'Legacy (patterns per call)':<32} {legacy_rate:>12,.0f} strings/s")
+    print(f"{'Compiled tokenizer':<32} {compiled_rate:>12,.0f} strings/s")
+    print(f"{'Speedup':<32} {compiled_rate / legacy_rate:>12.1f}x")
+    print("-" * 60)
+    print(f"Identical output on {len(items) - len(mismatches)} of {len(items)} strings")
+    if mismatches:
+        print(f"  {len(mismatches)} differ (amount grammar, see benchmark_ingredient_grammar.py), e.g.:")
+        for item, old, new in mismatches[:5]:
+            print(f"  {item!r}: {old} → {new}")
+
+
+if __name__ == '__main__':
+    main()
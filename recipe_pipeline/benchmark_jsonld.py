@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+JSON-LD Extraction Benchmark
+============================
+
+Compares the regex byte scanner (jsonld_extract.extract_recipe_jsonld_fast)
+with the full BeautifulSoup parse on saved recipe pages, and checks that
+both find the same Recipe object.
+
+Pages are read from the HTTP cache (data/.cache/http/*.html.gz, filled by
+recipe_schema_extraction.py) or from the given files/folders (.html,
+.html.gz). Without saved pages, synthetic Cookidoo-sized pages are used.
+
+Usage:
+  python benchmark_jsonld.py
+  python benchmark_jsonld.py --pages saved_pages/ --repeat 5
+  python benchmark_jsonld.py --synthetic 50 --page-kb 400
+"""
+
+import argparse
+import glob
+import gzip
+import os
+import random
+import time
+
+from fixture_server import synthetic_page
+from http_cache import HTTP_CACHE_DIR
+from jsonld_extract import extract_recipe_jsonld_fast, extract_recipe_jsonld_soup
+
+
+def read_page(path):
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rb') as f:
+        return f.read()
+
+
+def find_page_files(paths):
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for pattern in ('*.html', '*.htm', '*.html.gz'):
+                files.extend(glob.glob(os.path.join(path, pattern)))
+        elif os.path.exists(path):
+            files.append(path)
+    return sorted(files)
+
+
+def time_per_page(func, pages, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for page in pages:
+            func(page)
+        best = min(best, time.perf_counter() - start)
+    return best / len(pages) * 1000  # ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark JSON-LD recipe extraction')
+    parser.add_argument('--pages', nargs='+', default=[HTTP_CACHE_DIR], help='HTML files / folders')
+    parser.add_argument('--synthetic', type=int, default=30, help='synthetic pages if no saved pages found')
+    parser.add_argument('--page-kb', type=int, default=300)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    files = find_page_files(args.pages)
+    if files:
+        pages = [read_page(path) for path in files]
+        source = f"{len(pages)} saved pages"
+    else:
+        rng = random.Random(args.seed)
+        pages = [synthetic_page(rng, args.page_kb) for _ in range(args.synthetic)]
+        source = f"{len(pages)} synthetic pages (no saved pages found)"
+
+    avg_kb = sum(len(page) for page in pages) / len(pages) / 1024
+    print("JSON-LD EXTRACTION BENCHMARK")
+    print("=" * 60)
+    print(f"Pages: {source}, avg {avg_kb:.0f} KB")
+
+    fast_results = [extract_recipe_jsonld_fast(page) for page in pages]
+    soup_results = [extract_recipe_jsonld_soup(page) for page in pages]
+    mismatches = [i for i, (a, b) in enumerate(zip(fast_results, soup_results)) if a is not None and a != b]
+    fallbacks = sum(1 for result in fast_results if result is None)
+    if mismatches:
+        print(f"✗ {len(mismatches)} pages with different results, e.g. page #{mismatches[0]}")
+        return
+
+    soup_ms = time_per_page(extract_recipe_jsonld_soup, pages, args.repeat)
+    fast_ms = time_per_page(extract_recipe_jsonld_fast, pages, args.repeat)
+    print("-" * 60)
+    print(f"{'BeautifulSoup (html.parser)':<32} {soup_ms:>10.2f} ms/page")
+    print(f"{'Regex byte scan':<32} {fast_ms:>10.2f} ms/page")
+    print(f"{'Speedup':<32} {soup_ms / fast_ms:>10.1f}x")
+    print("-" * 60)
+    print(f"✓ Same Recipe object on {len(pages) - fallbacks}/{len(pages)} pages")
+    if fallbacks:
+        print(f"  {fallbacks} pages without Recipe on the fast path (→ BeautifulSoup fallback)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Ingredient Matcher Benchmark
+============================
+
+Compares per-ingredient latency of the Aho–Corasick matcher with the old
+linear "longest key first" scan while the mapping table grows from the
+current size (~165 keys) to 10k keys, and checks that both pick the same key.
+
+No BLS data needed: keys beyond the real mappings are synthetic and every
+key is treated as resolved.
+
+Usage:
+  python benchmark_matcher.py
+  python benchmark_matcher.py --sizes 165 1000 10000 --ingredients 5000
+"""
+
+import argparse
+import random
+import string
+import time
+
+from ingredient_mapping_config import MANUAL_INGREDIENT_MAP
+from ingredient_matcher import IngredientMatcher
+
+
+def build_mapping(size, rng):
+    """Real mapping keys first, then synthetic German-looking keys."""
+    mapping = dict(list(MANUAL_INGREDIENT_MAP.items())[:size])
+    while len(mapping) < size:
+        length = rng.randint(3, 14)
+        key = ''.join(rng.choice(string.ascii_lowercase + 'äöüß') for _ in range(length))
+        mapping.setdefault(key, 'Synthetic')
+    return mapping
+
+
+def build_ingredients(mapping, count, rng):
+    """Ingredient strings that embed a key (or none) in typical phrasing."""
+    keys = list(mapping)
+    prefixes = ['', '200 g ', '1 ', '½ bund ', '2 el ', 'rote ', 'frische ']
+    suffixes = ['', ', frisch', 'n', ' (tk)', ', gehackt', ' aus der dose']
+    ingredients = []
+    for _ in range(count):
+        if rng.random() < 0.2:
+            core = ''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(5, 12)))
+        else:
+            core = rng.choice(keys)
+        ingredients.append(rng.choice(prefixes) + core + rng.choice(suffixes))
+    return ingredients
+
+
+def time_per_item(func, items, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in items:
+            func(item)
+        best = min(best, time.perf_counter() - start)
+    return best / len(items) * 1e6  # µs
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark ingredient matching')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[165, 500, 1000, 2500, 5000, 10000])
+    parser.add_argument('--ingredients', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+
+    print("INGREDIENT MATCHER BENCHMARK")
+    print("=" * 72)
+    print(f"{'Keys':>8} {'Build (ms)':>12} {'Linear (µs)':>13} {'Automaton (µs)':>16} {'Speedup':>9}")
+    print("-" * 72)
+
+    for size in args.sizes:
+        mapping = build_mapping(size, rng)
+        resolved = {key: 0 for key in mapping}
+        ingredients = build_ingredients(mapping, args.ingredients, rng)
+
+        start = time.perf_counter()
+        matcher = IngredientMatcher(mapping, resolved)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        mismatches = [ing for ing in ingredients if matcher.match_key(ing) != matcher.match_key_linear(ing)]
+        if mismatches:
+            print(f"✗ {len(mismatches)} mismatches at {size} keys, e.g. '{mismatches[0]}'")
+            return
+
+        linear = time_per_item(matcher.match_key_linear, ingredients)
+        automaton = time_per_item(matcher.match_key, ingredients)
+        print(f"{len(mapping):>8} {build_ms:>12.1f} {linear:>13.2f} {automaton:>16.2f} {linear / automaton:>8.1f}x")
+
+    print("-" * 72)
+    print("✓ Automaton and linear scan picked the same key for every ingredient")
+
+
+if __name__ == '__main__':
+    main()
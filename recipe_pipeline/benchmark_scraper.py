@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Scraper Throughput Benchmark
+============================
+
+Starts the local Cookidoo stand-in (fixture_server.py), writes a temporary
+export CSV pointing at it and runs recipe_schema_extraction.py once per
+concurrency / rate-limit setting. Reports pages/s, p50/p95 request latency,
+retries and HTTP status counts from the script's --stats-json output, so
+concurrency and RATE_LIMIT_DELAY can be tuned offline.
+
+Needs the BLS CSV in data/ (the extraction computes nutrients as usual).
+It is copied into a temporary folder and passed with --bls, so the BLS
+snapshot and the matcher cache are built there; together with --no-cache
+and separate output/journal files, data/ stays untouched.
+
+Usage:
+  python benchmark_scraper.py
+  python benchmark_scraper.py --pages 100 --concurrency 1 4 8 --rate-delay 0.1 0.5
+  python benchmark_scraper.py --latency-ms 300 --jitter-ms 100 --throttle-rate 0.05 --error-rate 0.02
+"""
+
+import argparse
+import itertools
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+import pandas as pd
+
+from recipe_config import BLS_DATABASE
+from fixture_server import add_server_arguments, options_from_args, start_server
+
+SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'recipe_schema_extraction.py')
+
+
+def write_export(path, base_url, pages, archive=None):
+    """Cookidoo-export-shaped CSV with URLs on the fixture server."""
+    if archive is not None:
+        from urllib.parse import urlparse
+        paths = [urlparse(url).path for url in list(archive.index)[:pages]]
+    else:
+        paths = [f"/recipes/recipe/de-DE/r{100000 + i}" for i in range(pages)]
+    pd.DataFrame({
+        'link--alt href': [base_url + path for path in paths],
+        'core-tile__image src': '',
+        'core-tile__description-text': [f"Fixture-Rezept {i + 1}" for i in range(len(paths))],
+        'core-rating__counter': 4.5,
+        'core-rating__label': '-10',
+        'core-tile__description-subline': '30 Min',
+    }).to_csv(path, index=False)
+    return len(paths)
+
+
+def run_extraction(export_csv, bls_csv, workdir, concurrency, rate_delay):
+    output = os.path.join(workdir, f'db_c{concurrency}_d{rate_delay}.csv')
+    stats_path = output + '.stats.json'
+    cmd = [sys.executable, SCRIPT, '--input', export_csv, '--output', output, '--bls', bls_csv,
+           '--stats-json', stats_path, '--no-cache', '--restart', '--concurrency', str(concurrency), '--rate-delay', str(rate_delay)]
+    result = subprocess.run(cmd, cwd=os.path.dirname(SCRIPT), stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                            text=True)
+    if result.returncode != 0 or not os.path.exists(stats_path):
+        print(f"✗ Extraction failed (concurrency={concurrency}, rate_delay={rate_delay}):")
+        print(result.stderr[-2000:])
+        return None
+    with open(stats_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark recipe_schema_extraction.py against a local server')
+    parser.add_argument('--pages', type=int, default=40)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 8])
+    parser.add_argument('--rate-delay', type=float, nargs='+', default=[0.5, 0.1])
+    add_server_arguments(parser)
+    args = parser.parse_args()
+
+    if not os.path.exists(BLS_DATABASE):
+        print(f"✗ BLS CSV not found: {BLS_DATABASE}")
+        sys.exit(1)
+
+    options = options_from_args(args)
+    server, base_url = start_server(options)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        export_csv = os.path.join(workdir, 'export.csv')
+        pages = write_export(export_csv, base_url, args.pages, options.archive)
+        # Own copy of the BLS CSV: its snapshot and the matcher cache go to workdir/.cache/
+        bls_csv = os.path.join(workdir, os.path.basename(BLS_DATABASE))
+        shutil.copy2(BLS_DATABASE, bls_csv)
+
+        print("SCRAPER THROUGHPUT BENCHMARK")
+        print("=" * 86)
+        print(f"Server: {base_url} ({args.source}), {pages} pages, latency {args.latency_ms:.0f}±{args.jitter_ms:.0f} ms, "
+              f"429 {args.throttle_rate:.0%}, 503 {args.error_rate:.0%}")
+        print("-" * 86)
+        print(f"{'Conc':>5} {'Delay (s)':>10} {'Pages/s':>9} {'p50 (ms)':>10} {'p95 (ms)':>10} "
+              f"{'OK':>6} {'Retries':>8}  Status")
+        print("-" * 86)
+
+        for concurrency, rate_delay in itertools.product(args.concurrency, args.rate_delay):
+            stats = run_extraction(export_csv, bls_csv, workdir, concurrency, rate_delay)
+            if stats is None:
+                continue
+            status = ', '.join(f"{code}: {count}" for code, count in sorted(stats['status_counts'].items()))
+            print(f"{concurrency:>5} {rate_delay:>10.2f} {stats['pages_per_s']:>9.2f} "
+                  f"{stats['latency_p50_ms'] or 0:>10.1f} {stats['latency_p95_ms'] or 0:>10.1f} "
+                  f"{stats['extracted']:>3}/{stats['pages']:<3} {stats['retries']:>7}  {status}")
+
+    server.shutdown()
+    print("-" * 86)
+
+
+if __name__ == '__main__':
+    main()
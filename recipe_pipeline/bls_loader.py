@@ -0,0 +1,475 @@
+"""
+BLS Snapshot Loader
+===================
+
+Shared loader for the BLS nutrient database (BLS_4_0_Daten_2025_DE.csv).
+
+The CSV is parsed once into a typed columnar snapshot (.npz, one array per
+column) in a `.cache/` folder next to the CSV. Later calls reuse the snapshot
+until the source CSV changes (size, mtime or content hash).
+
+For row-wise nutrient lookups there is also a dense float32 nutrient matrix
+(foods × nutrients) opened with np.memmap, so concurrent pipeline processes
+share the same page-cache pages instead of each holding a pandas copy.
+
+Consumers that only need a few nutrients can project columns; the name
+column is always included:
+  bls_df = load_bls(columns=CORE_NUTRIENT_COLUMNS)
+
+Usage:
+  from bls_loader import load_bls, get_nutrient_columns
+  bls_df = load_bls()
+  nutrient_cols = get_nutrient_columns(bls_df.columns)
+
+  from bls_loader import load_bls_foods
+  foods = load_bls_foods(columns=[LACTOSE_COLUMN])
+  if foods.has_food('Süßrahmbutter'):
+      lactose = foods.get_food('Süßrahmbutter')[LACTOSE_COLUMN]
+
+  from bls_loader import open_nutrient_matrix
+  matrix = open_nutrient_matrix()
+  row = matrix.row_of('Speisezwiebel roh')
+  kcal = matrix.values[row, matrix.col_of('ENERCC Energie (Kilokalorien) [kcal/100g]')]
+"""
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from recipe_config import BLS_DATABASE, NUTRIENT_MAPPING
+
+NAME_COLUMN = 'Lebensmittelbezeichnung'
+LACTOSE_COLUMN = 'LACS Lactose [g/100g]'
+
+# The nutrients used for goals (recipe_config.NUTRIENT_MAPPING) plus lactose
+CORE_NUTRIENT_COLUMNS = list(NUTRIENT_MAPPING) + [LACTOSE_COLUMN]
+
+# Bump when the snapshot layout changes (forces a rebuild)
+SNAPSHOT_VERSION = 1
+
+SNAPSHOT_FILE = 'bls_snapshot.npz'
+SNAPSHOT_META_FILE = 'bls_snapshot.json'
+MATRIX_FILE = 'bls_nutrients_{sha}.f32'  # one file per CSV content, never overwritten with other data
+MATRIX_INDEX_FILE = 'bls_nutrients_index.json'
+
+
+def get_nutrient_columns(columns):
+    """Nutrient columns are all columns with a unit in brackets."""
+    return [col for col in columns if '[' in col]
+
+
+def get_cache_dir(path=BLS_DATABASE):
+    """Cache folder for derived files of a BLS CSV (next to the CSV)."""
+    return os.path.join(os.path.dirname(os.path.abspath(path)), '.cache')
+
+
+def file_sha256(path):
+    """Content hash of a file (read in chunks)."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def source_fingerprint(path=BLS_DATABASE):
+    """
+    Return the current fingerprint of the BLS CSV as stored in the snapshot
+    metadata: {'size', 'mtime_ns', 'sha256'}.
+
+    The hash is only recomputed when size or mtime differ from the snapshot,
+    so the common "nothing changed" case costs a single stat() call.
+    """
+    st = os.stat(path)
+    meta = _read_meta(path)
+    if meta and meta.get('size') == st.st_size and meta.get('mtime_ns') == st.st_mtime_ns:
+        sha = meta['sha256']
+    else:
+        sha = file_sha256(path)
+    return {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'sha256': sha}
+
+
+def _snapshot_paths(path):
+    cache_dir = get_cache_dir(path)
+    return os.path.join(cache_dir, SNAPSHOT_FILE), os.path.join(cache_dir, SNAPSHOT_META_FILE)
+
+
+def _read_meta(path):
+    _, meta_path = _snapshot_paths(path)
+    try:
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if meta.get('version') != SNAPSHOT_VERSION:
+        return None
+    return meta
+
+
+def _replace_atomic(target, write, mode='wb'):
+    """
+    Write target via write(f) on a unique temp file in the same folder, then
+    os.replace() it, so concurrent processes never share a temp file.
+    """
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(target) or '.',
+                               prefix=os.path.basename(target) + '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, mode, encoding=None if 'b' in mode else 'utf-8') as f:
+            write(f)
+        os.replace(tmp, target)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def _write_json_atomic(target, data):
+    _replace_atomic(target, lambda f: json.dump(data, f, ensure_ascii=False), mode='w')
+
+
+def _snapshot_is_current(path, meta):
+    """Check the snapshot against the source CSV (size/mtime first, then hash)."""
+    snapshot_path, meta_path = _snapshot_paths(path)
+    if meta is None or not os.path.exists(snapshot_path):
+        return False
+
+    st = os.stat(path)
+    if st.st_size != meta['size']:
+        return False
+    if st.st_mtime_ns == meta['mtime_ns']:
+        return True
+
+    # Same size but touched (e.g. git checkout) - compare content
+    if file_sha256(path) != meta['sha256']:
+        return False
+    meta['mtime_ns'] = st.st_mtime_ns
+    try:
+        _write_json_atomic(meta_path, meta)
+    except OSError:
+        pass
+    return True
+
+
+def _projection(columns):
+    """Requested columns in order, name column first, without duplicates."""
+    return list(dict.fromkeys([NAME_COLUMN] + list(columns)))
+
+
+def parse_bls_csv(path=BLS_DATABASE, columns=None):
+    """
+    Parse the raw BLS CSV and coerce all nutrient columns to numbers (NaN -> 0).
+
+    With `columns`, only those columns (plus the name column) are parsed;
+    nutrient columns are read as strings up front so pandas skips type
+    inference. Unknown column names are ignored.
+    """
+    if columns is None:
+        df = pd.read_csv(path, low_memory=False)
+    else:
+        wanted = _projection(columns)
+        df = pd.read_csv(
+            path,
+            usecols=lambda col: col in wanted,
+            dtype={col: str for col in wanted},
+        )
+        df = df[[col for col in wanted if col in df.columns]]
+
+    for col in get_nutrient_columns(df.columns):
+        df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+    return df
+
+
+def build_snapshot(path=BLS_DATABASE):
+    """Parse the CSV and write the columnar snapshot. Returns the parsed DataFrame."""
+    df = parse_bls_csv(path)
+    fingerprint = {'size': os.stat(path).st_size, 'mtime_ns': os.stat(path).st_mtime_ns,
+                   'sha256': file_sha256(path)}
+
+    arrays = {}
+    kinds = []
+    for i, col in enumerate(df.columns):
+        series = df[col]
+        if pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+            arrays[f'c{i}'] = series.to_numpy()
+            kinds.append('numeric')
+        else:
+            # Text column: fixed-width unicode array plus null mask (no pickling)
+            mask = series.isna().to_numpy()
+            arrays[f'c{i}'] = series.where(~mask, '').astype(str).to_numpy(dtype=str)
+            arrays[f'm{i}'] = mask
+            kinds.append('text')
+
+    snapshot_path, meta_path = _snapshot_paths(path)
+    try:
+        os.makedirs(os.path.dirname(snapshot_path), exist_ok=True)
+        _replace_atomic(snapshot_path, lambda f: np.savez(f, **arrays))
+        _write_json_atomic(meta_path, {
+            'version': SNAPSHOT_VERSION,
+            'source': os.path.abspath(path),
+            **fingerprint,
+            'rows': len(df),
+            'columns': list(df.columns),
+            'kinds': kinds,
+        })
+    except OSError as e:
+        # Read-only data folder etc. - still usable, just not cached
+        print(f"  Warning: could not write BLS snapshot: {e}")
+
+    return df
+
+
+def _load_snapshot(path, meta, columns=None):
+    snapshot_path, _ = _snapshot_paths(path)
+    positions = {col: i for i, col in enumerate(meta['columns'])}
+    wanted = meta['columns'] if columns is None else [
+        col for col in _projection(columns) if col in positions
+    ]
+
+    data = {}
+    with np.load(snapshot_path, allow_pickle=False) as npz:
+        # npz members are loaded lazily, so a projection only reads its columns
+        for col in wanted:
+            i = positions[col]
+            kind = meta['kinds'][i]
+            values = npz[f'c{i}']
+            if kind == 'text':
+                series = pd.Series(values, dtype=object)
+                series[npz[f'm{i}']] = np.nan
+                data[col] = series
+            else:
+                data[col] = values
+    return pd.DataFrame(data, columns=wanted)
+
+
+def load_bls(path=BLS_DATABASE, columns=None):
+    """
+    Load the BLS database as a DataFrame with numeric nutrient columns.
+
+    Uses the cached snapshot when it matches the source CSV, otherwise
+    re-parses the CSV and refreshes the snapshot.
+
+    Args:
+        path: BLS CSV file
+        columns: Optional list of columns to load (the name column is always
+            included). Projected loads read only these columns, from the
+            snapshot if it is current, otherwise straight from the CSV
+            (without building the full snapshot).
+
+    Raises FileNotFoundError if the CSV does not exist.
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(path)
+
+    meta = _read_meta(path)
+    if _snapshot_is_current(path, meta):
+        try:
+            return _load_snapshot(path, meta, columns)
+        except (OSError, KeyError, ValueError):
+            pass  # Corrupt snapshot - rebuild below
+
+    if columns is not None:
+        return parse_bls_csv(path, columns)
+    df = build_snapshot(path)
+    # Return what later calls will get from the snapshot (text columns as
+    # str, NaN kept), not the freshly parsed frame with mixed-type columns
+    meta = _read_meta(path)
+    if _snapshot_is_current(path, meta):
+        try:
+            return _load_snapshot(path, meta)
+        except (OSError, KeyError, ValueError):
+            pass
+    return df
+
+
+# ==========================================
+# NAME INDEX
+# ==========================================
+def normalize_food_name(name):
+    """Casefold and collapse whitespace, for forgiving name lookups."""
+    return re.sub(r'\s+', ' ', str(name)).strip().casefold()
+
+
+class BLSFoods:
+    """
+    BLS table with dict indexes on Lebensmittelbezeichnung.
+
+    Replaces `bls_df[bls_df['Lebensmittelbezeichnung'] == name]` scans with
+    O(1) lookups. If a name occurs more than once, the first row wins (same
+    as `.iloc[0]` on the mask result).
+    """
+
+    def __init__(self, df):
+        self.df = df.reset_index(drop=True)
+        self._exact = {}
+        self._normalized = {}
+        for i, name in enumerate(self.df[NAME_COLUMN].tolist()):
+            if not isinstance(name, str):
+                continue
+            self._exact.setdefault(name, i)
+            self._normalized.setdefault(normalize_food_name(name), i)
+
+    def __len__(self):
+        return len(self.df)
+
+    def row_id(self, name, normalized=False):
+        """Row position of a food (None if unknown). `normalized` ignores case/whitespace."""
+        if normalized:
+            return self._normalized.get(normalize_food_name(name))
+        return self._exact.get(name)
+
+    def has_food(self, name, normalized=False):
+        return self.row_id(name, normalized) is not None
+
+    def get_food(self, name, normalized=False):
+        """The food's row as a Series (None if unknown)."""
+        i = self.row_id(name, normalized)
+        return None if i is None else self.df.iloc[i]
+
+
+def load_bls_foods(path=BLS_DATABASE, columns=None):
+    """load_bls() wrapped in a BLSFoods name index."""
+    return BLSFoods(load_bls(path, columns))
+
+
+# ==========================================
+# MEMORY-MAPPED NUTRIENT MATRIX
+# ==========================================
+class NutrientMatrix:
+    """
+    Read-only float32 nutrient matrix (foods × nutrients) backed by np.memmap.
+
+    Rows follow the row order of load_bls(), columns the order of
+    get_nutrient_columns(). Values are per 100 g.
+    """
+
+    def __init__(self, values, names, columns):
+        self.values = values
+        self.names = names
+        self.columns = columns
+        self.row_index = {}
+        for i, name in enumerate(names):
+            self.row_index.setdefault(name, i)  # First row wins, like .iloc[0]
+        self.column_index = {col: j for j, col in enumerate(columns)}
+
+    def __len__(self):
+        return len(self.names)
+
+    def row_of(self, name):
+        """Row id for an exact Lebensmittelbezeichnung (None if unknown)."""
+        return self.row_index.get(name)
+
+    def col_of(self, column):
+        """Column id for a BLS nutrient column (None if unknown)."""
+        return self.column_index.get(column)
+
+    def row(self, i):
+        """Nutrient values of one food as a float64 array (per 100 g)."""
+        return np.asarray(self.values[i], dtype=np.float64)
+
+
+def _matrix_paths(path, sha):
+    cache_dir = get_cache_dir(path)
+    return (os.path.join(cache_dir, MATRIX_FILE.format(sha=sha[:16])),
+            os.path.join(cache_dir, MATRIX_INDEX_FILE))
+
+
+def build_nutrient_matrix(path=BLS_DATABASE):
+    """
+    Write the float32 nutrient matrix and its sidecar index for a BLS CSV.
+
+    The matrix file is named after the CSV hash and written before the index,
+    so an index always points to a complete matrix of its own shape, also
+    while another process rebuilds.
+    """
+    df = load_bls(path)
+    columns = get_nutrient_columns(df.columns)
+    values = df[columns].to_numpy(dtype=np.float32)
+    names = df[NAME_COLUMN].fillna('').astype(str).tolist()
+
+    sha = source_fingerprint(path)['sha256']
+    matrix_path, index_path = _matrix_paths(path, sha)
+    os.makedirs(os.path.dirname(matrix_path), exist_ok=True)
+    _replace_atomic(matrix_path, lambda f: np.ascontiguousarray(values).tofile(f))
+    _write_json_atomic(index_path, {
+        'version': SNAPSHOT_VERSION,
+        'sha256': sha,
+        'matrix_file': os.path.basename(matrix_path),
+        'shape': list(values.shape),
+        'names': names,
+        'columns': columns,
+    })
+
+    # Matrices of older CSV versions (open memmaps keep their data)
+    for name in os.listdir(os.path.dirname(matrix_path)):
+        if name.startswith('bls_nutrients') and name.endswith('.f32') and name != os.path.basename(matrix_path):
+            try:
+                os.remove(os.path.join(os.path.dirname(matrix_path), name))
+            except OSError:
+                pass
+
+
+def _read_matrix_index(index_path, sha):
+    """The sidecar index if it belongs to this CSV and its matrix file has the recorded shape, else None."""
+    try:
+        with open(index_path, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if index.get('version') != SNAPSHOT_VERSION or index.get('sha256') != sha or 'matrix_file' not in index:
+        return None
+    matrix_path = os.path.join(os.path.dirname(index_path), index['matrix_file'])
+    rows, cols = index['shape']
+    try:
+        if os.path.getsize(matrix_path) != rows * cols * np.dtype(np.float32).itemsize:
+            return None
+    except OSError:
+        return None
+    index['matrix_path'] = matrix_path
+    return index
+
+
+def open_nutrient_matrix(path=BLS_DATABASE):
+    """
+    Open the memory-mapped nutrient matrix, (re)building it first if it is
+    missing or older than the BLS CSV.
+    Raises FileNotFoundError if the CSV does not exist.
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(path)
+
+    sha = source_fingerprint(path)['sha256']
+    _, index_path = _matrix_paths(path, sha)
+    index = _read_matrix_index(index_path, sha)
+    if index is None:
+        build_nutrient_matrix(path)
+        index = _read_matrix_index(index_path, sha)
+        if index is None:
+            raise OSError(f"nutrient matrix in {os.path.dirname(index_path)} does not match its index")
+
+    shape = tuple(index['shape'])
+    if shape[0] * shape[1] == 0:
+        values = np.zeros(shape, dtype=np.float32)
+    else:
+        values = np.memmap(index['matrix_path'], dtype=np.float32, mode='r', shape=shape)
+    return NutrientMatrix(values, index['names'], index['columns'])
+
+
+if __name__ == '__main__':
+    import time
+
+    start = time.perf_counter()
+    bls_df = load_bls()
+    elapsed = time.perf_counter() - start
+    print(f"BLS database: {len(bls_df)} foods, {len(get_nutrient_columns(bls_df.columns))} nutrients")
+    print(f"Loaded in {elapsed:.2f}s (snapshot: {os.path.join(get_cache_dir(), SNAPSHOT_FILE)})")
+
+    matrix = open_nutrient_matrix()
+    print(f"Nutrient matrix: {matrix.values.shape[0]} × {matrix.values.shape[1]} float32 "
+          f"({matrix.values.nbytes / (1024 * 1024):.1f} MB, memory-mapped)")
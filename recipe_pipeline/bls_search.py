@@ -0,0 +1,376 @@
+"""
+BLS Name Search
+===============
+
+Fuzzy candidate search over BLS food names (Lebensmittelbezeichnung) for
+the mapping suggesters (batch_mapping_suggester.py, auto_mapping_workflow.py).
+
+The score is the one the suggesters always used:
+  difflib.SequenceMatcher(ingredient, food).ratio(), +0.2 (capped at 1.0)
+  when the ingredient occurs in the food name, both lowercased.
+
+Instead of scoring every BLS food per ingredient, a character trigram
+inverted index (trigram → food ids) retrieves a shortlist first:
+  - every food that shares at least one trigram with the ingredient gets
+    its shared-trigram count (one np.bincount over the posting lists)
+  - the `shortlist` foods with the highest Dice overlap, plus every food
+    that contains all of the ingredient's trigrams (substring candidates,
+    which may earn the bonus), are re-ranked with the exact score
+
+Foods outside the shortlist can't earn the bonus and are only scored if
+an upper bound on their ratio can still reach the current top k, so the
+result is the same as the full scan (see benchmark_bls_search.py):
+  1. character counts (SequenceMatcher.quick_ratio), vectorized over all foods
+  2. longest common subsequence (bit-parallel, vectorized) for the foods
+     that pass 1 – SequenceMatcher's matching blocks form a common
+     subsequence, so 2·LCS / (len(a) + len(b)) bounds ratio()
+
+Batch mode (TfidfIndex) seeds all ingredients at once: food names and
+ingredient names become character n-gram TF-IDF vectors (L2 normalized),
+one sparse product gives every ingredient × food cosine and a per-row
+argpartition keeps the best `candidates` foods. Those plus the trigram
+shortlist above are scored first; the rest are pruned with the same two
+bounds, so search_batch returns the exact top k. A custom score
+(auto_mapping_workflow.py's fuzzy_score) needs a `bound` that maps the
+ratio bound to a bound on the score. The cosine ranks n-gram overlap, not
+SequenceMatcher's matching blocks, so it only helps to raise the cut-off
+early (benchmark_bls_search.py checks both modes against the full scan).
+Uses scipy.sparse when available, otherwise an equivalent numpy
+scatter-add over the n-gram posting lists.
+
+Usage:
+  from bls_search import TrigramIndex, TfidfIndex
+  index = TrigramIndex(bls_df['Lebensmittelbezeichnung'])
+  index.search('zwiebel', threshold=0.4, k=3)   # [(score, food name), ...]
+
+  tfidf = TfidfIndex(bls_df['Lebensmittelbezeichnung'])
+  tfidf.search_batch(['zwiebel', 'möhren'], threshold=0.4, k=3)   # one list per ingredient
+  tfidf.search_batch(names, threshold=0.6, k=3, score=my_score, bound=my_bound)
+"""
+
+import math
+from difflib import SequenceMatcher
+
+import numpy as np
+
+try:
+    import scipy.sparse as sparse
+except ImportError:  # Optional dependency
+    sparse = None
+
+SUBSTRING_BONUS = 0.2
+SHORTLIST_SIZE = 20
+LCS_MAX_QUERY = 63  # bit-parallel LCS packs the query into one uint64
+NGRAM_RANGE = (2, 4)
+TFIDF_CANDIDATES = 20
+TFIDF_CHUNK = 512  # ingredients per dense similarity block
+
+
+def trigrams(text):
+    """Distinct character trigrams of text (the text itself if shorter)."""
+    if len(text) < 3:
+        return {text} if text else set()
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def similarity(query, name, matcher=None):
+    """Suggester score of a lowercased query against a lowercased food name."""
+    if matcher is None:
+        matcher = SequenceMatcher(None, query, name)
+    else:
+        matcher.set_seq1(query)  # matcher already holds name as seq2
+    ratio = matcher.ratio()
+    if query in name:
+        ratio = min(1.0, ratio + SUBSTRING_BONUS)
+    return ratio
+
+
+class TrigramIndex:
+    """Trigram inverted index over food names, with exact top-k re-ranking."""
+
+    def __init__(self, names):
+        self.names = [name if isinstance(name, str) else '' for name in names]
+        self.lowered = [name.lower() for name in self.names]
+        self.lengths = np.array([len(name) for name in self.lowered], dtype=np.int32)
+
+        postings = {}
+        gram_counts = np.zeros(len(self.lowered), dtype=np.int32)
+        for i, name in enumerate(self.lowered):
+            grams = trigrams(name)
+            gram_counts[i] = len(grams)
+            for gram in grams:
+                postings.setdefault(gram, []).append(i)
+        self.postings = {gram: np.array(ids, dtype=np.int32) for gram, ids in postings.items()}
+        self.gram_counts = gram_counts
+
+        # Character counts (quick_ratio bound) and padded character codes
+        # (LCS bound) per food; code len(alphabet) is padding
+        alphabet = sorted({ch for name in self.lowered for ch in name})
+        self.char_index = {ch: j for j, ch in enumerate(alphabet)}
+        width = int(self.lengths.max()) if len(self.lengths) else 0
+        self.char_counts = np.zeros((len(self.lowered), len(alphabet)), dtype=np.int32)
+        self.char_codes = np.full((len(self.lowered), width), len(alphabet), dtype=np.int32)
+        for i, name in enumerate(self.lowered):
+            for pos, ch in enumerate(name):
+                j = self.char_index[ch]
+                self.char_counts[i, j] += 1
+                self.char_codes[i, pos] = j
+
+        # SequenceMatcher caches its analysis of seq2 (the food name), so one
+        # matcher per food is reused for every query
+        self._matchers = [None] * len(self.lowered)
+
+    def __len__(self):
+        return len(self.names)
+
+    def shared_trigrams(self, query):
+        """Number of distinct trigrams each food shares with query (array over all foods)."""
+        grams = [self.postings[gram] for gram in trigrams(query) if gram in self.postings]
+        if not grams:
+            return np.zeros(len(self.names), dtype=np.int32)
+        return np.bincount(np.concatenate(grams), minlength=len(self.names)).astype(np.int32)
+
+    def shortlist(self, query, size=SHORTLIST_SIZE):
+        """Food ids worth scoring exactly: best Dice overlap plus substring candidates."""
+        shared = self.shared_trigrams(query)
+        n_grams = len(trigrams(query))
+        dice = 2.0 * shared / np.maximum(n_grams + self.gram_counts, 1)
+        hits = np.flatnonzero(shared)
+        if len(hits) > size:
+            hits = hits[np.argpartition(-dice[hits], size - 1)[:size]]
+        if len(query) < 3:  # no trigram of its own: check containment directly
+            contains = np.array([i for i, name in enumerate(self.lowered) if query in name], dtype=np.int64)
+        else:
+            contains = np.flatnonzero(shared == n_grams)
+        return np.union1d(hits, contains)
+
+    def ratio_bound(self, query):
+        """Upper bound of SequenceMatcher.ratio() for every food (quick_ratio)."""
+        chars = {}
+        for ch in query:
+            chars[ch] = chars.get(ch, 0) + 1
+        matches = np.zeros(len(self.names), dtype=np.int32)
+        for ch, count in chars.items():
+            j = self.char_index.get(ch)
+            if j is not None:
+                matches += np.minimum(self.char_counts[:, j], count)
+        total = len(query) + self.lengths
+        return np.where(total > 0, 2.0 * matches / np.maximum(total, 1), 1.0)
+
+    def lcs_bound(self, query, ids):
+        """Upper bound of SequenceMatcher.ratio() for the foods ids (2·LCS / total length)."""
+        if len(query) > LCS_MAX_QUERY:
+            return self.ratio_bound(query)[ids]
+        # Bit-parallel LCS (Hyyrö): one uint64 state per food, one step per food character
+        masks = np.zeros(len(self.char_index) + 1, dtype=np.uint64)
+        for pos, ch in enumerate(query):
+            j = self.char_index.get(ch)
+            if j is not None:
+                masks[j] |= np.uint64(1 << pos)
+        codes = self.char_codes[ids]
+        state = np.full(len(ids), np.iinfo(np.uint64).max, dtype=np.uint64)
+        for col in range(int(self.lengths[ids].max()) if len(ids) else 0):
+            matched = state & masks[codes[:, col]]
+            state = (state + matched) | (state - matched)
+        low = state & np.uint64((1 << len(query)) - 1)
+        lcs = len(query) - np.unpackbits(low.view(np.uint8)).reshape(len(ids), 64).sum(axis=1)
+        total = len(query) + self.lengths[ids]
+        return np.where(total > 0, 2.0 * lcs / np.maximum(total, 1), 1.0)
+
+    def _similarity(self, query, i):
+        matcher = self._matchers[i]
+        if matcher is None:
+            matcher = self._matchers[i] = SequenceMatcher(None, '', self.lowered[i])
+        return similarity(query, self.lowered[i], matcher)
+
+    def search(self, query, threshold=0.5, k=3, shortlist=SHORTLIST_SIZE):
+        """
+        Top k (score, food name) with score > threshold, best first.
+
+        Same result as scoring every food in BLS order and keeping the first
+        k after a stable sort by score.
+        """
+        query = query.lower().strip()
+        return self.rerank(query, self.shortlist(query, shortlist), threshold, k)
+
+    def rerank(self, query, candidates, threshold=0.5, k=3, score=None, bound=None):
+        """
+        Exact top k for a lowercased query: candidates are scored, every other
+        food only if an upper bound of its score can still reach the top k.
+
+        Default score: the suggester similarity; candidates must include every
+        food containing the query (shortlist() does), since only those can
+        earn the substring bonus. A custom score(query, food name) needs
+        bound(ratio_upper) → upper bound of the score for foods whose
+        SequenceMatcher ratio is at most ratio_upper (vectorized).
+        """
+        if score is not None and bound is None:
+            raise ValueError("a custom score needs bound= (upper bound of the score from the ratio bound)")
+
+        def value(i):
+            return self._similarity(query, i) if score is None else score(query, self.lowered[i])
+
+        def upper_bound(ratio_upper):
+            return ratio_upper if score is None else bound(ratio_upper)
+
+        candidates = np.asarray(candidates, dtype=np.int64)
+        scored = {int(i): value(i) for i in candidates}
+
+        # Default score: foods outside the candidates can't get the substring
+        # bonus (they miss a query trigram), so the ratio bound is their bound.
+        floor = threshold
+        passing = sorted((s for s in scored.values() if s > threshold), reverse=True)
+        if len(passing) >= k:
+            floor = max(floor, passing[k - 1])
+        upper = upper_bound(self.ratio_bound(query))
+        upper[candidates] = -np.inf
+        rest = np.flatnonzero(upper >= floor)
+        for i in rest[upper_bound(self.lcs_bound(query, rest)) >= floor]:
+            scored[int(i)] = value(i)
+
+        ranked = sorted((i for i, score in scored.items() if score > threshold), key=lambda i: (-scored[i], i))
+        return [(scored[i], self.names[i]) for i in ranked[:k]]
+
+    def search_linear(self, query, threshold=0.5, k=3):
+        """Reference: score every food (the suggesters' old loop)."""
+        query = query.lower().strip()
+        matches = []
+        for name, lowered in zip(self.names, self.lowered):
+            score = similarity(query, lowered)
+            if score > threshold:
+                matches.append((score, name))
+        matches.sort(key=lambda match: match[0], reverse=True)
+        return matches[:k]
+
+
+# ==========================================
+# BATCH MODE: CHARACTER N-GRAM TF-IDF
+# ==========================================
+def char_ngrams(text, ngram_range=NGRAM_RANGE):
+    """Character n-grams of ' text ' (padded, so word starts/ends count), with repeats."""
+    padded = f' {text} '
+    low, high = ngram_range
+    return [padded[i:i + n] for n in range(low, high + 1) for i in range(len(padded) - n + 1)]
+
+
+class TfidfIndex:
+    """L2-normalized character n-gram TF-IDF vectors of food names, for batch top-k cosine retrieval."""
+
+    def __init__(self, names, ngram_range=NGRAM_RANGE):
+        self.names = [name if isinstance(name, str) else '' for name in names]
+        self.lowered = [name.lower() for name in self.names]
+        self.ngram_range = ngram_range
+
+        doc_grams = [char_ngrams(name, ngram_range) for name in self.lowered]
+        self.vocabulary = {}
+        doc_freq = []
+        for grams in doc_grams:
+            for gram in set(grams):
+                j = self.vocabulary.setdefault(gram, len(doc_freq))
+                if j == len(doc_freq):
+                    doc_freq.append(0)
+                doc_freq[j] += 1
+        # Smoothed idf, as in scikit-learn's TfidfVectorizer
+        n_docs = len(self.names)
+        self.idf = np.array([math.log((1 + n_docs) / (1 + df)) + 1.0 for df in doc_freq])
+
+        indptr, indices, data = self._vectorize(doc_grams)
+        if sparse is not None:
+            foods = sparse.csr_matrix((data, indices, indptr), shape=(n_docs, len(self.vocabulary)))
+            self._foods_t = foods.T.tocsr()  # n-grams × foods
+        else:
+            # Posting list per n-gram: (food ids, weights)
+            order = np.argsort(indices, kind='stable')
+            rows = np.repeat(np.arange(n_docs), np.diff(indptr))[order]
+            weights = data[order]
+            bounds = np.searchsorted(indices[order], np.arange(len(self.vocabulary) + 1))
+            self._postings = [(rows[a:b], weights[a:b]) for a, b in zip(bounds[:-1], bounds[1:])]
+
+        self._trigram_index = None
+
+    def __len__(self):
+        return len(self.names)
+
+    @property
+    def trigram_index(self):
+        """TrigramIndex over the same names (built on first use)."""
+        if self._trigram_index is None:
+            self._trigram_index = TrigramIndex(self.names)
+        return self._trigram_index
+
+    def _vectorize(self, doc_grams):
+        """CSR parts (indptr, indices, data) of the TF-IDF rows; unknown n-grams are dropped."""
+        indptr = [0]
+        indices = []
+        data = []
+        for grams in doc_grams:
+            counts = {}
+            for gram in grams:
+                j = self.vocabulary.get(gram)
+                if j is not None:
+                    counts[j] = counts.get(j, 0) + 1
+            cols = np.fromiter(counts, dtype=np.int64, count=len(counts))
+            weights = np.fromiter(counts.values(), dtype=np.float64, count=len(counts)) * self.idf[cols]
+            norm = np.sqrt(np.dot(weights, weights))
+            indices.append(cols)
+            data.append(weights / norm if norm > 0 else weights)
+            indptr.append(indptr[-1] + len(cols))
+        return (np.asarray(indptr, dtype=np.int64),
+                np.concatenate(indices) if indices else np.zeros(0, dtype=np.int64),
+                np.concatenate(data) if data else np.zeros(0))
+
+    def _similarities(self, indptr, indices, data):
+        """Dense cosine block (rows × foods) for CSR query rows."""
+        n_rows = len(indptr) - 1
+        if sparse is not None:
+            queries = sparse.csr_matrix((data, indices, indptr), shape=(n_rows, len(self.vocabulary)))
+            return (queries @ self._foods_t).toarray()
+        sims = np.zeros((n_rows, len(self.names)))
+        for r in range(n_rows):
+            for j, weight in zip(indices[indptr[r]:indptr[r + 1]], data[indptr[r]:indptr[r + 1]]):
+                food_ids, food_weights = self._postings[j]
+                sims[r, food_ids] += weight * food_weights
+        return sims
+
+    def top_k(self, queries, k=TFIDF_CANDIDATES, chunk=TFIDF_CHUNK):
+        """
+        Best k foods per query by cosine: (ids, sims), both shape (len(queries), k), best first.
+
+        Slots without a food sharing any n-gram hold id -1 and cosine 0.
+        """
+        queries = [query.lower().strip() for query in queries]
+        k = min(k, len(self.names))
+        ids = np.full((len(queries), k), -1, dtype=np.int64)
+        sims = np.zeros((len(queries), k))
+        if k == 0:
+            return ids, sims
+        for start in range(0, len(queries), chunk):
+            block = queries[start:start + chunk]
+            cosine = self._similarities(*self._vectorize([char_ngrams(q, self.ngram_range) for q in block]))
+            top = np.argpartition(-cosine, k - 1, axis=1)[:, :k]
+            top_sims = np.take_along_axis(cosine, top, axis=1)
+            order = np.lexsort((top, -top_sims), axis=1)  # cosine desc, then BLS order
+            top = np.take_along_axis(top, order, axis=1)
+            top_sims = np.take_along_axis(top_sims, order, axis=1)
+            ids[start:start + len(block)] = np.where(top_sims > 0, top, -1)
+            sims[start:start + len(block)] = top_sims
+        return ids, sims
+
+    def search_batch(self, queries, threshold=0.5, k=3, candidates=TFIDF_CANDIDATES, score=None, bound=None):
+        """
+        Top k (score, food name) with score > threshold for every query, best first.
+
+        The cosine top `candidates` foods plus the trigram shortlist of each
+        query are scored first; TrigramIndex.rerank then scores every other
+        food whose score bound can still reach the top k, so the result is
+        the same as a full scan. score / bound as in TrigramIndex.rerank
+        (default: the suggester similarity).
+        """
+        index = self.trigram_index
+        ids, _ = self.top_k(queries, candidates)
+        results = []
+        for query, row in zip(queries, ids):
+            query = query.lower().strip()
+            seeds = np.union1d(row[row >= 0], index.shortlist(query))
+            results.append(index.rerank(query, seeds, threshold, k, score=score, bound=bound))
+        return results
@@ -0,0 +1,92 @@
+"""
+Extraction Journal
+==================
+
+Append-only JSONL journal of extracted recipes, so an interrupted
+recipe_schema_extraction.py run (timeout, network error, Ctrl-C) can be
+resumed without re-fetching what was already done.
+
+  - every extracted recipe is appended as one line {"url": ..., "result": {...}}
+    and fsync'ed before the next one starts
+  - on restart, journaled URLs are skipped
+  - recipe_database.csv is materialized from the journal (export order)
+  - after a complete run the journal is removed
+
+Only successful extractions are journaled; failed URLs are retried on the
+next run. A torn last line (crash during write) is ignored on load.
+
+Usage:
+  journal = ExtractionJournal(EXTRACTION_JOURNAL)
+  done = journal.load()          # url → result
+  journal.append(url, result)
+  results = journal.materialize(urls)
+  journal.remove()
+"""
+
+import json
+import os
+
+import numpy as np
+
+
+def _json_default(value):
+    """numpy scalars (BLS values, pandas cells) → Python numbers."""
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class ExtractionJournal:
+    """Durable url → extraction result log (see module docstring)."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def load(self):
+        """Journaled results by URL (later entries win)."""
+        results = {}
+        if not self.exists():
+            return results
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    results[entry['url']] = entry['result']
+                except (ValueError, KeyError, TypeError):
+                    continue  # Torn / corrupt line
+        return results
+
+    def append(self, url, result):
+        """Append one result and force it to disk."""
+        if self._file is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._file = open(self.path, 'a', encoding='utf-8')
+        line = json.dumps({'url': url, 'result': result}, ensure_ascii=False, default=_json_default)
+        self._file.write(line + '\n')
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def materialize(self, urls, fallback=None):
+        """Journaled results for `urls`, in that order (missing URLs skipped).
+
+        URLs not in the journal are taken from `fallback` (url → result), e.g.
+        the unchanged rows of an incremental run.
+        """
+        results = self.load()
+        fallback = fallback or {}
+        return [results[url] if url in results else fallback[url]
+                for url in urls if url in results or url in fallback]
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def remove(self):
+        self.close()
+        if self.exists():
+            os.remove(self.path)
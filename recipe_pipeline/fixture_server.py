@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Local Cookidoo Stand-in Server
+==============================
+
+Serves recipe pages for offline scraper tests and benchmarks:
+
+  - recorded pages from the page archive (data/.cache/pages.archive,
+    see page_archive.py), looked up by URL path, or
+  - synthetic Cookidoo-like pages (JSON-LD Recipe + filler markup),
+    deterministic per URL path
+
+with configurable latency, jitter, page size and injected 429 (with
+Retry-After) / 5xx responses.
+
+Usage:
+  python fixture_server.py --port 8800 --latency-ms 200 --jitter-ms 50
+  python fixture_server.py --source archive --throttle-rate 0.05 --error-rate 0.02
+
+  # then e.g. http://127.0.0.1:8800/recipes/recipe/de-DE/r123
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+SYNTHETIC_INGREDIENTS = [
+    "2 Zwiebeln", "1 Knoblauchzehe", "20 g Olivenöl", "200 g Reis", "½ Bund Petersilie, frisch",
+    "100 ml Milch", "2 Eier", "400 g Tomaten (stückig)", "50 g Butter", "1 Prise Zucker",
+    "250 g Weizenmehl", "1 rote Paprika", "500 g Kartoffeln", "100 g Sahne", "30 g Emmentaler Käse, gerieben",
+    "¼ TL Pfeffer", "1 TL Salz", "10 g Ingwer, frisch", "2 Karotten", "200 g Linsen",
+]
+
+
+def synthetic_page(rng, size_kb):
+    """Recipe page with nav/markup/inline scripts around a JSON-LD block (sometimes in @graph)."""
+    recipe = {
+        '@context': 'https://schema.org',
+        '@type': rng.choice(['Recipe', ['Recipe']]),
+        'name': f'Testrezept {rng.randint(1, 10**6)}',
+        'recipeIngredient': rng.sample(SYNTHETIC_INGREDIENTS, rng.randint(5, 12)),
+        'recipeYield': f'{rng.randint(2, 6)} Portionen',
+        'nutrition': {'calories': f'{rng.randint(200, 900)} kcal', 'proteinContent': f'{rng.randint(5, 50)} g'},
+    }
+    if rng.random() < 0.3:
+        recipe = {'@context': 'https://schema.org', '@graph': [{'@type': 'WebPage', 'name': 'x'}, recipe]}
+
+    filler = []
+    filler_size = 0
+    while filler_size < size_kb * 1024:
+        part = (f'<div class="core-tile"><a href="/r{rng.randint(1, 10**6)}">'
+                f'<img src="/i.jpg" alt="Bild"><span>Rezept {rng.random():.6f}</span></a></div>\n')
+        if rng.random() < 0.02:
+            part += '<script>window.dataLayer = window.dataLayer || []; dataLayer.push({"a": 1});</script>\n'
+        filler.append(part)
+        filler_size += len(part)
+    body = ''.join(filler)
+    ld = '<script type="application/ld+json">' + json.dumps(recipe, ensure_ascii=False) + '</script>'
+    head = ('<!DOCTYPE html><html lang="de"><head><meta charset="utf-8"><title>Rezept</title>'
+            '<script type="application/ld+json">{"@type": "Organization", "name": "Cookidoo"}</script>')
+    if rng.random() < 0.5:
+        return (head + ld + '</head><body>' + body + '</body></html>').encode('utf-8')
+    return (head + '</head><body>' + body + ld + '</body></html>').encode('utf-8')
+
+
+class FixtureOptions:
+    """Behaviour of the stand-in server."""
+
+    def __init__(self, latency_ms=100, jitter_ms=0, error_rate=0.0, throttle_rate=0.0,
+                 retry_after=1, page_kb=300, archive=None, seed=42):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.page_kb = page_kb
+        self.archive = archive  # PageArchive or None (synthetic pages)
+        self.seed = seed
+
+
+def make_handler(options):
+    rng = random.Random(options.seed)
+    lock = threading.Lock()
+    archived = {}
+    if options.archive is not None:
+        archived = {urlparse(url).path: url for url in options.archive.index}
+
+    class FixtureHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            with lock:
+                delay = options.latency_ms + rng.uniform(-options.jitter_ms, options.jitter_ms)
+                roll = rng.random()
+            time.sleep(max(0.0, delay) / 1000)
+
+            if roll < options.throttle_rate:
+                return self._send(429, b'Too Many Requests', {'Retry-After': str(options.retry_after)})
+            if roll < options.throttle_rate + options.error_rate:
+                return self._send(503, b'Service Unavailable')
+
+            path = urlparse(self.path).path
+            if options.archive is not None:
+                url = archived.get(path)
+                body = options.archive.get(url) if url else None
+                if body is None:
+                    return self._send(404, b'Not Found')
+            else:
+                page_seed = int(hashlib.sha1(path.encode('utf-8')).hexdigest()[:8], 16)
+                body = synthetic_page(random.Random(page_seed), options.page_kb)
+            self._send(200, body, {'Content-Type': 'text/html; charset=utf-8'})
+
+        def _send(self, status, body, headers=None):
+            self.send_response(status)
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return FixtureHandler
+
+
+def start_server(options, host='127.0.0.1', port=0):
+    """Start the server in a background thread. Returns (server, base_url)."""
+    server = ThreadingHTTPServer((host, port), make_handler(options))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def add_server_arguments(parser):
+    parser.add_argument('--source', choices=['synthetic', 'archive'], default='synthetic')
+    parser.add_argument('--latency-ms', type=float, default=100)
+    parser.add_argument('--jitter-ms', type=float, default=0)
+    parser.add_argument('--error-rate', type=float, default=0.0, help='share of 503 responses')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='share of 429 responses')
+    parser.add_argument('--retry-after', type=int, default=1, help='Retry-After seconds on 429')
+    parser.add_argument('--page-kb', type=int, default=300, help='synthetic page size')
+    parser.add_argument('--seed', type=int, default=42)
+
+
+def options_from_args(args):
+    archive = None
+    if args.source == 'archive':
+        from page_archive import PageArchive
+        archive = PageArchive()
+    return FixtureOptions(args.latency_ms, args.jitter_ms, args.error_rate, args.throttle_rate,
+                          args.retry_after, args.page_kb, archive, args.seed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local Cookidoo stand-in server')
+    parser.add_argument('--port', type=int, default=8800)
+    add_server_arguments(parser)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(('127.0.0.1', args.port), make_handler(options_from_args(args)))
+    print(f"✓ Fixture server on http://127.0.0.1:{args.port}/recipes/recipe/de-DE/r<N> ({args.source})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
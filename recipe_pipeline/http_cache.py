@@ -0,0 +1,131 @@
+"""
+HTTP Response Cache
+===================
+
+On-disk cache for recipe pages, keyed by URL, in data/.cache/http/:
+
+  <sha1(url)>.html.gz   response body (gzip)
+  <sha1(url)>.json      url, ETag, Last-Modified, fetched_at
+
+get(url):
+  - cached and younger than the TTL     → served from disk, no request  (hit)
+  - cached but older                    → conditional GET with
+    If-None-Match / If-Modified-Since; 304 → served from disk           (revalidated)
+  - not cached or page changed          → normal download, stored       (miss)
+
+Thread-safe (one file pair per URL, atomic writes), so it can be used from
+the AsyncFetcher worker threads.
+
+Usage:
+  cache = HttpCache(HTTP_CACHE_DIR, ttl=HTTP_CACHE_TTL)
+  body = cache.get(url, headers=HEADERS, timeout=REQUEST_TIMEOUT)
+  print(cache.summary())
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+
+import requests
+
+from recipe_config import DATA_DIR, HTTP_CACHE_TTL
+
+HTTP_CACHE_DIR = os.path.join(DATA_DIR, '.cache', 'http')
+
+
+class HttpCache:
+    """URL → compressed body cache with conditional revalidation."""
+
+    def __init__(self, directory=HTTP_CACHE_DIR, ttl=HTTP_CACHE_TTL, session=None):
+        self.directory = directory
+        self.ttl = ttl
+        self.session = session or requests
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _paths(self, url):
+        key = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        base = os.path.join(self.directory, key)
+        return base + '.json', base + '.html.gz'
+
+    def _load(self, url):
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            with gzip.open(body_path, 'rb') as f:
+                body = f.read()
+        except (OSError, ValueError, EOFError):
+            return None, None
+        if meta.get('url') != url:
+            return None, None
+        return meta, body
+
+    def _store(self, url, response, body):
+        meta_path, body_path = self._paths(url)
+        meta = {
+            'url': url,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'fetched_at': time.time(),
+        }
+        os.makedirs(self.directory, exist_ok=True)
+        if body is not None:
+            with gzip.open(body_path + '.tmp', 'wb', compresslevel=6) as f:
+                f.write(body)
+            os.replace(body_path + '.tmp', body_path)
+        with open(meta_path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(meta_path + '.tmp', meta_path)
+
+    def is_fresh(self, url):
+        """True if get(url) would be served from disk without any request."""
+        meta_path, body_path = self._paths(url)
+        if not os.path.exists(body_path):
+            return False  # Body lost (e.g. cleaned up): get() has to fetch again
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return False
+        return meta.get('url') == url and time.time() - meta.get('fetched_at', 0) < self.ttl
+
+    def _count(self, attr):
+        with self._lock:
+            setattr(self, attr, getattr(self, attr) + 1)
+
+    def get(self, url, headers=None, timeout=None):
+        """Response body (bytes) for url. Raises requests exceptions like requests.get."""
+        meta, body = self._load(url)
+        if meta is not None and time.time() - meta.get('fetched_at', 0) < self.ttl:
+            self._count('hits')
+            return body
+
+        request_headers = dict(headers or {})
+        if meta is not None:
+            if meta.get('etag'):
+                request_headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                request_headers['If-Modified-Since'] = meta['last_modified']
+
+        response = self.session.get(url, headers=request_headers, timeout=timeout)
+        if response.status_code == 304 and meta is not None:
+            # Keep the cached validators if the 304 doesn't repeat them
+            response.headers.setdefault('ETag', meta.get('etag'))
+            response.headers.setdefault('Last-Modified', meta.get('last_modified'))
+            self._store(url, response, None)
+            self._count('revalidated')
+            return body
+
+        response.raise_for_status()
+        self._store(url, response, response.content)
+        self._count('misses')
+        return response.content
+
+    def summary(self):
+        return f"{self.hits} Treffer, {self.revalidated} revalidiert (304), {self.misses} geladen"
@@ -0,0 +1,288 @@
+"""
+Ingredient Matcher
+==================
+
+Matches parsed ingredient names to BLS foods via the manual mapping table
+(ingredient_mappings.csv / MANUAL_INGREDIENT_MAP).
+
+Matching rule (same as the old match_ingredient_to_bls in the scripts):
+  - the longest mapping key contained in the lowercased ingredient name wins
+    (equal lengths: earlier mapping entry wins)
+  - its BLS entry resolves to the first BLS food whose name contains the
+    entry text (case-insensitive)
+  - keys whose entry matches no BLS food are skipped
+
+The key → BLS row id resolution is done once and persisted in
+data/.cache/ingredient_mappings_resolved.json. It is rebuilt when the
+mappings or the BLS CSV change, so matching an ingredient costs one key
+lookup plus one row fetch.
+
+The longest key is found with an Aho–Corasick automaton built from the
+resolved keys: one pass over the ingredient string, independent of the
+number of mapping keys (see benchmark_matcher.py).
+
+Match results are memoized per ingredient name in a MatchCache: a bounded
+LRU in memory, persisted to data/.cache/ingredient_match_cache.json and
+stamped with the mappings + BLS hashes, so a recompute with unchanged
+mappings skips matching entirely.
+
+Usage:
+  from ingredient_matcher import load_matcher, load_match_cache
+  matcher = load_matcher(manual_map)
+  row = matcher.match('rote zwiebel')   # BLS row id or None
+
+  match_cache = load_match_cache(matcher)
+  row = match_cache.match('rote zwiebel')
+  match_cache.save()
+"""
+
+import hashlib
+import json
+import os
+from collections import OrderedDict
+
+from recipe_config import BLS_DATABASE, DATA_DIR
+from bls_loader import NAME_COLUMN, load_bls, source_fingerprint
+
+PATH_INGREDIENT_MAPPINGS = os.path.join(DATA_DIR, 'ingredient_mappings.csv')
+RESOLVED_FILE = 'ingredient_mappings_resolved.json'
+MATCH_CACHE_FILE = 'ingredient_match_cache.json'
+MATCH_CACHE_SIZE = 20000
+
+
+def mapping_hash(manual_map):
+    """Content hash of a mapping table (order matters for tie-breaking)."""
+    payload = json.dumps(list(manual_map.items()), ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def resolve_mapping_table(manual_map, bls_names):
+    """
+    Resolve every mapping key to a BLS row id (None if the entry matches no food).
+
+    Uses the same case-insensitive substring test as
+    `Series.str.contains(val, case=False, regex=False)`.
+    """
+    upper_names = [name.upper() if isinstance(name, str) else None for name in bls_names]
+    row_by_entry = {}
+    resolved = {}
+    for key, entry in manual_map.items():
+        if entry not in row_by_entry:
+            row_by_entry[entry] = None
+            if isinstance(entry, str):
+                upper_entry = entry.upper()
+                for i, name in enumerate(upper_names):
+                    if name is not None and upper_entry in name:
+                        row_by_entry[entry] = i
+                        break
+        resolved[key] = row_by_entry[entry]
+    return resolved
+
+
+class KeywordAutomaton:
+    """
+    Aho–Corasick automaton over a list of keys given in priority order.
+
+    best(text) returns the index of the highest-priority (lowest index) key
+    that occurs anywhere in text, in a single pass over text.
+    """
+
+    def __init__(self, keys):
+        self.goto = [{}]
+        self.fail = [0]
+        self.best_out = [None]
+
+        for idx, key in enumerate(keys):
+            state = 0
+            for ch in key:
+                nxt = self.goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[state][ch] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.best_out.append(None)
+                state = nxt
+            if self.best_out[state] is None:
+                self.best_out[state] = idx
+
+        # Breadth-first: failure links, and merge the best output of the
+        # failure state (a key ending here may also end a shorter suffix key)
+        queue = list(self.goto[0].values())
+        for state in queue:
+            for ch, nxt in self.goto[state].items():
+                queue.append(nxt)
+                f = self.fail[state]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(ch, 0)
+                inherited = self.best_out[self.fail[nxt]]
+                if inherited is not None and (self.best_out[nxt] is None or inherited < self.best_out[nxt]):
+                    self.best_out[nxt] = inherited
+
+    def best(self, text):
+        goto, fail, best_out = self.goto, self.fail, self.best_out
+        state = 0
+        best = None
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            out = best_out[state]
+            if out is not None and (best is None or out < best):
+                best = out
+                if best == 0:
+                    break
+        return best
+
+
+class IngredientMatcher:
+    """Longest-key matcher over a pre-resolved key → BLS row id table."""
+
+    def __init__(self, manual_map, resolved, stamp=None):
+        self.manual_map = dict(manual_map)
+        self.resolved = resolved
+        self.stamp = stamp  # Mappings + BLS hashes this table was resolved from
+        # Longest key first; sorted() is stable, so equal lengths keep mapping order
+        self.keys = [
+            key for key in sorted(self.manual_map, key=len, reverse=True)
+            if isinstance(key, str) and resolved.get(key) is not None
+        ]
+        self.automaton = KeywordAutomaton(self.keys)
+
+    def match_key(self, ingredient_name):
+        """The mapping key that wins for an ingredient name (None if no match)."""
+        idx = self.automaton.best(ingredient_name.lower())
+        return None if idx is None else self.keys[idx]
+
+    def match_key_linear(self, ingredient_name):
+        """Reference implementation of match_key (linear scan over all keys)."""
+        name = ingredient_name.lower()
+        for key in self.keys:
+            if key in name:
+                return key
+        return None
+
+    def match(self, ingredient_name):
+        """BLS row id for an ingredient name (None if no match)."""
+        key = self.match_key(ingredient_name)
+        return None if key is None else self.resolved[key]
+
+
+def _cache_path(mappings_path, filename):
+    return os.path.join(os.path.dirname(os.path.abspath(mappings_path)), '.cache', filename)
+
+
+def _write_cache_json(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def load_matcher(manual_map, bls_path=BLS_DATABASE, bls_names=None,
+                 mappings_path=PATH_INGREDIENT_MAPPINGS):
+    """
+    Build an IngredientMatcher, reusing the persisted resolution table when
+    it was built from the same mappings and the same BLS CSV.
+
+    bls_names (row order of load_bls) is only needed when the table has to
+    be rebuilt; if omitted, the name column is loaded on demand.
+    """
+    cache_path = _cache_path(mappings_path, RESOLVED_FILE)
+    stamp = {
+        'mappings_sha256': mapping_hash(manual_map),
+        'bls_sha256': source_fingerprint(bls_path)['sha256'],
+    }
+
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+        if cached.get('stamp') == stamp:
+            return IngredientMatcher(manual_map, cached['resolved'], stamp)
+    except (OSError, ValueError):
+        pass
+
+    if bls_names is None:
+        bls_names = load_bls(bls_path, columns=[]).loc[:, NAME_COLUMN].tolist()
+    resolved = resolve_mapping_table(manual_map, bls_names)
+
+    try:
+        _write_cache_json(cache_path, {'stamp': stamp, 'resolved': resolved})
+    except OSError as e:
+        print(f"  Warning: could not persist resolved mappings: {e}")
+
+    return IngredientMatcher(manual_map, resolved, stamp)
+
+
+# ==========================================
+# MATCH CACHE
+# ==========================================
+class MatchCache:
+    """
+    Memoized IngredientMatcher.match() keyed by the lowercased ingredient name.
+
+    Bounded LRU in memory; save() persists it together with the matcher's
+    stamp. Entries from a different stamp (changed mappings or BLS) are
+    discarded on load.
+    """
+
+    def __init__(self, matcher, path=None, max_size=MATCH_CACHE_SIZE):
+        self.matcher = matcher
+        self.path = path
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+        if path and os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    cached = json.load(f)
+                if cached.get('stamp') == matcher.stamp:
+                    self.update(cached['entries'])
+            except (OSError, ValueError, KeyError):
+                pass
+
+    def match(self, ingredient_name):
+        """BLS row id for an ingredient name (None if no match)."""
+        name = ingredient_name.lower()
+        if name in self.entries:
+            self.hits += 1
+            self.entries.move_to_end(name)
+            return self.entries[name]
+
+        self.misses += 1
+        row = self.matcher.match(name)
+        self.put(name, row)
+        return row
+
+    def put(self, name, row):
+        """Insert (or refresh) a lowercased name → row entry, evicting the least recently used."""
+        self.entries[name] = row
+        self.entries.move_to_end(name)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def update(self, entries):
+        """put() every entry of a dict, e.g. new entries from worker processes."""
+        for name, row in entries.items():
+            self.put(name, row)
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return (self.hits / lookups * 100) if lookups else 0.0
+
+    def save(self):
+        if not self.path:
+            return
+        try:
+            _write_cache_json(self.path, {'stamp': self.matcher.stamp, 'entries': self.entries})
+        except OSError as e:
+            print(f"  Warning: could not persist match cache: {e}")
+
+
+def load_match_cache(matcher, mappings_path=PATH_INGREDIENT_MAPPINGS, max_size=MATCH_CACHE_SIZE):
+    """MatchCache persisted next to ingredient_mappings.csv (data/.cache/)."""
+    return MatchCache(matcher, _cache_path(mappings_path, MATCH_CACHE_FILE), max_size)
@@ -11,10 +11,25 @@ Examples:
   "1 rote paprika" → "paprika"  (with variant "rot")
   "30 g mehl" → "mehl"
   "2 prisen muskat" → "muskat"
+
+Ingredient grammar (shared by parse_ingredient, recipe_schema_extraction.py
+and recipe_add_audit_trails.py via parse_recipe_ingredients):
+  amount   = quantity [unit]          unit as whole word, see QUANTITY_UNITS
+  quantity = number [("-" | "–") number]     ranges → mean, "2-3" → 2.5
+  number   = 1 | 1.5 | 1,5 | 1/2 | ½ | 1½ | 1 ½   (½ ¼ ¾ ⅓ ⅔ ⅛ ⅜ ⅝ ⅞ ⅕)
+
+Batches:
+  parse_many(strings) parses every distinct string once and returns
+  columnar results (base_names, quantities, units, variants). For a pandas
+  Series, parse_many(series).to_frame() gives one row per element.
+  Streaming callers can pass a bounded ParseMemo across calls.
 """
 
+import html
 import re
-from typing import Tuple
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Iterable, List, NamedTuple, Optional, Tuple
 
 # Common quantity units (German)
 QUANTITY_UNITS = [
@@ -31,7 +46,9 @@ QUANTITY_UNITS = [
     'stück', 'stücke',         # piece
     'scheibe', 'scheiben',     # slice
     'tropfen',                 # drop
+    'msp',                     # Messerspitze
     'halter', 'zweig', 'zweige', # branch
+    'tsp', 'tbsp', 'cup',      # English recipes
 ]
 
 # Modifiers that indicate preparation/form (not part of base name)
@@ -63,6 +80,173 @@ COLOR_MAPPING = {
 }
 
 
+# Unicode vulgar fractions
+FRACTIONS = {
+    '½': 1 / 2, '¼': 1 / 4, '¾': 3 / 4, '⅓': 1 / 3, '⅔': 2 / 3,
+    '⅛': 1 / 8, '⅜': 3 / 8, '⅝': 5 / 8, '⅞': 7 / 8, '⅕': 1 / 5,
+}
+
+# Qualifiers removed from recipe ingredient names (parse_recipe_ingredients)
+RECIPE_QUALIFIERS = ['frisch', 'getrocknet', 'gefroren', 'roh', 'gekocht', 'tk', 'tiefgekühlt']
+RECIPE_MEASURE_WORDS = ['stängel', 'stengel', 'bund', 'blatt', 'blätter']
+
+
+# ==========================================
+# INGREDIENT GRAMMAR
+# ==========================================
+_FRACTION_CLASS = '[' + ''.join(FRACTIONS) + ']'
+NUMBER_PATTERN = rf'(?:\d+(?:/\d+|(?:[.,]\d+)?(?:\s*{_FRACTION_CLASS})?)|{_FRACTION_CLASS})'
+QUANTITY_PATTERN = rf'{NUMBER_PATTERN}(?:\s*[-–]\s*{NUMBER_PATTERN})?'
+
+
+def _trie_pattern(words):
+    """Alternation of words as a prefix trie ("g|kg|ml|l" → "g|kg|ml|l" per first letter).
+
+    Longer continuations are tried first, so it matches like a longest-first
+    alternation, but without re-scanning shared prefixes.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node):
+        branches = [re.escape(char) + build(child) for char, child in node.items() if char]
+        if not branches:
+            return ''
+        if len(branches) == 1 and '' not in node:
+            return branches[0]
+        group = '(?:' + '|'.join(branches) + ')'
+        return group + '?' if '' in node else group
+
+    return build(trie)
+
+
+UNIT_PATTERN = _trie_pattern(QUANTITY_UNITS)
+
+# Leading amount: quantity + optional unit (whole word, longest unit first)
+AMOUNT_PATTERN = rf'(?P<amount>(?P<quantity>{QUANTITY_PATTERN})(?:\s*(?P<unit>{UNIT_PATTERN})\b\.?)?)\s*(?:,|\.)?\s*'
+AMOUNT_RE = re.compile('^' + AMOUNT_PATTERN, re.IGNORECASE)
+NUMBER_RE = re.compile(rf'\d+/\d+|\d+(?:[.,]\d+)?|{_FRACTION_CLASS}')
+
+_QUALIFIERS = '|'.join(RECIPE_QUALIFIERS)
+QUALIFIER_AFTER_COMMA_RE = re.compile(rf',\s*({_QUALIFIERS})', re.IGNORECASE)
+QUALIFIER_TRAILING_RE = re.compile(rf'\s+({_QUALIFIERS})$', re.IGNORECASE)
+MEASURE_WORD_RE = re.compile(rf'^({"|".join(RECIPE_MEASURE_WORDS)})\s+', re.IGNORECASE)
+PARENTHESES_RE = re.compile(r'\s*\(.*?\)')
+
+
+def parse_number(number_str: str) -> float:
+    """'1.5', '1,5', '1/2', '½', '1½' / '1 ½' → float."""
+    value = 0.0
+    for token in NUMBER_RE.findall(number_str):
+        if token in FRACTIONS:
+            value += FRACTIONS[token]
+        elif '/' in token:
+            numerator, denominator = token.split('/')
+            value += int(numerator) / int(denominator) if int(denominator) else 0.0
+        else:
+            value += float(token.replace(',', '.'))
+    return value
+
+
+def parse_quantity(quantity_str: str) -> float:
+    """Quantity text → float; ranges ('2-3', '1 – 2') give the mean."""
+    parts = re.split(r'\s*[-–]\s*', quantity_str.strip(), maxsplit=1)
+    values = [parse_number(part) for part in parts if part]
+    return sum(values) / len(values) if values else 1.0
+
+
+@lru_cache(maxsize=65536)
+def parse_recipe_ingredient(ingredient_str: str) -> Tuple[str, float, str, str, bool]:
+    """
+    Parse one recipeIngredient line (already HTML-unescaped).
+
+    Returns:
+        Tuple of (name, qty, qty_str, unit, has_qty), e.g.
+        ("Ingwer", 10.0, "10 g", "g", True) for "10 g Ingwer, frisch".
+        Without leading amount: qty 1.0, qty_str '1', unit '', has_qty False.
+    """
+    ingredient_str = ingredient_str.strip()
+    match = AMOUNT_RE.match(ingredient_str)
+    if match:
+        name = ingredient_str[match.end():]
+        qty, qty_str = parse_quantity(match.group('quantity')), match.group('amount').strip()
+        unit, has_qty = (match.group('unit') or '').lower(), True
+    else:
+        name, qty, qty_str, unit, has_qty = ingredient_str, 1.0, '1', '', False
+
+    name = QUALIFIER_AFTER_COMMA_RE.sub('', name)
+    name = QUALIFIER_TRAILING_RE.sub('', name)
+    name = MEASURE_WORD_RE.sub('', name)
+    name = PARENTHESES_RE.sub('', name).strip()
+    return name, qty, qty_str, unit, has_qty
+
+
+def parse_recipe_ingredients(schema_data) -> List[dict]:
+    """
+    Ingredients of a schema.org Recipe as dicts (original, name, qty, qty_str, unit, has_qty).
+    Used by recipe_schema_extraction.py and recipe_add_audit_trails.py.
+    """
+    ingredient_list = schema_data.get('recipeIngredient', [])
+    if isinstance(ingredient_list, str):
+        ingredient_list = [ingredient_list]
+
+    ingredients = []
+    for ingredient_str in ingredient_list:
+        # Decode HTML entities (&frac14; -> ¼, &frac12; -> ½, etc.)
+        ingredient_str = html.unescape(ingredient_str)
+        name, qty, qty_str, unit, has_qty = parse_recipe_ingredient(ingredient_str)
+        ingredients.append({'original': ingredient_str, 'name': name, 'qty': qty, 'qty_str': qty_str,
+                            'unit': unit, 'has_qty': has_qty})
+    return ingredients
+
+
+# ==========================================
+# COMPILED TOKENIZER
+# ==========================================
+
+# Modifiers in removal order (longest first, as before) with their patterns.
+# Only whole words at the end or after a comma.
+MODIFIER_PATTERNS = [
+    (modifier, re.compile(rf'(\s+|,\s*){modifier}(\s|,|$)', re.IGNORECASE))
+    for modifier in sorted(PREPARATION_MODIFIERS, key=len, reverse=True)
+]
+
+# One scan over the string: which modifiers occur (named group m<i> = MODIFIER_PATTERNS[i])?
+# Most ingredient strings have none, so the per-modifier patterns above only run on a hit.
+ANY_MODIFIER_RE = re.compile(
+    r'[\s,](?:' + '|'.join(f'(?P<m{i}>{modifier})' for i, (modifier, _) in enumerate(MODIFIER_PATTERNS))
+    + r')(?=\s|,|$)',
+    re.IGNORECASE,
+)
+
+MODIFIER_SET = frozenset(PREPARATION_MODIFIERS)
+WHITESPACE_RE = re.compile(r'\s+')
+
+
+def _strip_modifiers(cleaned: str, variant: str) -> Tuple[str, str]:
+    """Remove preparation modifiers; the first one found becomes the variant (if none yet).
+
+    Modifiers are removed in MODIFIER_PATTERNS order. Removing one can expose
+    another, so the string is rescanned after every removal.
+    """
+    next_index = 0
+    while True:
+        present = [int(match.lastgroup[1:]) for match in ANY_MODIFIER_RE.finditer(cleaned)]
+        candidates = [index for index in present if index >= next_index]
+        if not candidates:
+            return cleaned, variant
+        next_index = min(candidates)
+        modifier, pattern = MODIFIER_PATTERNS[next_index]
+        if not variant:
+            variant = modifier
+        cleaned = pattern.sub('', cleaned).strip()
+        next_index += 1
+
+
 def parse_ingredient(ingredient_str: str) -> Tuple[str, str, str]:
     """
     Parse ingredient string into base name, quantity, and variant.
@@ -74,59 +258,49 @@ def parse_ingredient(ingredient_str: str) -> Tuple[str, str, str]:
         Tuple of (base_name, quantity, variant)
         Example: ("ingwer", "10g", "frisch")
     """
+    base_name, quantity, _, variant = _parse_ingredient(ingredient_str)
+    return base_name, quantity, variant
+
+
+def _parse_ingredient(ingredient_str: str) -> Tuple[str, str, str, str]:
+    """parse_ingredient plus the unit of the amount: (base_name, quantity, unit, variant), unit lowercased."""
     if not ingredient_str or not isinstance(ingredient_str, str):
-        return "", "", ""
+        return "", "", "", ""
 
-    original = ingredient_str.strip()
+    cleaned = ingredient_str.strip()
     quantity = ""
+    unit = ""
     variant = ""
 
-    # Step 1: Extract leading quantity (numbers + units)
-    # First try: number + unit (e.g., "10 g", "½ bund")
-    quantity_pattern = r'^([\d½⅓¼\s]+(?:' + '|'.join(sorted(QUANTITY_UNITS, key=len, reverse=True)) + r')?\s*(?:,|\.)?\s*)'
-    match = re.match(quantity_pattern, original, re.IGNORECASE)
+    # Step 1: Extract leading amount (quantity + unit), e.g. "10 g", "½ bund", "2-3 el"
+    match = AMOUNT_RE.match(cleaned)
     if match:
-        quantity = match.group(1).strip()
-        cleaned = original[match.end():].strip()
-    else:
-        # Try just a number (e.g., "2 eier")
-        number_match = re.match(r'^([\d½⅓¼]+)\s+', original)
-        if number_match:
-            quantity = number_match.group(1).strip()
-            cleaned = original[number_match.end():].strip()
-        else:
-            cleaned = original
-
-    # Step 2: Capture color prefixes as variants
-    for color_term, color_variant in COLOR_MAPPING.items():
-        if cleaned.lower().startswith(color_term + ' '):
-            variant = color_variant
-            cleaned = cleaned[len(color_term):].strip()
-            break
-
-    # Step 3: Remove trailing modifiers from end
-    for modifier in sorted(PREPARATION_MODIFIERS, key=len, reverse=True):
-        # Only match as whole word at end or after comma
-        pattern = rf'(\s+|,\s*){modifier}(\s|,|$)'
-        if re.search(pattern, cleaned, re.IGNORECASE):
-            if not variant:
-                variant = modifier
-            cleaned = re.sub(pattern, '', cleaned, flags=re.IGNORECASE).strip()
+        quantity = match.group('amount').strip()
+        unit = (match.group('unit') or '').lower()
+        cleaned = cleaned[match.end():].strip()
+
+    # Step 2: Capture color prefixes as variants (first word lookup)
+    first_word, space, _ = cleaned.lower().partition(' ')
+    if space and first_word in COLOR_MAPPING:
+        variant = COLOR_MAPPING[first_word]
+        cleaned = cleaned[len(first_word):].strip()
+
+    # Step 3: Remove trailing modifiers
+    if ANY_MODIFIER_RE.search(cleaned):
+        cleaned, variant = _strip_modifiers(cleaned, variant)
 
     # Step 4: Clean up "ge-" prefix from past participles (e.g., "getrocknetes" → "trocknetes")
-    if cleaned.lower().startswith('ge') and len(cleaned) > 3:
-        # Check if it looks like a past participle
+    if len(cleaned) > 3 and cleaned.lower().startswith('ge'):
         potential = cleaned[2:]
-        if potential.lower() in PREPARATION_MODIFIERS:
+        if potential.lower() in MODIFIER_SET:
             variant = variant or potential.lower()
             cleaned = potential
 
     # Step 5: Final cleanup
-    base_name = cleaned.lower().strip()
-    base_name = re.sub(r'\s+', ' ', base_name)  # Normalize whitespace
+    base_name = WHITESPACE_RE.sub(' ', cleaned.lower().strip())  # Normalize whitespace
     base_name = base_name.rstrip('.,')  # Remove trailing punctuation
 
-    return base_name, quantity, variant
+    return base_name, quantity, unit, variant
 
 
 def normalize_ingredient(ingredient_str: str) -> str:
@@ -139,37 +313,111 @@ def normalize_ingredient(ingredient_str: str) -> str:
     return base_name
 
 
-if __name__ == '__main__':
-    # Test cases
-    test_cases = [
-        "10 g ingwer, frisch",
-        "½ bund koriander",
-        "1 rote paprika",
-        "30 g mehl",
-        "2 prisen muskat",
-        "400 g fusilli aus grünen erbsen, getrocknet",
-        "½ tl paprika edelsüß",
-        "100 g möhren",
-        "20 g speisestärke",
-        "1 eier",
-        "4 eier",
-        "200 g crème fraîche",
-        "1 getrocknetes lorbeerblatt",
-        "½ bund schnittlauch",
-        "4 brötchen",
-        "2 dosen maiskörner",
-        "150 g gouda",
-        "Pizzagewürz",
-        "ingwer, frisch",
-        "paprika edelsüß",
-    ]
+class ParsedIngredients(NamedTuple):
+    """Columnar parse results, aligned with the input order."""
+    base_names: List[str]
+    quantities: List[str]
+    units: List[str]
+    variants: List[str]
+
+    def to_frame(self):
+        """Results as a DataFrame (columns base_name, quantity, unit, variant)."""
+        import pandas as pd
+        return pd.DataFrame({'base_name': self.base_names, 'quantity': self.quantities, 'unit': self.units,
+                             'variant': self.variants})
+
 
+class ParseMemo:
+    """Bounded LRU memo (raw string → (base_name, quantity, unit, variant)) shared across parse_many calls."""
+
+    def __init__(self, maxsize: int = 100_000):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, ingredient_str):
+        result = self._entries.get(ingredient_str)
+        if result is not None:
+            self._entries.move_to_end(ingredient_str)
+        return result
+
+    def put(self, ingredient_str, result):
+        self._entries[ingredient_str] = result
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def parse_many(ingredient_strs: Iterable[str], memo: Optional[ParseMemo] = None) -> ParsedIngredients:
+    """
+    Parse many ingredient strings, each distinct string only once.
+
+    Args:
+        ingredient_strs: Raw ingredient strings (repetitions are cheap), e.g. a
+            pandas Series; parse_many(series).to_frame() is the column-wise
+            counterpart of series.map(parse_ingredient) (plus a unit column)
+        memo: Optional ParseMemo kept by streaming callers across calls
+
+    Returns:
+        ParsedIngredients(base_names, quantities, units, variants), aligned with the input
+    """
+    items = list(ingredient_strs)
+    parsed = {}
+    for item in dict.fromkeys(items):
+        result = memo.get(item) if memo is not None else None
+        if result is None:
+            result = _parse_ingredient(item)
+            if memo is not None:
+                memo.misses += 1
+                memo.put(item, result)
+        elif memo is not None:
+            memo.hits += 1
+        parsed[item] = result
+
+    columns = [parsed[item] for item in items]
+    return ParsedIngredients(
+        [result[0] for result in columns],
+        [result[1] for result in columns],
+        [result[2] for result in columns],
+        [result[3] for result in columns],
+    )
+
+
+# Built-in test cases (also used by benchmark_ingredient_parser.py)
+TEST_CASES = [
+    "10 g ingwer, frisch",
+    "½ bund koriander",
+    "1 rote paprika",
+    "30 g mehl",
+    "2 prisen muskat",
+    "400 g fusilli aus grünen erbsen, getrocknet",
+    "½ tl paprika edelsüß",
+    "100 g möhren",
+    "20 g speisestärke",
+    "1 eier",
+    "4 eier",
+    "200 g crème fraîche",
+    "1 getrocknetes lorbeerblatt",
+    "½ bund schnittlauch",
+    "4 brötchen",
+    "2 dosen maiskörner",
+    "150 g gouda",
+    "Pizzagewürz",
+    "ingwer, frisch",
+    "paprika edelsüß",
+]
+
+
+if __name__ == '__main__':
     print("INGREDIENT PARSING TEST")
     print("=" * 80)
     print(f"{'Input':<45} {'Base Name':<25}")
     print("-" * 80)
 
-    for test in test_cases:
+    for test in TEST_CASES:
         base_name, qty, variant = parse_ingredient(test)
         normalized = normalize_ingredient(test)
         print(f"{test:<45} {normalized:<25}")
@@ -180,6 +428,6 @@ if __name__ == '__main__':
     print(f"{'Input':<40} {'Base':<20} {'Qty':<10} {'Variant':<15}")
     print("-" * 80)
 
-    for test in test_cases:
+    for test in TEST_CASES:
         base_name, qty, variant = parse_ingredient(test)
         print(f"{test:<40} {base_name:<20} {qty:<10} {variant:<15}")
@@ -0,0 +1,100 @@
+"""
+JSON-LD Recipe Extraction
+=========================
+
+Finds the schema.org Recipe object in a recipe page without building a
+full HTML tree: a regex scans the raw response bytes for
+<script type="application/ld+json"> blocks and only those are decoded and
+parsed as JSON.
+
+Recipe lookup (find_recipe) handles:
+  - a Recipe object at top level
+  - "@type" given as a list, e.g. ["Recipe", "NewsArticle"]
+  - top-level lists of objects
+  - "@graph" containers (also nested in lists)
+
+BeautifulSoup (html.parser) stays as fallback when the fast path finds
+no Recipe, e.g. for unusual markup the regex does not cover.
+See benchmark_jsonld.py for a comparison of both paths.
+
+Usage:
+  from jsonld_extract import extract_recipe_jsonld
+  schema_data = extract_recipe_jsonld(response.content)   # dict or None
+"""
+
+import json
+import re
+
+try:
+    from bs4 import BeautifulSoup
+except ImportError:  # Optional: only needed for the fallback
+    BeautifulSoup = None
+
+LD_JSON_SCRIPT = re.compile(
+    rb'<script\b[^>]*?\stype\s*=\s*["\']?application/ld\+json["\']?[^>]*>(.*?)</script\s*>',
+    re.IGNORECASE | re.DOTALL,
+)
+
+
+def is_recipe(item):
+    if not isinstance(item, dict):
+        return False
+    types = item.get('@type')
+    return types == 'Recipe' or (isinstance(types, list) and 'Recipe' in types)
+
+
+def find_recipe(data):
+    """First schema.org Recipe object in a decoded JSON-LD block (None if absent)."""
+    if is_recipe(data):
+        return data
+    if isinstance(data, dict) and '@graph' in data:
+        return find_recipe(data['@graph'])
+    if isinstance(data, list):
+        for item in data:
+            recipe = find_recipe(item)
+            if recipe is not None:
+                return recipe
+    return None
+
+
+def iter_ld_json_blocks(content):
+    """Raw text of every ld+json script block in a page (bytes or str)."""
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    for match in LD_JSON_SCRIPT.finditer(content):
+        yield match.group(1).decode('utf-8')
+
+
+def _recipe_from_blocks(blocks):
+    for block in blocks:
+        try:
+            recipe = find_recipe(json.loads(block))
+        except (json.JSONDecodeError, TypeError):
+            continue
+        if recipe is not None:
+            return recipe
+    return None
+
+
+def extract_recipe_jsonld_fast(content):
+    """Fast path: regex over raw bytes. None if no Recipe was found."""
+    try:
+        return _recipe_from_blocks(iter_ld_json_blocks(content))
+    except UnicodeDecodeError:
+        return None
+
+
+def extract_recipe_jsonld_soup(content):
+    """Reference path: full BeautifulSoup parse."""
+    if BeautifulSoup is None:
+        return None
+    soup = BeautifulSoup(content, 'html.parser')
+    return _recipe_from_blocks(script.string for script in soup.find_all('script', type='application/ld+json'))
+
+
+def extract_recipe_jsonld(content):
+    """schema.org Recipe dict from a recipe page (fast path, BeautifulSoup fallback)."""
+    recipe = extract_recipe_jsonld_fast(content)
+    if recipe is None:
+        recipe = extract_recipe_jsonld_soup(content)
+    return recipe
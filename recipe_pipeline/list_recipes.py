@@ -17,6 +17,8 @@ import argparse
 import os
 from recipe_config import DATA_DIR, RECIPE_DATABASE_OUTPUT, RECIPE_FINAL_OUTPUT
 
+LISTED_COLUMNS = {'recipe_name', 'match_rate_%', 'LACS Lactose [g/100g]'}
+
 def main():
     parser = argparse.ArgumentParser(description='List available recipes')
     parser.add_argument('--sort-lactose', action='store_true', help='Sort by lactose content (high to low)')
@@ -24,12 +26,13 @@ def main():
     parser.add_argument('--low-lactose', type=float, help='Show only recipes with lactose below this value (mg)')
     args = parser.parse_args()
 
-    # Try both possible files (in data/)
+    # Try both possible files (in data/) - only the listed columns are parsed,
+    # the large audit-trail / schema.org JSON columns are skipped
     try:
-        df = pd.read_csv(RECIPE_FINAL_OUTPUT)
+        df = pd.read_csv(RECIPE_FINAL_OUTPUT, usecols=lambda col: col in LISTED_COLUMNS)
     except FileNotFoundError:
         try:
-            df = pd.read_csv(RECIPE_DATABASE_OUTPUT)
+            df = pd.read_csv(RECIPE_DATABASE_OUTPUT, usecols=lambda col: col in LISTED_COLUMNS)
         except FileNotFoundError:
             print("Error: No recipe database found (recipe_final.csv or recipe_database.csv in data/)")
             sys.exit(1)
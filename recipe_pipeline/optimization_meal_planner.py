@@ -15,6 +15,7 @@ import sys
 import os
 from typing import Dict, List, Tuple
 from recipe_config import DATA_DIR
+from bls_loader import load_bls_foods, LACTOSE_COLUMN
 
 # Paths (all under data/)
 PATH_RECIPE_FINAL = os.path.join(DATA_DIR, 'recipe_final.csv')
@@ -493,14 +494,9 @@ days = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sun
 import json
 recipe_db = pd.read_csv(PATH_RECIPE_DB)
 
-# Load BLS database for lactose breakdown
-bls_df = pd.read_csv(PATH_BLS, low_memory=False)
-lactose_cols = [col for col in bls_df.columns if 'LACS' in col or 'Lactose' in col.lower()]
-if lactose_cols:
-    lacs_col = lactose_cols[0]
-    bls_df[lacs_col] = pd.to_numeric(bls_df[lacs_col], errors='coerce').fillna(0)
-else:
-    lacs_col = None
+# Load BLS database for lactose breakdown (only the lactose column is needed)
+bls_foods = load_bls_foods(PATH_BLS, columns=[LACTOSE_COLUMN])
+lacs_col = LACTOSE_COLUMN if LACTOSE_COLUMN in bls_foods.df.columns else None
 
 # Extract unmatched ingredients for selected recipes
 unmatched_by_recipe = {}
@@ -569,9 +565,9 @@ with open(PATH_REPORT, 'w', encoding='utf-8') as f:
                         bls_name = ing.get('bls_name')
                         weight_g = ing.get('weight_g', 0)
 
-                        bls_match = bls_df[bls_df['Lebensmittelbezeichnung'] == bls_name]
-                        if not bls_match.empty:
-                            lactose_g_per_100g = bls_match.iloc[0][lacs_col]
+                        bls_food = bls_foods.get_food(bls_name)
+                        if bls_food is not None:
+                            lactose_g_per_100g = bls_food[lacs_col]
                             lactose_mg = (lactose_g_per_100g * 1000 * weight_g) / 100 if weight_g > 0 else 0
 
                             if lactose_mg > 1:  # >1mg threshold
@@ -0,0 +1,89 @@
+"""
+Raw Page Archive
+================
+
+Append-only archive of fetched recipe pages, so the extraction stage
+(JSON-LD, ingredient parsing, author nutrition) can be re-run offline:
+
+  data/.cache/pages.archive       concatenated gzip frames, one per page
+  data/.cache/pages.archive.idx   JSONL index: url, offset, length, sha1
+
+A page is only appended when its content differs from the latest archived
+version of that URL. The index line is written after the frame, so a crash
+mid-write leaves at most an unreferenced tail. Later index entries win.
+
+gzip framing (stdlib) instead of zstd: no extra dependency, and each frame
+can be read on its own via its offset.
+
+Usage:
+  archive = PageArchive(PAGE_ARCHIVE)
+  archive.put(url, content)
+  content = archive.get(url)   # bytes or None
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+
+from recipe_config import DATA_DIR
+
+PAGE_ARCHIVE = os.path.join(DATA_DIR, '.cache', 'pages.archive')
+
+
+class PageArchive:
+    """url → latest page content, stored as gzip frames in one append-only file."""
+
+    def __init__(self, path=PAGE_ARCHIVE):
+        self.path = path
+        self.index_path = path + '.idx'
+        self.index = {}
+        self._lock = threading.Lock()
+        self._load_index()
+
+    def _load_index(self):
+        if not os.path.exists(self.index_path):
+            return
+        size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        with open(self.index_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    if entry['offset'] + entry['length'] <= size:
+                        self.index[entry['url']] = entry
+                except (ValueError, KeyError, TypeError):
+                    continue  # Torn last line
+
+    def __contains__(self, url):
+        return url in self.index
+
+    def __len__(self):
+        return len(self.index)
+
+    def put(self, url, content):
+        """Archive content (bytes) for url unless it is unchanged."""
+        sha1 = hashlib.sha1(content).hexdigest()
+        with self._lock:
+            if self.index.get(url, {}).get('sha1') == sha1:
+                return
+            frame = gzip.compress(content, compresslevel=6)
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, 'ab') as f:
+                offset = f.seek(0, os.SEEK_END)
+                f.write(frame)
+                f.flush()
+                os.fsync(f.fileno())
+            entry = {'url': url, 'offset': offset, 'length': len(frame), 'sha1': sha1}
+            with open(self.index_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            self.index[url] = entry
+
+    def get(self, url):
+        """Latest archived content for url (None if not archived)."""
+        entry = self.index.get(url)
+        if entry is None:
+            return None
+        with open(self.path, 'rb') as f:
+            f.seek(entry['offset'])
+            return gzip.decompress(f.read(entry['length']))
@@ -6,158 +6,64 @@ Re-processes stored schema.org JSON from recipe_database.csv
 to add ingredient audit trail columns without re-scraping.
 
 This is fast - just re-calculates from already-stored data.
+
+Incremental by default: the mappings applied last time are remembered in
+data/.cache/audit_trail_state.json (see audit_state.py). After adding or
+changing mappings, only recipes with a parsed ingredient name containing a
+changed key (or with new/changed schema.org JSON) are re-processed.
+
+Usage:
+  python recipe_add_audit_trails.py          # incremental
+  python recipe_add_audit_trails.py --full   # re-process every recipe
+  python recipe_add_audit_trails.py --full --workers 4   # match in 4 processes
+
+With --workers N the selected recipes are split into chunks that are
+JSON-decoded, parsed and matched in a process pool (each worker opens the
+memory-mapped BLS matrix and the matcher once). Results are reassembled in
+input order, so the output is identical to the serial run.
 """
 
+import argparse
 import pandas as pd
 import json
-import re
 import sys
-import html
 import os
+from concurrent.futures import ProcessPoolExecutor
 from recipe_config import DATA_DIR, RECIPE_DATABASE_OUTPUT, RECIPE_FINAL_OUTPUT, BLS_DATABASE
+from bls_loader import open_nutrient_matrix
+from ingredient_matcher import load_matcher, load_match_cache
+from recipe_nutrients import RecipeWeightMatrix
+from audit_state import load_audit_state
+from ingredient_parser import parse_recipe_ingredients
+from weight_rules import resolve_weights
 
 PATH_INGREDIENT_MAPPINGS = os.path.join(DATA_DIR, 'ingredient_mappings.csv')
 
 # ==========================================
-# 1. LOAD EXISTING DATABASE
+# HELPER FUNCTIONS
 # ==========================================
-print("Loading existing recipe database...")
-# Try recipe_final.csv first (main source), fallback to recipe_database.csv
-try:
-    recipes_df = pd.read_csv(RECIPE_FINAL_OUTPUT)
-    print("✓ Loaded from: recipe_final.csv")
-except FileNotFoundError:
+def match_recipe(schema_json, match, bls_names):
+    """
+    Parse, match and weigh the ingredients of one recipe.
+
+    `match` maps an ingredient name to a BLS row id (or None). Nutrient
+    contributions are filled in later, once all recipe totals are known.
+    Returns (audit_trail, matches, parsed_names) with matches as
+    (bls_row, weight_g) pairs, or None if the schema.org JSON is invalid.
+    """
     try:
-        recipes_df = pd.read_csv(RECIPE_DATABASE_OUTPUT)
-        print("✓ Loaded from: recipe_database.csv")
-    except FileNotFoundError:
-        print("Error: recipe_final.csv or recipe_database.csv not found.")
-        sys.exit(1)
-
-print(f"Loaded: {len(recipes_df)} recipes")
-
-# Load BLS database for ingredient matching
-print("Loading BLS database...")
-try:
-    bls_df = pd.read_csv(BLS_DATABASE, low_memory=False)
-except FileNotFoundError:
-    print("Error: BLS_4_0_Daten_2025_DE.csv not found.")
-    sys.exit(1)
-
-# Identify nutrient columns
-nutrient_cols = [col for col in bls_df.columns if '[' in col]
-for col in nutrient_cols:
-    bls_df[col] = pd.to_numeric(bls_df[col], errors='coerce').fillna(0)
-
-print(f"BLS database: {len(bls_df)} foods, {len(nutrient_cols)} nutrients")
-
-# ==========================================
-# 2. SETUP MAPPING (load directly from CSV)
-# ==========================================
-# Load mappings directly from CSV (not cached import) to get latest changes
-print("Loading ingredient mappings...")
-try:
-    mappings_df = pd.read_csv(PATH_INGREDIENT_MAPPINGS)
-    manual_map = dict(zip(mappings_df['ingredient_name'], mappings_df['bls_entry_name']))
-    print(f"✓ Loaded {len(manual_map)} ingredient mappings from CSV")
-except FileNotFoundError:
-    print("Warning: ingredient_mappings.csv not found, using fallback")
-    from ingredient_mapping_config import MANUAL_INGREDIENT_MAP
-    manual_map = MANUAL_INGREDIENT_MAP
-    print(f"✓ Using fallback {len(manual_map)} ingredient mappings")
+        schema_data = json.loads(schema_json)
+    except (json.JSONDecodeError, TypeError):
+        return None
 
-# ==========================================
-# 3. HELPER FUNCTIONS
-# ==========================================
-def get_weight(name, qty, had_qty=True):
-    """Determine weight based on ingredient type and quantity."""
-    ln = name.lower()
-    if not had_qty:
-        if 'petersilie' in ln or 'koriander' in ln: return 10.0
-        if 'knoblauch' in ln: return 4.0
-        if 'ingwer' in ln: return 5.0
-        return 1.0
-    if qty >= 10: return qty
-    if 'ei' in ln or 'eier' in ln: return qty * 55
-    if 'zwiebel' in ln: return qty * 100
-    if 'knoblauch' in ln: return qty * 4
-    if 'tomate' in ln or 'bohne' in ln or 'linse' in ln: return qty * 400
-    if 'tortilla' in ln: return qty * 40
-    if 'avocado' in ln: return qty * 180
-    if 'limette' in ln: return qty * 50
-    if 'eigelb' in ln: return qty * 18
-    return qty
-
-def match_ingredient_to_bls(ingredient_name):
-    """Find best BLS match for ingredient name."""
-    for key, val in sorted(manual_map.items(), key=lambda x: len(x[0]), reverse=True):
-        if key in ingredient_name.lower():
-            match_df = bls_df[bls_df['Lebensmittelbezeichnung'].str.contains(val, case=False, na=False, regex=False)]
-            if not match_df.empty:
-                return match_df.iloc[0]
-    return None
-
-def parse_recipe_ingredients(schema_data):
-    """Extract ingredients from schema.org Recipe data."""
-    ingredients = []
-
-    if 'recipeIngredient' not in schema_data:
-        return ingredients
-
-    ingredient_list = schema_data['recipeIngredient']
-    if isinstance(ingredient_list, str):
-        ingredient_list = [ingredient_list]
-
-    for ingredient_str in ingredient_list:
-        # Decode HTML entities (&frac14; -> ¼, &frac12; -> ½, etc.)
-        ingredient_str = html.unescape(ingredient_str)
-
-        match = re.match(r'^([\d\.\s½¼¾]+\s*(?:g|kg|ml|l|tsp|tbsp|cup|stück|prise|tl|el)?)\s*(.*)', ingredient_str, re.IGNORECASE)
-        if match:
-            qty_str = match.group(1).strip()
-            ingredient_name = match.group(2).strip()
-
-            # Clean up ingredient name - remove common qualifiers
-            ingredient_name = re.sub(r',\s*(frisch|getrocknet|gefroren|roh|gekocht|tk|tiefgekühlt)', '', ingredient_name, flags=re.IGNORECASE)
-            ingredient_name = re.sub(r'\s+(frisch|getrocknet|gefroren|roh|gekocht|tk|tiefgekühlt)$', '', ingredient_name, flags=re.IGNORECASE)
-            ingredient_name = re.sub(r'^(stängel|stengel|bund|blatt|blätter)\s+', '', ingredient_name, flags=re.IGNORECASE)
-            ingredient_name = re.sub(r'\s*\(.*?\)', '', ingredient_name)  # Remove parentheses
-            ingredient_name = ingredient_name.strip()
-
-            # Parse quantity - handle fractions
-            qty_match = re.match(r'([\d\.½¼¾]+)', qty_str)
-            if qty_match:
-                qty_str_parsed = qty_match.group(1)
-                # Convert fractions to decimals
-                qty_str_parsed = qty_str_parsed.replace('½', '.5').replace('¼', '.25').replace('¾', '.75')
-                qty = float(qty_str_parsed) if qty_str_parsed else 1.0
-            else:
-                qty = 1.0
-
-            ingredients.append({
-                'original': ingredient_str,
-                'name': ingredient_name,
-                'qty': qty,
-                'qty_str': qty_str
-            })
-        else:
-            ingredients.append({
-                'original': ingredient_str,
-                'name': ingredient_str,
-                'qty': 1.0,
-                'qty_str': '1'
-            })
-
-    return ingredients
-
-def calculate_recipe_nutrients_with_audit(ingredients):
-    """Calculate nutrients and generate audit trail."""
-    recipe_nutrients = {}
+    ingredients = parse_recipe_ingredients(schema_data)
     ingredient_audit_trail = []
-    matched_count = 0
+    matches = []
+    weights, rules = resolve_weights([i['name'] for i in ingredients], [i['qty'] for i in ingredients],
+                                     [i['unit'] for i in ingredients], [i['has_qty'] for i in ingredients])
 
-    for ingredient in ingredients:
-        bls_data = match_ingredient_to_bls(ingredient['name'])
+    for ingredient, weight, rule in zip(ingredients, weights.tolist(), rules):
+        bls_row = match(ingredient['name'])
 
         audit_entry = {
             'original': ingredient['original'],
@@ -167,155 +73,328 @@ def calculate_recipe_nutrients_with_audit(ingredients):
             'matched': False,
             'bls_name': None,
             'weight_g': None,
+            'weight_rule': None,
             'nutrient_contribution': {}
         }
 
-        if bls_data is not None:
-            weight = get_weight(ingredient['name'], ingredient['qty'], True)
+        if bls_row is not None:
             audit_entry['matched'] = True
-            audit_entry['bls_name'] = bls_data['Lebensmittelbezeichnung']
+            audit_entry['bls_name'] = bls_names[bls_row]
             audit_entry['weight_g'] = weight
-            matched_count += 1
-
-            contribution = {}
-            for col in nutrient_cols:
-                value = (bls_data[col] * weight) / 100.0
-                recipe_nutrients[col] = recipe_nutrients.get(col, 0) + value
-                if value > 0:
-                    contribution[col] = round(value, 2)
-            audit_entry['nutrient_contribution'] = contribution
+            audit_entry['weight_rule'] = rule
+            matches.append((bls_row, weight))
 
         ingredient_audit_trail.append(audit_entry)
 
-    return recipe_nutrients, ingredient_audit_trail, matched_count
+    return ingredient_audit_trail, matches, [ingredient['name'] for ingredient in ingredients]
+
+def fill_nutrient_contributions(audit_trail, entry_ids, weights, nutrient_cols):
+    """Add per-ingredient nutrient contributions (> 0) to the matched audit entries."""
+    matched_entries = [entry for entry in audit_trail if entry['matched']]
+    contributions = weights.contributions(entry_ids).tolist()
+    for audit_entry, values in zip(matched_entries, contributions):
+        audit_entry['nutrient_contribution'] = {
+            col: round(value, 2) for col, value in zip(nutrient_cols, values) if value > 0
+        }
 
 # ==========================================
-# 4. ADD AUDIT TRAILS TO EACH RECIPE
+# PARALLEL WORKERS (--workers N)
 # ==========================================
-print("\nProcessing audit trails from stored schema.org data...")
-print("-" * 70)
-
-new_data = {
-    'ingredients_matched': [],
-    'ingredients_skipped': [],
-    'match_rate_%': [],
-    'ingredient_audit_trail': []
-}
-
-# Initialize nutrient columns
-for col in nutrient_cols:
-    new_data[col] = []
+# Per-process matcher state, set up once by init_worker()
+_worker = {}
+
+def init_worker(manual_map):
+    """Load the BLS matrix (memory-mapped, shared page cache) + matcher once per worker."""
+    bls_matrix = open_nutrient_matrix(BLS_DATABASE)
+    matcher = load_matcher(manual_map, BLS_DATABASE, bls_names=bls_matrix.names,
+                           mappings_path=PATH_INGREDIENT_MAPPINGS)
+    match_cache = load_match_cache(matcher, PATH_INGREDIENT_MAPPINGS)
+    _worker.update(bls_names=bls_matrix.names, match_cache=match_cache, known=set(match_cache.entries))
+
+def match_chunk(schema_jsons):
+    """Worker task: match_recipe() for a chunk of recipes, plus match cache stats."""
+    match_cache = _worker['match_cache']
+    hits, misses = match_cache.hits, match_cache.misses
+    results = [match_recipe(schema_json, match_cache.match, _worker['bls_names'])
+               for schema_json in schema_jsons]
+
+    known = _worker['known']
+    new_entries = {name: row for name, row in match_cache.entries.items() if name not in known}
+    known.update(new_entries)
+    return results, match_cache.hits - hits, match_cache.misses - misses, new_entries
+
+def iter_recipe_matches(schema_jsons, manual_map, match_cache, bls_names, workers=1):
+    """
+    match_recipe() for every recipe, in input order.
+
+    With workers > 1 the recipes are split into chunks and matched in a
+    process pool; cache stats and new cache entries are merged back into
+    `match_cache`.
+    """
+    if workers <= 1 or len(schema_jsons) < 2:
+        for schema_json in schema_jsons:
+            yield match_recipe(schema_json, match_cache.match, bls_names)
+        return
+
+    chunk_size = max(1, -(-len(schema_jsons) // (workers * 4)))
+    chunks = [schema_jsons[i:i + chunk_size] for i in range(0, len(schema_jsons), chunk_size)]
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(manual_map,)) as pool:
+        # map() returns chunk results in submission order
+        for results, hits, misses, new_entries in pool.map(match_chunk, chunks):
+            match_cache.hits += hits
+            match_cache.misses += misses
+            match_cache.update(new_entries)
+            yield from results
+
+def main():
+    parser = argparse.ArgumentParser(description='Add audit trails + nutrients to the recipe database')
+    parser.add_argument('--full', action='store_true', help='re-process all recipes, ignoring the stored state')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='match recipes in N worker processes (default: 1, serial)')
+    args = parser.parse_args()
+
+    # ==========================================
+    # 1. LOAD EXISTING DATABASE
+    # ==========================================
+    print("Loading existing recipe database...")
+    # Try recipe_final.csv first (main source), fallback to recipe_database.csv
+    try:
+        recipes_df = pd.read_csv(RECIPE_FINAL_OUTPUT)
+        print("✓ Loaded from: recipe_final.csv")
+    except FileNotFoundError:
+        try:
+            recipes_df = pd.read_csv(RECIPE_DATABASE_OUTPUT)
+            print("✓ Loaded from: recipe_database.csv")
+        except FileNotFoundError:
+            print("Error: recipe_final.csv or recipe_database.csv not found.")
+            sys.exit(1)
 
-for idx, row in recipes_df.iterrows():
-    if (idx + 1) % 50 == 0:
-        print(f"[{idx+1}/{len(recipes_df)}] Processing...")
+    print(f"Loaded: {len(recipes_df)} recipes")
 
+    # Load BLS nutrient matrix (memory-mapped float32, shared with other processes)
+    print("Loading BLS database...")
     try:
-        schema_data = json.loads(row['schema_org_json'])
-    except (json.JSONDecodeError, TypeError):
-        print(f"Warning: Could not parse schema.org JSON for recipe {idx}")
-        new_data['ingredients_matched'].append(0)
-        new_data['ingredients_skipped'].append(0)
-        new_data['match_rate_%'].append(0)
-        new_data['ingredient_audit_trail'].append('[]')
-        # Add zeros for all nutrients
-        for col in nutrient_cols:
-            new_data[col].append(0)
-        continue
-
-    ingredients = parse_recipe_ingredients(schema_data)
-    nutrients, audit_trail, matched_count = calculate_recipe_nutrients_with_audit(ingredients)
+        bls_matrix = open_nutrient_matrix(BLS_DATABASE)
+    except FileNotFoundError:
+        print("Error: BLS_4_0_Daten_2025_DE.csv not found.")
+        sys.exit(1)
 
-    total_ingredients = len(ingredients)
-    skipped_count = total_ingredients - matched_count
-    match_rate = (matched_count / total_ingredients * 100) if total_ingredients > 0 else 0
+    # Identify nutrient columns
+    nutrient_cols = bls_matrix.columns
 
-    new_data['ingredients_matched'].append(matched_count)
-    new_data['ingredients_skipped'].append(skipped_count)
-    new_data['match_rate_%'].append(round(match_rate, 1))
-    new_data['ingredient_audit_trail'].append(json.dumps(audit_trail, ensure_ascii=False))
+    print(f"BLS database: {len(bls_matrix)} foods, {len(nutrient_cols)} nutrients")
 
-    # CRITICAL: Save calculated nutrients (including lactose!)
+    # ==========================================
+    # 2. SETUP MAPPING (load directly from CSV)
+    # ==========================================
+    # Load mappings directly from CSV (not cached import) to get latest changes
+    print("Loading ingredient mappings...")
+    try:
+        mappings_df = pd.read_csv(PATH_INGREDIENT_MAPPINGS)
+        manual_map = dict(zip(mappings_df['ingredient_name'], mappings_df['bls_entry_name']))
+        print(f"✓ Loaded {len(manual_map)} ingredient mappings from CSV")
+    except FileNotFoundError:
+        print("Warning: ingredient_mappings.csv not found, using fallback")
+        from ingredient_mapping_config import MANUAL_INGREDIENT_MAP
+        manual_map = MANUAL_INGREDIENT_MAP
+        print(f"✓ Using fallback {len(manual_map)} ingredient mappings")
+
+    # Resolve mapping keys → BLS rows once (persisted in data/.cache/)
+    matcher = load_matcher(manual_map, BLS_DATABASE, bls_names=bls_matrix.names,
+                           mappings_path=PATH_INGREDIENT_MAPPINGS)
+    print(f"✓ {len(matcher.keys)} mapping keys resolved to BLS foods")
+
+    # Memoized matches, reused across runs while mappings + BLS are unchanged
+    match_cache = load_match_cache(matcher, PATH_INGREDIENT_MAPPINGS)
+
+    # ==========================================
+    # 4. SELECT RECIPES TO RE-PROCESS
+    # ==========================================
+    audit_state = load_audit_state(PATH_INGREDIENT_MAPPINGS)
+    bls_sha256 = matcher.stamp['bls_sha256']
+
+    full_reason = "--full" if args.full else audit_state.full_pass_reason(
+        manual_map, bls_sha256, nutrient_cols, recipes_df)
+    if full_reason is not None:
+        print(f"\nFull pass ({full_reason})")
+        positions = list(range(len(recipes_df)))
+    else:
+        positions, changed_keys = audit_state.affected_positions(manual_map, recipes_df)
+        print(f"\nIncremental pass: {len(changed_keys)} changed mapping keys "
+              f"→ {len(positions)}/{len(recipes_df)} recipes affected")
+        for key in changed_keys[:10]:
+            print(f"  • {key}")
+        if len(changed_keys) > 10:
+            print(f"  ... and {len(changed_keys) - 10} more")
+
+    # ==========================================
+    # 5. ADD AUDIT TRAILS TO AFFECTED RECIPES
+    # ==========================================
+    print("\nProcessing audit trails from stored schema.org data...")
+    print("-" * 70)
+
+    new_data = {
+        'ingredients_matched': [],
+        'ingredients_skipped': [],
+        'match_rate_%': [],
+        'ingredient_audit_trail': []
+    }
+
+    # Initialize nutrient columns
     for col in nutrient_cols:
-        new_data[col].append(nutrients.get(col, 0))
-
-# ==========================================
-# 5. ADD NEW COLUMNS TO DATAFRAME
-# ==========================================
-print("\nUpdating database columns...")
-print(f"  • Audit trails: ingredient_audit_trail")
-print(f"  • Match statistics: ingredients_matched, ingredients_skipped, match_rate_%")
-print(f"  • ALL nutrients recalculated: {len(nutrient_cols)} columns (including lactose!)")
-
-for col in new_data:
-    recipes_df[col] = new_data[col]
-
-# ==========================================
-# 6. SAVE UPDATED DATABASE
-# ==========================================
-print("\nSaving updated recipe database...")
-recipes_df.to_csv(RECIPE_DATABASE_OUTPUT, index=False, encoding='utf-8-sig')
-print("✓ Saved: recipe_database.csv")
-
-# Keep recipe_final.csv in sync (used by optimization scripts)
-recipes_df.to_csv(RECIPE_FINAL_OUTPUT, index=False, encoding='utf-8-sig')
-print("✓ Saved: recipe_final.csv (synced)")
-
-# ==========================================
-# 7. DISPLAY STATISTICS
-# ==========================================
-print("\n" + "=" * 70)
-print("AUDIT TRAIL SUMMARY")
-print("=" * 70)
-
-avg_match_rate = recipes_df['match_rate_%'].mean()
-median_match_rate = recipes_df['match_rate_%'].median()
-min_match_rate = recipes_df['match_rate_%'].min()
-max_match_rate = recipes_df['match_rate_%'].max()
-
-total_ingredients = recipes_df['ingredient_count'].sum()
-total_matched = recipes_df['ingredients_matched'].sum()
-total_skipped = recipes_df['ingredients_skipped'].sum()
-overall_match_rate = (total_matched / total_ingredients * 100) if total_ingredients > 0 else 0
-
-print(f"\nOverall Statistics:")
-print(f"  Total recipes: {len(recipes_df)}")
-print(f"  Total ingredients: {total_ingredients:,}")
-print(f"  Total matched: {total_matched:,} ({overall_match_rate:.1f}%)")
-print(f"  Total skipped: {total_skipped:,} ({100-overall_match_rate:.1f}%)")
-
-print(f"\nMatch Rate Distribution:")
-print(f"  Average: {avg_match_rate:.1f}%")
-print(f"  Median:  {median_match_rate:.1f}%")
-print(f"  Min:     {min_match_rate:.1f}%")
-print(f"  Max:     {max_match_rate:.1f}%")
-
-perfect = len(recipes_df[recipes_df['match_rate_%'] == 100.0])
-excellent = len(recipes_df[(recipes_df['match_rate_%'] >= 90) & (recipes_df['match_rate_%'] < 100)])
-good = len(recipes_df[(recipes_df['match_rate_%'] >= 70) & (recipes_df['match_rate_%'] < 90)])
-fair = len(recipes_df[(recipes_df['match_rate_%'] >= 50) & (recipes_df['match_rate_%'] < 70)])
-poor = len(recipes_df[recipes_df['match_rate_%'] < 50])
-
-print(f"\nRecipes by Match Quality:")
-print(f"  ✓✓ Perfect (100%):      {perfect:3d} recipes ({perfect/len(recipes_df)*100:.1f}%)")
-print(f"  ✓  Excellent (90-99%):  {excellent:3d} recipes ({excellent/len(recipes_df)*100:.1f}%)")
-print(f"  ◐ Good (70-89%):       {good:3d} recipes ({good/len(recipes_df)*100:.1f}%)")
-print(f"  ◑ Fair (50-69%):       {fair:3d} recipes ({fair/len(recipes_df)*100:.1f}%)")
-print(f"  ✗ Poor (<50%):         {poor:3d} recipes ({poor/len(recipes_df)*100:.1f}%)")
-
-# Show lactose statistics
-lactose_col = 'LACS Lactose [g/100g]'
-if lactose_col in recipes_df.columns:
-    recipes_df['lactose_mg'] = recipes_df[lactose_col] * 1000
-    recipes_with_lactose = (recipes_df['lactose_mg'] > 0).sum()
-    avg_lactose = recipes_df[recipes_df['lactose_mg'] > 0]['lactose_mg'].mean() if recipes_with_lactose > 0 else 0
-    max_lactose = recipes_df['lactose_mg'].max()
-    print(f"\nLactose Statistics:")
-    print(f"  Recipes with lactose: {recipes_with_lactose}/{len(recipes_df)} ({recipes_with_lactose/len(recipes_df)*100:.1f}%)")
-    print(f"  Average (when present): {avg_lactose:.0f} mg")
-    print(f"  Maximum: {max_lactose:.0f} mg")
-
-print("\n" + "=" * 70)
-print("✓ ALL nutrients recalculated with current ingredient mappings!")
-print("Next: run 'python optimization_meal_planner.py' for fresh meal plan")
-print("=" * 70)
+        new_data[col] = []
+
+    # Pass 1: parse + match every selected recipe, collecting all matched
+    # ingredients into one sparse recipes × foods weight matrix
+    weights = RecipeWeightMatrix(len(recipes_df), bls_matrix)
+    recipe_matches = []
+    records = recipes_df.to_dict('records')
+
+    schema_jsons = [records[pos]['schema_org_json'] for pos in positions]
+    results = iter_recipe_matches(schema_jsons, manual_map, match_cache, bls_matrix.names, args.workers)
+    if args.workers > 1:
+        print(f"Matching in {args.workers} worker processes...")
+
+    for n, (pos, result) in enumerate(zip(positions, results)):
+        if (n + 1) % 50 == 0:
+            print(f"[{n+1}/{len(positions)}] Processing...")
+
+        row = records[pos]
+        if result is None:
+            print(f"Warning: Could not parse schema.org JSON for recipe {recipes_df.index[pos]}")
+            recipe_matches.append(None)
+            audit_state.record(row, [])
+            continue
+
+        audit_trail, matches, parsed_names = result
+        entry_ids = [weights.add(pos, bls_row, weight) for bls_row, weight in matches]
+        recipe_matches.append((audit_trail, entry_ids, len(matches), len(parsed_names)))
+        audit_state.record(row, parsed_names)
+
+    # Pass 2: all recipe totals at once (W @ N)
+    totals = weights.totals()
+    print(f"✓ Nutrient totals for {len(positions)} recipes from {len(weights)} matched ingredients")
+
+    for pos, recipe_match in zip(positions, recipe_matches):
+        if recipe_match is None:
+            new_data['ingredients_matched'].append(0)
+            new_data['ingredients_skipped'].append(0)
+            new_data['match_rate_%'].append(0)
+            new_data['ingredient_audit_trail'].append('[]')
+            # Add zeros for all nutrients
+            for col in nutrient_cols:
+                new_data[col].append(0)
+            continue
+
+        audit_trail, entry_ids, matched_count, total_ingredients = recipe_match
+        fill_nutrient_contributions(audit_trail, entry_ids, weights, nutrient_cols)
+
+        skipped_count = total_ingredients - matched_count
+        match_rate = (matched_count / total_ingredients * 100) if total_ingredients > 0 else 0
+
+        new_data['ingredients_matched'].append(matched_count)
+        new_data['ingredients_skipped'].append(skipped_count)
+        new_data['match_rate_%'].append(round(match_rate, 1))
+        new_data['ingredient_audit_trail'].append(json.dumps(audit_trail, ensure_ascii=False))
+
+        # CRITICAL: Save calculated nutrients (including lactose!)
+        for j, col in enumerate(nutrient_cols):
+            new_data[col].append(totals[pos, j])
+
+    # ==========================================
+    # 6. UPDATE + SAVE DATABASE
+    # ==========================================
+    if full_reason is not None:
+        print("\nUpdating database columns...")
+        print(f"  • Audit trails: ingredient_audit_trail")
+        print(f"  • Match statistics: ingredients_matched, ingredients_skipped, match_rate_%")
+        print(f"  • ALL nutrients recalculated: {len(nutrient_cols)} columns (including lactose!)")
+
+        for col in new_data:
+            recipes_df[col] = new_data[col]
+    elif positions:
+        print(f"\nUpdating {len(positions)} recipes (other rows unchanged)...")
+        for col in new_data:
+            recipes_df.iloc[positions, recipes_df.columns.get_loc(col)] = new_data[col]
+
+    if positions:
+        print("\nSaving updated recipe database...")
+        recipes_df.to_csv(RECIPE_DATABASE_OUTPUT, index=False, encoding='utf-8-sig')
+        print("✓ Saved: recipe_database.csv")
+
+        # Keep recipe_final.csv in sync (used by optimization scripts)
+        recipes_df.to_csv(RECIPE_FINAL_OUTPUT, index=False, encoding='utf-8-sig')
+        print("✓ Saved: recipe_final.csv (synced)")
+    else:
+        print("✓ Recipe database already up to date")
+
+    match_cache.save()
+    audit_state.save(manual_map, bls_sha256, nutrient_cols, recipes_df)
+
+    # ==========================================
+    # 7. DISPLAY STATISTICS
+    # ==========================================
+    print("\n" + "=" * 70)
+    print("AUDIT TRAIL SUMMARY")
+    print("=" * 70)
+
+    avg_match_rate = recipes_df['match_rate_%'].mean()
+    median_match_rate = recipes_df['match_rate_%'].median()
+    min_match_rate = recipes_df['match_rate_%'].min()
+    max_match_rate = recipes_df['match_rate_%'].max()
+
+    total_ingredients = recipes_df['ingredient_count'].sum()
+    total_matched = recipes_df['ingredients_matched'].sum()
+    total_skipped = recipes_df['ingredients_skipped'].sum()
+    overall_match_rate = (total_matched / total_ingredients * 100) if total_ingredients > 0 else 0
+
+    print(f"\nOverall Statistics:")
+    print(f"  Total recipes: {len(recipes_df)}")
+    print(f"  Total ingredients: {total_ingredients:,}")
+    print(f"  Total matched: {total_matched:,} ({overall_match_rate:.1f}%)")
+    print(f"  Total skipped: {total_skipped:,} ({100-overall_match_rate:.1f}%)")
+
+    print(f"\nMatch Rate Distribution:")
+    print(f"  Average: {avg_match_rate:.1f}%")
+    print(f"  Median:  {median_match_rate:.1f}%")
+    print(f"  Min:     {min_match_rate:.1f}%")
+    print(f"  Max:     {max_match_rate:.1f}%")
+
+    perfect = len(recipes_df[recipes_df['match_rate_%'] == 100.0])
+    excellent = len(recipes_df[(recipes_df['match_rate_%'] >= 90) & (recipes_df['match_rate_%'] < 100)])
+    good = len(recipes_df[(recipes_df['match_rate_%'] >= 70) & (recipes_df['match_rate_%'] < 90)])
+    fair = len(recipes_df[(recipes_df['match_rate_%'] >= 50) & (recipes_df['match_rate_%'] < 70)])
+    poor = len(recipes_df[recipes_df['match_rate_%'] < 50])
+
+    print(f"\nRecipes by Match Quality:")
+    print(f"  ✓✓ Perfect (100%):      {perfect:3d} recipes ({perfect/len(recipes_df)*100:.1f}%)")
+    print(f"  ✓  Excellent (90-99%):  {excellent:3d} recipes ({excellent/len(recipes_df)*100:.1f}%)")
+    print(f"  ◐ Good (70-89%):       {good:3d} recipes ({good/len(recipes_df)*100:.1f}%)")
+    print(f"  ◑ Fair (50-69%):       {fair:3d} recipes ({fair/len(recipes_df)*100:.1f}%)")
+    print(f"  ✗ Poor (<50%):         {poor:3d} recipes ({poor/len(recipes_df)*100:.1f}%)")
+
+    # Show lactose statistics
+    lactose_col = 'LACS Lactose [g/100g]'
+    if lactose_col in recipes_df.columns:
+        recipes_df['lactose_mg'] = recipes_df[lactose_col] * 1000
+        recipes_with_lactose = (recipes_df['lactose_mg'] > 0).sum()
+        avg_lactose = recipes_df[recipes_df['lactose_mg'] > 0]['lactose_mg'].mean() if recipes_with_lactose > 0 else 0
+        max_lactose = recipes_df['lactose_mg'].max()
+        print(f"\nLactose Statistics:")
+        print(f"  Recipes with lactose: {recipes_with_lactose}/{len(recipes_df)} ({recipes_with_lactose/len(recipes_df)*100:.1f}%)")
+        print(f"  Average (when present): {avg_lactose:.0f} mg")
+        print(f"  Maximum: {max_lactose:.0f} mg")
+
+    print(f"\nMatch Cache:")
+    print(f"  Hits:   {match_cache.hits:,}")
+    print(f"  Misses: {match_cache.misses:,}")
+    print(f"  Hit rate: {match_cache.hit_rate():.1f}%")
+
+    print("\n" + "=" * 70)
+    print("✓ ALL nutrients recalculated with current ingredient mappings!")
+    print("Next: run 'python optimization_meal_planner.py' for fresh meal plan")
+    print("=" * 70)
+
+
+if __name__ == '__main__':
+    main()
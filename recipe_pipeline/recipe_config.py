@@ -36,9 +36,21 @@ DAILY_GOALS = {
 # Erhöhe dies wenn du Blocking-Fehler erhältst
 RATE_LIMIT_DELAY = 0.5
 
+# Adaptive Rate-Steuerung (AIMD, siehe recipe_fetcher.py):
+# startet bei RATE_LIMIT_DELAY, wird pro erfolgreicher Antwort etwas schneller,
+# halbiert die Rate bei 429/503 und wartet Retry-After ab
+RATE_LIMIT_MIN_DELAY = 0.1    # schnellstes Intervall (Sekunden)
+RATE_LIMIT_MAX_DELAY = 10.0   # langsamstes Intervall (Sekunden)
+RATE_INCREASE_STEP = 0.05     # + Requests/s pro erfolgreicher Antwort
+MAX_RETRIES = 3               # Retry-Runden für 429/5xx/Timeouts
+
 # Request-Timeout in Sekunden
 REQUEST_TIMEOUT = 10
 
+# Lokaler HTTP-Cache für Rezeptseiten (data/.cache/http/)
+# Innerhalb der TTL wird gar nicht angefragt, danach bedingt (ETag/Last-Modified)
+HTTP_CACHE_TTL = 7 * 24 * 3600   # Sekunden; 0 = immer revalidieren
+
 # ==========================================
 # DATEIEN (alle unter data/)
 # ==========================================
@@ -46,6 +58,8 @@ CSV_INPUT = os.path.join(DATA_DIR, 'Lebensmittel - Cookidoo Export - Rezepte.csv
 BLS_DATABASE = os.path.join(DATA_DIR, 'BLS_4_0_Daten_2025_DE.csv')
 RECIPE_DATABASE_OUTPUT = os.path.join(DATA_DIR, 'recipe_database.csv')
 RECIPE_FINAL_OUTPUT = os.path.join(DATA_DIR, 'recipe_final.csv')
+# Journal der Extraktion (Fortsetzen nach Abbruch, siehe extraction_journal.py)
+EXTRACTION_JOURNAL = os.path.join(DATA_DIR, '.cache', 'extraction_journal.jsonl')
 
 # ==========================================
 # ZUTATEN-MAPPING (Anpassbar)
@@ -132,7 +146,8 @@ INGREDIENT_MAP = {
 # ==========================================
 # GEWICHT-DEFAULTS
 # ==========================================
-# Wenn keine Mengenangabe vorhanden ist, werden diese Defaults verwendet
+# Kräuter/Gewürze ohne Mengenangabe; andere Zutaten ohne Menge zählen als 1 Stück
+# (WEIGHT_MULTIPLIERS) oder, ohne passenden Eintrag, als 'default'
 WEIGHT_DEFAULTS = {
     'petersilie': 10.0,
     'koriander': 10.0,
@@ -153,6 +168,21 @@ WEIGHT_MULTIPLIERS = {
     'linse': 400,          # 1 Portion Linsen ≈ 400g
     'eigelb': 18,          # 1 Eigelb ≈ 18g
     'tortilla': 40,        # 1 Tortilla ≈ 40g
+    'knoblauch': 4,        # 1 Knoblauchzehe ≈ 4g
+    'kichererbse': 400,    # 1 Dose Kichererbsen ≈ 400g
+}
+# Schlüssel werden per Wortgrenze gesucht (weight_rules.py): der längste
+# passende Schlüssel gewinnt, Schlüssel < 4 Zeichen (z.B. 'ei') nur als
+# ganzes Wort inkl. Plural – 'ei' passt also nicht auf 'Reis' oder 'Weizen'.
+
+# Gramm pro Einheit (Mengenangabe mit Einheit, z.B. "2 EL Öl" → 30g)
+UNIT_WEIGHTS = {
+    'g': 1, 'kg': 1000, 'mg': 0.001,
+    'ml': 1, 'l': 1000, 'dl': 100, 'cl': 10,               # ≈ Wasser
+    'tl': 5, 'teel': 5, 'teelöffel': 5, 'tsp': 5,
+    'el': 15, 'essl': 15, 'esslöffel': 15, 'tbsp': 15,
+    'cup': 240,
+    'prise': 0.5, 'prisen': 0.5, 'msp': 0.5, 'tropfen': 0.05,
 }
 
 # ==========================================
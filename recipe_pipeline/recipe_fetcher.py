@@ -0,0 +1,208 @@
+"""
+Concurrent Recipe Fetcher
+=========================
+
+Runs a blocking fetch function (e.g. extract_schema_org_recipe) for many
+URLs with overlapping latency while a shared RateController paces the
+aggregate request rate:
+
+  - a bounded window of at most `concurrency` requests in flight
+  - a global RateController that starts at most one request per interval
+
+RateController is AIMD (additive increase, multiplicative decrease):
+every healthy response shortens the interval a little (rate + step),
+429/503 halve the rate and pause all requests for Retry-After seconds.
+The interval stays within [RATE_LIMIT_MIN_DELAY, RATE_LIMIT_MAX_DELAY]
+and starts at RATE_LIMIT_DELAY; adaptive=False keeps it fixed.
+
+Results are yielded in input order, so callers can process them exactly
+like the sequential loop. URLs for which `needs_token(url)` is False
+(e.g. fresh HTTP cache entries) skip the rate limit.
+
+FetchStats collects per-request latency, HTTP status and retries for the
+per-minute log and the throughput report (--stats-json,
+benchmark_scraper.py).
+
+Usage:
+  limiter = RateController(RATE_LIMIT_DELAY)
+  fetcher = AsyncFetcher(extract_schema_org_recipe, concurrency=4, limiter=limiter)
+  for schema_data in fetcher.map(urls):
+      ...
+  limiter.on_response(status, retry_after)   # from the fetch function
+"""
+
+import asyncio
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import numpy as np
+
+from recipe_config import RATE_LIMIT_DELAY, RATE_LIMIT_MIN_DELAY, RATE_LIMIT_MAX_DELAY, RATE_INCREASE_STEP
+
+THROTTLE_STATUS = {429, 503}
+
+
+def parse_retry_after(value):
+    """Retry-After header (seconds or HTTP date) → seconds, None if absent/invalid."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+class RateController:
+    """Thread-safe AIMD request pacing (see module docstring)."""
+
+    def __init__(self, interval=RATE_LIMIT_DELAY, min_interval=RATE_LIMIT_MIN_DELAY,
+                 max_interval=RATE_LIMIT_MAX_DELAY, increase_step=RATE_INCREASE_STEP, adaptive=True):
+        self.interval = interval
+        self.min_interval = min(min_interval, interval)
+        self.max_interval = max(max_interval, interval)
+        self.increase_step = increase_step
+        self.adaptive = adaptive
+        self.next_slot = 0.0
+        self.blocked_until = 0.0
+        self.last_decrease = float('-inf')
+        self._lock = threading.Lock()
+
+    @property
+    def rate(self):
+        return 1.0 / self.interval if self.interval > 0 else float('inf')
+
+    def try_acquire(self):
+        """Reserve the next request slot. Returns 0 if acquired, else seconds to wait."""
+        with self._lock:
+            now = time.monotonic()
+            ready = max(self.next_slot, self.blocked_until)
+            if ready > now:
+                return ready - now
+            self.next_slot = now + self.interval
+            return 0.0
+
+    def acquire(self):
+        while (wait := self.try_acquire()) > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        while (wait := self.try_acquire()) > 0:
+            await asyncio.sleep(wait)
+
+    def on_response(self, status, retry_after=None):
+        """Feed back a response status (or 'error' for timeouts / connection errors)."""
+        with self._lock:
+            now = time.monotonic()
+            if status in THROTTLE_STATUS or status == 'error':
+                if retry_after is not None:
+                    self.blocked_until = max(self.blocked_until, now + retry_after)
+                # Concurrent requests report the same overload: halve at most once per interval
+                if self.adaptive and now - self.last_decrease >= self.interval:
+                    self.interval = min(self.max_interval, self.interval * 2)
+                    self.last_decrease = now
+            elif self.adaptive and isinstance(status, int) and status < 500:
+                rate = 1.0 / self.interval + self.increase_step
+                self.interval = max(self.min_interval, 1.0 / rate)
+
+
+class FetchStats:
+    """Thread-safe request latency / status / retry counters."""
+
+    def __init__(self):
+        self.latencies = []
+        self.status_counts = Counter()
+        self.retries = 0
+        self.started = time.perf_counter()
+        self.window_started = self.started
+        self.window_counts = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, latency_s, status):
+        with self._lock:
+            self.latencies.append(latency_s)
+            self.status_counts[str(status)] += 1
+            self.window_counts[str(status)] += 1
+
+    def record_retry(self):
+        with self._lock:
+            self.retries += 1
+
+    def minute_report(self, limiter=None, period=60.0):
+        """One-line throughput summary once per `period` seconds (None in between)."""
+        now = time.perf_counter()
+        with self._lock:
+            if now - self.window_started < period:
+                return None
+            elapsed = now - self.window_started
+            counts, self.window_counts = self.window_counts, Counter()
+            self.window_started = now
+        requests = sum(counts.values())
+        status = ', '.join(f"{code}: {count}" for code, count in sorted(counts.items())) or '-'
+        line = f"[Rate] {requests} Requests in {elapsed:.0f}s ({requests / elapsed:.2f}/s) – {status}"
+        if limiter is not None:
+            line += f" – Intervall {limiter.interval:.2f}s"
+        return line
+
+    def summary(self, pages, extracted):
+        elapsed = time.perf_counter() - self.started
+        latencies_ms = np.array(self.latencies) * 1000
+        return {
+            'pages': pages,
+            'extracted': extracted,
+            'requests': len(self.latencies),
+            'retries': self.retries,
+            'elapsed_s': round(elapsed, 3),
+            'pages_per_s': round(pages / elapsed, 3) if elapsed > 0 else 0.0,
+            'latency_p50_ms': round(float(np.percentile(latencies_ms, 50)), 1) if len(latencies_ms) else None,
+            'latency_p95_ms': round(float(np.percentile(latencies_ms, 95)), 1) if len(latencies_ms) else None,
+            'status_counts': dict(self.status_counts),
+        }
+
+
+class AsyncFetcher:
+    """Ordered, rate-limited concurrent map of a blocking fetch function."""
+
+    def __init__(self, fetch, concurrency=4, limiter=None, needs_token=None):
+        self.fetch = fetch
+        self.concurrency = max(1, concurrency)
+        self.limiter = limiter
+        self.needs_token = needs_token
+
+    async def _fetch(self, url, window):
+        async with window:
+            if self.limiter is not None and (self.needs_token is None or self.needs_token(url)):
+                await self.limiter.acquire_async()
+            return await asyncio.to_thread(self.fetch, url)
+
+    def map(self, urls):
+        """Generator over fetch(url) results, in the order of `urls`."""
+        loop = asyncio.new_event_loop()
+        loop.set_default_executor(ThreadPoolExecutor(max_workers=self.concurrency))
+        thread = threading.Thread(target=loop.run_forever, daemon=True)
+        thread.start()
+
+        async def make_window():
+            return asyncio.Semaphore(self.concurrency)
+
+        futures = []
+        try:
+            window = asyncio.run_coroutine_threadsafe(make_window(), loop).result()
+            futures = [asyncio.run_coroutine_threadsafe(self._fetch(url, window), loop) for url in urls]
+            for future in futures:
+                yield future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+            # Wait for in-flight fetches, then stop the loop thread
+            asyncio.run_coroutine_threadsafe(loop.shutdown_default_executor(), loop).result()
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+            loop.close()
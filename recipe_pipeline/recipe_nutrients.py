@@ -0,0 +1,89 @@
+"""
+Vectorized Recipe Nutrient Totals
+=================================
+
+Collects every matched ingredient of a batch of recipes as one sparse
+weight matrix W (recipes × BLS foods, entries = grams / 100) and computes
+all recipe nutrient totals with a single product against the BLS nutrient
+matrix N (foods × nutrients, see bls_loader.open_nutrient_matrix):
+
+  totals = W @ N
+
+Per-ingredient contributions (for the audit trail) are only computed when
+they are requested, from the stored (food row, weight) pairs.
+
+Uses scipy.sparse when available, otherwise an equivalent numpy
+scatter-add.
+
+Usage:
+  weights = RecipeWeightMatrix(len(recipes), bls_matrix)
+  entry = weights.add(recipe_idx, bls_row, weight_g)
+  totals = weights.totals()                  # (recipes × nutrients)
+  contrib = weights.contributions([entry])   # (entries × nutrients)
+"""
+
+import numpy as np
+
+try:
+    import scipy.sparse as sparse
+except ImportError:  # Optional dependency
+    sparse = None
+
+
+class RecipeWeightMatrix:
+    """Sparse recipes × foods weight matrix built one ingredient at a time."""
+
+    def __init__(self, n_recipes, nutrient_matrix):
+        self.n_recipes = n_recipes
+        self.nutrient_matrix = nutrient_matrix
+        self.recipe_ids = []
+        self.food_rows = []
+        self.weights_g = []
+        self._arrays = None  # (recipe_ids, food_rows, weights_g) as numpy arrays, see _entry_arrays
+
+    def __len__(self):
+        return len(self.weights_g)
+
+    def add(self, recipe_idx, bls_row, weight_g):
+        """Register one matched ingredient. Returns its entry id."""
+        self.recipe_ids.append(recipe_idx)
+        self.food_rows.append(bls_row)
+        self.weights_g.append(weight_g)
+        return len(self.weights_g) - 1
+
+    def _entry_arrays(self):
+        """The entry lists as numpy arrays, converted once (again only after new add() calls)."""
+        if self._arrays is None or len(self._arrays[2]) != len(self.weights_g):
+            self._arrays = (np.asarray(self.recipe_ids, dtype=np.int64),
+                            np.asarray(self.food_rows, dtype=np.int64),
+                            np.asarray(self.weights_g, dtype=np.float64))
+        return self._arrays
+
+    def totals(self):
+        """Nutrient totals of every recipe, shape (n_recipes, n_nutrients), float64."""
+        values = self.nutrient_matrix.values
+        n_foods, n_nutrients = values.shape
+        if not self.weights_g:
+            return np.zeros((self.n_recipes, n_nutrients))
+
+        recipe_ids, food_rows, weights_g = self._entry_arrays()
+        scale = weights_g / 100.0
+
+        if sparse is not None:
+            # Duplicate (recipe, food) pairs are summed by the constructor
+            w = sparse.csr_matrix((scale, (recipe_ids, food_rows)), shape=(self.n_recipes, n_foods))
+            return np.asarray(w @ values, dtype=np.float64)
+
+        totals = np.zeros((self.n_recipes, n_nutrients))
+        np.add.at(totals, recipe_ids, values[food_rows].astype(np.float64) * scale[:, None])
+        return totals
+
+    def contributions(self, entry_ids):
+        """Nutrient contribution of the given entries, shape (len(entry_ids), n_nutrients)."""
+        entry_ids = np.asarray(entry_ids, dtype=np.int64)
+        if entry_ids.size == 0:
+            return np.zeros((0, self.nutrient_matrix.values.shape[1]))
+        _, food_rows, weights_g = self._entry_arrays()
+        rows = food_rows[entry_ids]
+        weights = weights_g[entry_ids]
+        return self.nutrient_matrix.values[rows].astype(np.float64) * weights[:, None] / 100.0
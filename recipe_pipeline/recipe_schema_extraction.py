@@ -1,34 +1,119 @@
+"""
+Rezept-Extraktion (schema.org)
+==============================
+
+Liest den Cookidoo-Export, lädt jede Rezeptseite, extrahiert die
+schema.org Recipe-Daten (JSON-LD) und berechnet Nährstoffe über den BLS.
+Ergebnis: data/recipe_database.csv
+
+Usage:
+  python recipe_schema_extraction.py                   # sequentiell
+  python recipe_schema_extraction.py --concurrency 4   # asynchron, 4 parallele Requests
+
+Mit --concurrency N laufen bis zu N Requests gleichzeitig. Das Tempo
+regelt ein globaler AIMD-RateController (siehe recipe_fetcher.py): Start
+bei RATE_LIMIT_DELAY, schneller solange die Antworten OK sind, halbe Rate
+und Pause gemäß Retry-After bei 429/503 (--fixed-rate: festes Intervall).
+Fehlgeschlagene Seiten (429, 5xx, Timeouts) kommen in eine Retry-Queue und
+werden am Ende erneut versucht (MAX_RETRIES Runden). Jede Minute wird eine
+Durchsatz-Zeile ausgegeben. Reihenfolge und Format der Ausgabe sind
+identisch mit dem sequentiellen Modus.
+
+Seiten werden in data/.cache/http/ zwischengespeichert (http_cache.py):
+innerhalb von HTTP_CACHE_TTL ohne Request, danach bedingt (ETag /
+Last-Modified). --no-cache lädt alles neu und schreibt nichts in den Cache.
+
+Jedes extrahierte Rezept wird sofort im Journal (data/.cache/
+extraction_journal.jsonl, siehe extraction_journal.py) gesichert. Bricht
+ein Lauf ab, setzt der nächste Aufruf dort fort und überspringt bereits
+extrahierte URLs (--restart verwirft das Journal). recipe_database.csv
+wird am Ende aus dem Journal erzeugt.
+
+Mit --archive werden alle geladenen Seiten zusätzlich im Seitenarchiv
+(data/.cache/pages.archive, siehe page_archive.py) gespeichert.
+--replay führt die komplette Extraktion (JSON-LD, Zutaten, Autor-Nährwerte)
+offline aus dem Archiv aus – ohne Netzwerk und ohne Rate-Limit, z.B. um
+Parser-Änderungen in Sekunden am ganzen Korpus zu testen.
+
+Mit --incremental wird der Export mit der bestehenden recipe_database.csv
+verglichen (Spalte 'link--alt href' ↔ recipe_url): nur neue URLs werden
+geladen, vorhandene Zeilen übernommen und Rezepte, die nicht mehr im Export
+stehen, entfernt. --refresh-days N lädt zusätzlich Zeilen neu, deren
+extracted_at älter als N Tage ist (oder fehlt). Schlägt ein Refresh fehl,
+bleibt die alte Zeile erhalten.
+
+--input/--output/--rate-delay überschreiben Export, Ausgabe und
+RATE_LIMIT_DELAY; --stats-json schreibt Durchsatz, Latenz (p50/p95),
+HTTP-Status und Retries (für benchmark_scraper.py + fixture_server.py).
+"""
+
+import argparse
+import os
+import sys
 import pandas as pd
 import requests
 import json
 import re
 import time
 from urllib.parse import urljoin
-from bs4 import BeautifulSoup
-import html
+from datetime import datetime, timedelta, timezone
 from ingredient_mapping_config import MANUAL_INGREDIENT_MAP
-from recipe_config import CSV_INPUT, BLS_DATABASE, RECIPE_DATABASE_OUTPUT as OUTPUT_DATABASE, REQUEST_TIMEOUT, RATE_LIMIT_DELAY
+from bls_loader import load_bls, get_nutrient_columns
+from ingredient_matcher import load_matcher
+from ingredient_parser import parse_recipe_ingredients
+from weight_rules import resolve_weights
+from recipe_fetcher import AsyncFetcher, FetchStats, RateController, parse_retry_after
+from http_cache import HttpCache
+from jsonld_extract import extract_recipe_jsonld
+from extraction_journal import ExtractionJournal
+from page_archive import PageArchive
+from recipe_config import (CSV_INPUT, BLS_DATABASE, RECIPE_DATABASE_OUTPUT as OUTPUT_DATABASE, REQUEST_TIMEOUT,
+                           RATE_LIMIT_DELAY, EXTRACTION_JOURNAL, MAX_RETRIES)
+
+parser = argparse.ArgumentParser(description='Extrahiere schema.org Rezeptdaten aus dem Cookidoo-Export')
+parser.add_argument('--concurrency', type=int, default=1,
+                    help='max. gleichzeitige Requests (default: 1 = sequentiell)')
+parser.add_argument('--no-cache', action='store_true', help='HTTP-Cache (data/.cache/http/) nicht verwenden')
+parser.add_argument('--restart', action='store_true', help='Journal eines abgebrochenen Laufs verwerfen')
+parser.add_argument('--archive', action='store_true', help='geladene Seiten im Seitenarchiv speichern')
+parser.add_argument('--replay', action='store_true', help='offline aus dem Seitenarchiv extrahieren (kein Netzwerk)')
+parser.add_argument('--input', default=CSV_INPUT, help='Cookidoo-Export (CSV)')
+parser.add_argument('--output', default=OUTPUT_DATABASE, help='Rezeptdatenbank (CSV)')
+parser.add_argument('--bls', default=BLS_DATABASE,
+                    help='BLS-Datenbank (CSV); Snapshot und Matcher-Cache liegen in .cache/ daneben')
+parser.add_argument('--rate-delay', type=float, default=RATE_LIMIT_DELAY,
+                    help=f'Sekunden zwischen Requests (default: RATE_LIMIT_DELAY = {RATE_LIMIT_DELAY})')
+parser.add_argument('--fixed-rate', action='store_true', help='festes Intervall statt adaptiver Rate-Steuerung')
+parser.add_argument('--incremental', action='store_true',
+                    help='nur neue Export-URLs laden, bestehende recipe_database.csv fortschreiben')
+parser.add_argument('--refresh-days', type=float,
+                    help='mit --incremental: Zeilen älter als N Tage neu laden')
+parser.add_argument('--stats-json', help='Durchsatz-/Latenz-Statistik als JSON speichern')
+args = parser.parse_args()
+
+http_cache = None if args.no_cache or args.replay else HttpCache()
+page_archive = PageArchive() if args.archive or args.replay else None
+if args.replay:
+    print(f"Replay-Modus: {len(page_archive)} Seiten im Archiv, kein Netzwerk")
 
 # ==========================================
 # 2. LADEN DER NOTWENDIGEN DATEN
 # ==========================================
 print("Lade Eingabedaten...")
 try:
-    recipes_df = pd.read_csv(CSV_INPUT)
+    recipes_df = pd.read_csv(args.input)
 except FileNotFoundError:
-    print(f"Fehler: '{CSV_INPUT}' nicht gefunden.")
+    print(f"Fehler: '{args.input}' nicht gefunden.")
     exit()
 
 try:
-    bls_df = pd.read_csv(BLS_DATABASE, low_memory=False)
+    bls_df = load_bls(args.bls)
 except FileNotFoundError:
-    print(f"Fehler: '{BLS_DATABASE}' nicht gefunden.")
+    print(f"Fehler: '{args.bls}' nicht gefunden.")
     exit()
 
 # Nährstoffspalten identifizieren
-nutrient_cols = [col for col in bls_df.columns if '[' in col]
-for col in nutrient_cols:
-    bls_df[col] = pd.to_numeric(bls_df[col], errors='coerce').fillna(0)
+nutrient_cols = get_nutrient_columns(bls_df.columns)
 
 print(f"Geladen: {len(recipes_df)} Rezepte, {len(bls_df)} BLS-Lebensmittel")
 
@@ -38,6 +123,10 @@ print(f"Geladen: {len(recipes_df)} Rezepte, {len(bls_df)} BLS-Lebensmittel")
 # NOTE: Manual ingredient mappings are centralized in ingredient_mapping_config.py
 # To add new mappings, edit that file and the changes will apply here automatically
 manual_map = MANUAL_INGREDIENT_MAP
+# Mapping-Schlüssel → BLS-Zeile einmalig auflösen (in .cache/ neben der BLS-Datenbank zwischengespeichert,
+# standardmäßig data/.cache/)
+matcher = load_matcher(manual_map, args.bls, bls_names=bls_df['Lebensmittelbezeichnung'].tolist(),
+                       mappings_path=os.path.join(os.path.dirname(os.path.abspath(args.bls)), 'ingredient_mappings.csv'))
 
 # ==========================================
 # AUTHOR NUTRITION EXTRACTION
@@ -103,118 +192,69 @@ def extract_author_nutrition(schema_data, serving_count):
 
     return nutrition
 
-def get_weight(name, qty, had_qty=True):
-    """Bestimme das Gewicht basierend auf Zutatentyp und Menge."""
-    ln = name.lower()
-    if not had_qty:
-        if 'petersilie' in ln or 'koriander' in ln: return 10.0
-        if 'knoblauch' in ln: return 4.0
-        if 'ingwer' in ln: return 5.0
-        return 1.0
-    if qty >= 10: return qty
-    if 'ei' in ln or 'eier' in ln: return qty * 55
-    if 'zwiebel' in ln: return qty * 100
-    if 'knoblauch' in ln: return qty * 4
-    if 'tomate' in ln or 'bohne' in ln or 'linse' in ln: return qty * 400
-    if 'tortilla' in ln: return qty * 40
-    if 'avocado' in ln: return qty * 180
-    if 'limette' in ln: return qty * 50
-    if 'eigelb' in ln: return qty * 18
-    return qty
-
 def match_ingredient_to_bls(ingredient_name):
     """Finde das beste Match im BLS für einen Zutatenname."""
-    for key, val in sorted(manual_map.items(), key=lambda x: len(x[0]), reverse=True):
-        if key in ingredient_name.lower():
-            match_df = bls_df[bls_df['Lebensmittelbezeichnung'].str.contains(val, case=False, na=False, regex=False)]
-            if not match_df.empty:
-                return match_df.iloc[0]
-    return None
+    bls_row = matcher.match(ingredient_name)
+    return None if bls_row is None else bls_df.iloc[bls_row]
 
 # ==========================================
 # 4. SCHEMA.ORG EXTRAKTION
 # ==========================================
+def fetch_page(url):
+    """Lade eine Seite (HTTP-Cache oder direkt) und erfasse Latenz + Status."""
+    headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
+    if http_cache is not None and http_cache.is_fresh(url):
+        return http_cache.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
+
+    start = time.perf_counter()
+    status = 'error'
+    retry_after = None
+    try:
+        if http_cache is not None:
+            content = http_cache.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
+            status = 200  # auch 304 (revalidiert)
+        else:
+            response = requests.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
+            status = response.status_code
+            response.raise_for_status()
+            content = response.content
+        return content
+    except requests.HTTPError as e:
+        status = e.response.status_code
+        retry_after = parse_retry_after(e.response.headers.get('Retry-After'))
+        raise
+    finally:
+        fetch_stats.record(time.perf_counter() - start, status)
+        limiter.on_response(status, retry_after)
+
+# Rückgabewert von extract_schema_org_recipe für vorübergehende Fehler → Retry-Queue
+RETRY = object()
+
+def is_retryable(error):
+    """429, 5xx, Timeouts und Verbindungsfehler lohnen einen späteren Versuch."""
+    if isinstance(error, requests.HTTPError):
+        return error.response.status_code == 429 or error.response.status_code >= 500
+    return isinstance(error, (requests.Timeout, requests.ConnectionError))
+
 def extract_schema_org_recipe(url):
     """Extrahiere Recipe schema.org Daten aus einer URL."""
     try:
-        headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
-        response = requests.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
-        response.raise_for_status()
-
-        soup = BeautifulSoup(response.content, 'html.parser')
-
-        # Finde JSON-LD schema.org Recipe Daten
-        for script in soup.find_all('script', type='application/ld+json'):
-            try:
-                data = json.loads(script.string)
-                if isinstance(data, dict) and (data.get('@type') == 'Recipe' or
-                                               data.get('@type') == ['Recipe']):
-                    return data
-                if isinstance(data, list):
-                    for item in data:
-                        if item.get('@type') == 'Recipe':
-                            return item
-            except json.JSONDecodeError:
-                continue
-
-        return None
-    except Exception as e:
-        print(f"  Fehler beim Abrufen von {url}: {str(e)}")
-        return None
-
-def parse_recipe_ingredients(recipe_data):
-    """Extrahiere Zutaten aus schema.org Recipe Daten."""
-    ingredients = []
-
-    if 'recipeIngredient' not in recipe_data:
-        return ingredients
-
-    ingredient_list = recipe_data['recipeIngredient']
-    if isinstance(ingredient_list, str):
-        ingredient_list = [ingredient_list]
-
-    for ingredient_str in ingredient_list:
-        # Decode HTML entities (&frac14; -> ¼, &frac12; -> ½, etc.)
-        ingredient_str = html.unescape(ingredient_str)
-
-        # Versuche Menge und Zutat zu trennen
-        match = re.match(r'^([\d\.\s½¼¾]+\s*(?:g|kg|ml|l|tsp|tbsp|cup|stück|prise|tl|el)?)\s*(.*)', ingredient_str, re.IGNORECASE)
-        if match:
-            qty_str = match.group(1).strip()
-            ingredient_name = match.group(2).strip()
-
-            # Clean up ingredient name - remove common qualifiers
-            ingredient_name = re.sub(r',\s*(frisch|getrocknet|gefroren|roh|gekocht|tk|tiefgekühlt)', '', ingredient_name, flags=re.IGNORECASE)
-            ingredient_name = re.sub(r'\s+(frisch|getrocknet|gefroren|roh|gekocht|tk|tiefgekühlt)$', '', ingredient_name, flags=re.IGNORECASE)
-            ingredient_name = re.sub(r'^(stängel|stengel|bund|blatt|blätter)\s+', '', ingredient_name, flags=re.IGNORECASE)
-            ingredient_name = re.sub(r'\s*\(.*?\)', '', ingredient_name)  # Remove parentheses
-            ingredient_name = ingredient_name.strip()
-
-            # Parse Menge (vereinfacht) - handle fractions
-            qty_match = re.match(r'([\d\.½¼¾]+)', qty_str)
-            if qty_match:
-                qty_str_parsed = qty_match.group(1)
-                # Convert fractions to decimals
-                qty_str_parsed = qty_str_parsed.replace('½', '.5').replace('¼', '.25').replace('¾', '.75')
-                qty = float(qty_str_parsed) if qty_str_parsed else 1.0
-            else:
-                qty = 1.0
-
-            ingredients.append({
-                'original': ingredient_str,
-                'name': ingredient_name,
-                'qty': qty,
-                'qty_str': qty_str
-            })
+        if args.replay:
+            content = page_archive.get(url)
+            if content is None:
+                print(f"  Nicht im Seitenarchiv: {url}")
+                return None
         else:
-            ingredients.append({
-                'original': ingredient_str,
-                'name': ingredient_str,
-                'qty': 1.0,
-                'qty_str': '1'
-            })
+            content = fetch_page(url)
 
-    return ingredients
+        if page_archive is not None and not args.replay:
+            page_archive.put(url, content)
+
+        # JSON-LD schema.org Recipe Daten (Regex über die Rohdaten, BeautifulSoup als Fallback)
+        return extract_recipe_jsonld(content)
+    except Exception as e:
+        print(f"  Fehler beim Abrufen von {url}: {str(e)}")
+        return RETRY if is_retryable(e) else None
 
 def calculate_recipe_nutrients(ingredients):
     """
@@ -224,8 +264,11 @@ def calculate_recipe_nutrients(ingredients):
     recipe_nutrients = {}
     ingredient_audit_trail = []
     matched_count = 0
+    # Gewichte für alle Zutaten auf einmal (weight_rules.py, Tabellen in recipe_config.py)
+    weights, rules = resolve_weights([i['name'] for i in ingredients], [i['qty'] for i in ingredients],
+                                     [i['unit'] for i in ingredients], [i['has_qty'] for i in ingredients])
 
-    for ingredient in ingredients:
+    for ingredient, weight, rule in zip(ingredients, weights.tolist(), rules):
         bls_data = match_ingredient_to_bls(ingredient['name'])
 
         audit_entry = {
@@ -236,14 +279,15 @@ def calculate_recipe_nutrients(ingredients):
             'matched': False,
             'bls_name': None,
             'weight_g': None,
+            'weight_rule': None,
             'nutrient_contribution': {}
         }
 
         if bls_data is not None:
-            weight = get_weight(ingredient['name'], ingredient['qty'], True)
             audit_entry['matched'] = True
             audit_entry['bls_name'] = bls_data['Lebensmittelbezeichnung']
             audit_entry['weight_g'] = weight
+            audit_entry['weight_rule'] = rule
             matched_count += 1
 
             # Track nutrient contributions per ingredient
@@ -262,67 +306,190 @@ def calculate_recipe_nutrients(ingredients):
 # ==========================================
 # 5. VERARBEITUNG ALLER REZEPTE
 # ==========================================
-print("\nExtrahiere Rezeptdaten...")
-recipe_results = []
-
-for idx, row in recipes_df.iterrows():
+def needs_request(url):
+    """False, wenn die Seite aus dem Archiv (Replay) oder frisch aus dem HTTP-Cache kommt (kein Rate-Limit nötig)."""
+    if args.replay:
+        return False
+    return http_cache is None or not http_cache.is_fresh(url)
+
+def fetch_sequential(urls):
+    """Ein Request nach dem anderen, im Tempo des RateControllers."""
+    for url in urls:
+        if needs_request(url):
+            limiter.acquire()
+        yield extract_schema_org_recipe(url)
+
+def fetch_schemas(urls):
+    """schema.org Daten für urls in Reihenfolge – sequentiell oder asynchron (--concurrency)."""
+    if args.concurrency > 1:
+        return AsyncFetcher(extract_schema_org_recipe, args.concurrency, limiter,
+                            needs_token=needs_request).map(urls)
+    return fetch_sequential(urls)
+
+def process_recipe(row, schema_data):
+    """Baue die Ergebniszeile (recipe_database.csv) für ein extrahiertes Rezept."""
     url = row['link--alt href']
     recipe_name = row['core-tile__description-text']
+    ingredients = parse_recipe_ingredients(schema_data)
+    nutrients, ingredient_audit_trail, matched_count = calculate_recipe_nutrients(ingredients)
+
+    # Extract serving size from schema.org
+    serving_size_str = schema_data.get('recipeYield', 'Unknown')
+
+    # Extract author-provided nutrition from schema.org
+    author_nutrition = extract_author_nutrition(schema_data, serving_size_str)
+
+    # Calculate match rate
+    total_ingredients = len(ingredients)
+    skipped_count = total_ingredients - matched_count
+    match_rate = (matched_count / total_ingredients * 100) if total_ingredients > 0 else 0
+
+    result = {
+        'recipe_name': recipe_name,
+        'recipe_url': url,
+        'rating': row['core-rating__label'],
+        'time': row['core-tile__description-subline'],
+        'ingredient_count': total_ingredients,
+        'ingredients_matched': matched_count,
+        'ingredients_skipped': skipped_count,
+        'match_rate_%': round(match_rate, 1),
+        'recipe_yield': serving_size_str,
+        'ingredient_audit_trail': json.dumps(ingredient_audit_trail, ensure_ascii=False),  # Detailed audit trail
+        'schema_org_json': json.dumps(schema_data, ensure_ascii=False),  # Store entire schema.org object
+        'extracted_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+    }
+
+    # Füge berechnete Nährstoffwerte hinzu (from BLS/ingredients)
+    for col in nutrient_cols:
+        result[col] = nutrients.get(col, 0)
+
+    # Füge Autor-Nährstoffwerte hinzu (from schema.org)
+    result.update(author_nutrition)
+    return result
 
-    print(f"[{idx+1}/{len(recipes_df)}] {recipe_name[:50]}...", end="", flush=True)
-
-    schema_data = extract_schema_org_recipe(url)
-
-    if schema_data:
-        ingredients = parse_recipe_ingredients(schema_data)
-        nutrients, ingredient_audit_trail, matched_count = calculate_recipe_nutrients(ingredients)
-
-        # Extract serving size from schema.org
-        serving_size_str = schema_data.get('recipeYield', 'Unknown')
-
-        # Extract author-provided nutrition from schema.org
-        author_nutrition = extract_author_nutrition(schema_data, serving_size_str)
-
-        # Calculate match rate
-        total_ingredients = len(ingredients)
-        skipped_count = total_ingredients - matched_count
-        match_rate = (matched_count / total_ingredients * 100) if total_ingredients > 0 else 0
-
-        result = {
-            'recipe_name': recipe_name,
-            'recipe_url': url,
-            'rating': row['core-rating__label'],
-            'time': row['core-tile__description-subline'],
-            'ingredient_count': total_ingredients,
-            'ingredients_matched': matched_count,
-            'ingredients_skipped': skipped_count,
-            'match_rate_%': round(match_rate, 1),
-            'recipe_yield': serving_size_str,
-            'ingredient_audit_trail': json.dumps(ingredient_audit_trail, ensure_ascii=False),  # Detailed audit trail
-            'schema_org_json': json.dumps(schema_data, ensure_ascii=False),  # Store entire schema.org object
-        }
+print("\nExtrahiere Rezeptdaten...")
+# Eigenes Journal je Ausgabedatei (z.B. Benchmark-Läufe mit --output)
+journal_path = EXTRACTION_JOURNAL if args.output == OUTPUT_DATABASE else args.output + '.journal.jsonl'
+journal = ExtractionJournal(journal_path)
+if args.restart:
+    journal.remove()
+journaled = journal.load()
+
+urls = recipes_df['link--alt href'].tolist()
+
+# Inkrementell: Diff Export ↔ bestehende Rezeptdatenbank
+existing_rows = {}
+if args.incremental:
+    if os.path.exists(args.output):
+        existing_df = pd.read_csv(args.output)
+        existing_rows = {row['recipe_url']: row for row in existing_df.to_dict('records')}
+        export_urls = set(urls)
+        removed = [url for url in existing_rows if url not in export_urls]
+        stale = set()
+        if args.refresh_days is not None and 'extracted_at' not in existing_df:
+            stale = set(existing_rows)  # Datenbank von vor extracted_at
+        elif args.refresh_days is not None:
+            cutoff = datetime.now(timezone.utc) - timedelta(days=args.refresh_days)
+            extracted_at = pd.to_datetime(existing_df['extracted_at'], utc=True, errors='coerce')
+            stale = set(existing_df.loc[~(extracted_at >= cutoff), 'recipe_url'])  # NaT → neu laden
+        unchanged = {url for url in urls if url in existing_rows and url not in stale}
+        new_count = sum(1 for url in export_urls if url not in existing_rows)
+        refresh_count = sum(1 for url in export_urls if url in stale)
+        print(f"Inkrementell: {len(unchanged)} unverändert, {new_count} neu, "
+              f"{refresh_count} zu aktualisieren, {len(removed)} nicht mehr im Export")
+        # Alte Zeilen nur noch als Rückfall für fehlgeschlagene Refreshes
+        existing_rows = {url: row for url, row in existing_rows.items() if url in export_urls}
+    else:
+        print(f"Inkrementell: '{args.output}' existiert noch nicht → vollständiger Lauf")
+        unchanged = set()
+else:
+    unchanged = set()
 
-        # Füge berechnete Nährstoffwerte hinzu (from BLS/ingredients)
-        for col in nutrient_cols:
-            result[col] = nutrients.get(col, 0)
+pending_urls = [url for url in urls if url not in journaled and url not in unchanged]
+if journaled:
+    print(f"Setze abgebrochenen Lauf fort: {sum(1 for url in urls if url in journaled)} Rezepte bereits im Journal")
 
-        # Füge Autor-Nährstoffwerte hinzu (from schema.org)
-        result.update(author_nutrition)
+fetch_stats = FetchStats()
+limiter = RateController(args.rate_delay, adaptive=not args.fixed_rate)
+mode = "fest" if args.fixed_rate else "adaptiv"
+if args.concurrency > 1:
+    print(f"Asynchroner Modus: {args.concurrency} gleichzeitige Requests, Start {limiter.rate:.1f} Requests/s ({mode})")
 
-        recipe_results.append(result)
-        print(f" ✓ ({matched_count}/{total_ingredients} matched)")
+retry_queue = []
+
+def handle_schema(idx, row, schema_data):
+    """Verarbeite ein geladenes Rezept: Journal, Retry-Queue oder übersprungen."""
+    url = row['link--alt href']
+    if schema_data is RETRY:
+        retry_queue.append((idx, row))
+        print(" ↻ (Retry-Queue)")
+    elif schema_data:
+        result = process_recipe(row, schema_data)
+        journal.append(url, result)
+        print(f" ✓ ({result['ingredients_matched']}/{result['ingredient_count']} matched)")
     else:
         print(" ✗ (Keine Recipe-Daten gefunden)")
 
-    time.sleep(RATE_LIMIT_DELAY)
+    report = fetch_stats.minute_report(limiter)
+    if report:
+        print(report)
+
+schema_results = fetch_schemas(pending_urls)
+try:
+    for idx, row in recipes_df.iterrows():
+        url = row['link--alt href']
+        recipe_name = row['core-tile__description-text']
+
+        print(f"[{idx+1}/{len(recipes_df)}] {recipe_name[:50]}...", end="", flush=True)
+
+        if url in journaled:
+            result = journaled[url]
+            print(f" ✓ (Journal, {result['ingredients_matched']}/{result['ingredient_count']} matched)")
+            continue
+        if url in unchanged:
+            print(" = (unverändert)")
+            continue
+
+        handle_schema(idx, row, next(schema_results))
+    schema_results.close()
+
+    # Retry-Queue: vorübergehend fehlgeschlagene Seiten erneut versuchen
+    for retry_round in range(1, MAX_RETRIES + 1):
+        if not retry_queue:
+            break
+        retry_rows = retry_queue.copy()
+        retry_queue.clear()
+        print(f"\nRetry-Runde {retry_round}/{MAX_RETRIES}: {len(retry_rows)} Rezepte "
+              f"(Intervall {limiter.interval:.2f}s)")
+        for _ in retry_rows:
+            fetch_stats.record_retry()
+        schema_results = fetch_schemas([row['link--alt href'] for _, row in retry_rows])
+        for idx, row in retry_rows:
+            print(f"[{idx+1}/{len(recipes_df)}] {row['core-tile__description-text'][:50]}...", end="", flush=True)
+            handle_schema(idx, row, next(schema_results))
+        schema_results.close()
+    if retry_queue:
+        print(f"\n✗ {len(retry_queue)} Rezepte auch nach {MAX_RETRIES} Retry-Runden nicht geladen:")
+        for _, row in retry_queue:
+            print(f"  • {row['link--alt href']}")
+except KeyboardInterrupt:
+    schema_results.close()
+    journal.close()
+    print(f"\n\nAbgebrochen. Bisherige Ergebnisse sind im Journal gesichert: {journal_path}")
+    print("Erneuter Aufruf setzt den Lauf fort.")
+    sys.exit(1)
+journal.close()
+
+# Neu extrahierte Rezepte aus dem Journal, übrige (inkrementell) aus der bestehenden Datenbank
+recipe_results = journal.materialize(urls, fallback=existing_rows)
 
 # ==========================================
 # 6. SPEICHERN DER REZEPTDATENBANK
 # ==========================================
 if recipe_results:
     result_df = pd.DataFrame(recipe_results)
-    result_df.to_csv(OUTPUT_DATABASE, index=False, encoding='utf-8-sig')
-    print(f"\nRezeptdatenbank gespeichert: {OUTPUT_DATABASE}")
+    result_df.to_csv(args.output, index=False, encoding='utf-8-sig')
+    print(f"\nRezeptdatenbank gespeichert: {args.output}")
     print(f"Erfolgreich verarbeitete Rezepte: {len(recipe_results)}/{len(recipes_df)}")
     print("\nVorschau (erste 3 Rezepte):")
     preview_cols = ['recipe_name', 'ingredient_count', 'ingredients_matched', 'ingredients_skipped', 'match_rate_%']
@@ -330,5 +497,18 @@ if recipe_results:
     print(f"\nDurchschnittliche Match-Rate: {result_df['match_rate_%'].mean():.1f}%")
     print(f"Median Match-Rate: {result_df['match_rate_%'].median():.1f}%")
     print(f"Min/Max Match-Rate: {result_df['match_rate_%'].min():.1f}% / {result_df['match_rate_%'].max():.1f}%")
+    # Lauf vollständig → Journal wird nicht mehr gebraucht
+    journal.remove()
 else:
     print("\nKeine Rezepte konnten verarbeitet werden.")
+
+if http_cache is not None:
+    print(f"\nHTTP-Cache: {http_cache.summary()}")
+
+if args.stats_json:
+    stats = fetch_stats.summary(len(urls), len(recipe_results))
+    stats.update(concurrency=args.concurrency, rate_delay=args.rate_delay, adaptive=not args.fixed_rate,
+                 final_interval=round(limiter.interval, 3))
+    with open(args.stats_json, 'w', encoding='utf-8') as f:
+        json.dump(stats, f, indent=2)
+    print(f"✓ Statistik gespeichert: {args.stats_json}")
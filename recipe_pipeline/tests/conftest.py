@@ -0,0 +1,6 @@
+"""Pipeline modules import each other by bare name (like the scripts in recipe_pipeline/)."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,115 @@
+"""Incremental audit pass: which recipes a mapping change can affect."""
+
+import random
+
+import pandas as pd
+
+from audit_state import AUDIT_STATE_VERSION, AuditState, changed_mapping_keys, load_audit_state
+from benchmark_matcher import build_ingredients
+from ingredient_mapping_config import MANUAL_INGREDIENT_MAP
+from ingredient_matcher import IngredientMatcher
+
+
+def make_recipes(count, rng):
+    rows, names = [], []
+    for i in range(count):
+        recipe_names = build_ingredients(MANUAL_INGREDIENT_MAP, rng.randint(3, 12), rng)
+        rows.append({'recipe_url': f'https://example.org/rezept/{i}', 'recipe_name': f'Rezept {i}',
+                     'schema_org_json': '{"recipeIngredient": %d}' % i})
+        names.append(recipe_names)
+    return pd.DataFrame(rows), names
+
+
+def recorded_state(recipes_df, names, mappings):
+    state = AuditState(data={'version': AUDIT_STATE_VERSION, 'mappings': dict(mappings)})
+    for row, recipe_names in zip(recipes_df.to_dict('records'), names):
+        state.record(row, recipe_names)
+    return state
+
+
+def test_changed_mapping_keys():
+    old = {'zwiebel': 'Zwiebel roh', 'ei': 'Hühnerei', 'reis': 'Reis roh'}
+    new = {'zwiebel': 'Zwiebel gekocht', 'ei': 'Hühnerei', 'lauch': 'Lauch roh'}
+    assert changed_mapping_keys(old, new) == ['lauch', 'reis', 'zwiebel']
+
+
+def test_reordered_equal_length_keys_are_changed():
+    old = {'paprika': 'Paprika roh', 'zwiebel': 'Zwiebel roh', 'ei': 'Hühnerei', 'mehl': 'Weizenmehl'}
+    new = {'zwiebel': 'Zwiebel roh', 'mehl': 'Weizenmehl', 'paprika': 'Paprika roh', 'ei': 'Hühnerei'}
+    assert changed_mapping_keys(old, new) == ['paprika', 'zwiebel']
+    assert changed_mapping_keys(old, dict(old)) == []
+
+
+def test_reordering_affects_every_recipe_with_a_different_match():
+    rng = random.Random(11)
+    recipes_df, names = make_recipes(300, rng)
+    by_length = {}
+    for key in MANUAL_INGREDIENT_MAP:
+        by_length.setdefault(len(key), []).append(key)
+    groups = [group for group in by_length.values() if len(group) > 1]
+    for recipe_names in names[::3]:
+        first, second = rng.sample(rng.choice(groups), 2)
+        recipe_names.append(f'{first} mit {second}')  # two equal-length keys: the earlier one wins
+    state = recorded_state(recipes_df, names, MANUAL_INGREDIENT_MAP)
+
+    keys = list(MANUAL_INGREDIENT_MAP)
+    rng.shuffle(keys)
+    new_map = {key: MANUAL_INGREDIENT_MAP[key] for key in keys}
+    positions, _ = state.affected_positions(new_map, recipes_df)
+
+    resolved = {key: i for i, key in enumerate(MANUAL_INGREDIENT_MAP)}
+    old_matcher = IngredientMatcher(MANUAL_INGREDIENT_MAP, resolved)
+    new_matcher = IngredientMatcher(new_map, resolved)
+    different = [pos for pos, recipe_names in enumerate(names)
+                 if any(old_matcher.match_key(name) != new_matcher.match_key(name) for name in recipe_names)]
+    assert different and set(different) <= set(positions)
+
+
+def test_affected_positions_equal_substring_scan():
+    rng = random.Random(9)
+    recipes_df, names = make_recipes(300, rng)
+    state = recorded_state(recipes_df, names, MANUAL_INGREDIENT_MAP)
+
+    new_map = dict(MANUAL_INGREDIENT_MAP)
+    changed_keys = rng.sample(sorted(new_map), 5)
+    for key in changed_keys:
+        new_map[key] = 'Geändert'
+    new_map['kichererbsenmehl'] = 'Neu'
+
+    positions, changed = state.affected_positions(new_map, recipes_df)
+    assert changed == sorted(changed_keys + ['kichererbsenmehl'])
+    expected = [pos for pos, recipe_names in enumerate(names)
+                if any(key in name.lower() for key in changed for name in recipe_names)]
+    assert positions == expected
+    assert 0 < len(positions) < len(recipes_df)
+
+
+def test_new_and_changed_recipes_are_affected():
+    rng = random.Random(3)
+    recipes_df, names = make_recipes(20, rng)
+    state = recorded_state(recipes_df.iloc[:19], names[:19], MANUAL_INGREDIENT_MAP)
+    recipes_df.loc[4, 'schema_org_json'] = '{"recipeIngredient": "geändert"}'
+
+    positions, changed = state.affected_positions(MANUAL_INGREDIENT_MAP, recipes_df)
+    assert changed == []
+    assert positions == [4, 19]
+
+
+def test_state_round_trip(tmp_path):
+    rng = random.Random(5)
+    recipes_df, names = make_recipes(10, rng)
+    mappings_path = str(tmp_path / 'ingredient_mappings.csv')
+    state = load_audit_state(mappings_path)
+    assert state.full_pass_reason(MANUAL_INGREDIENT_MAP, 'sha', [], recipes_df) == "no previous run recorded"
+
+    for row, recipe_names in zip(recipes_df.to_dict('records'), names):
+        state.record(row, recipe_names)
+    nutrient_cols = ['Energie (kcal)']
+    state.save(MANUAL_INGREDIENT_MAP, 'sha', nutrient_cols, recipes_df.iloc[:8])
+
+    reloaded = load_audit_state(mappings_path)
+    assert sorted(reloaded.recipes) == sorted(recipes_df['recipe_url'][:8])  # dropped recipes are forgotten
+    results_df = recipes_df.assign(**{'ingredient_audit_trail': '[]', 'match_rate_%': 0.0, nutrient_cols[0]: 0.0})
+    assert reloaded.full_pass_reason(MANUAL_INGREDIENT_MAP, 'sha', nutrient_cols, results_df) is None
+    assert reloaded.full_pass_reason(MANUAL_INGREDIENT_MAP, 'other', nutrient_cols, results_df) == "BLS database changed"
+    assert reloaded.full_pass_reason(MANUAL_INGREDIENT_MAP, 'sha', nutrient_cols, recipes_df) is not None
@@ -0,0 +1,71 @@
+"""recipe_add_audit_trails.py --workers N: same audit trails and nutrient totals as the serial run."""
+
+import json
+import multiprocessing
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import recipe_add_audit_trails
+from benchmark_matcher import build_ingredients
+from bls_loader import open_nutrient_matrix
+from ingredient_mapping_config import MANUAL_INGREDIENT_MAP
+from ingredient_matcher import load_match_cache, load_matcher
+from recipe_add_audit_trails import fill_nutrient_contributions, iter_recipe_matches
+from recipe_nutrients import RecipeWeightMatrix
+
+
+@pytest.fixture
+def setup(tmp_path, monkeypatch):
+    if multiprocessing.get_start_method() != 'fork':
+        pytest.skip('workers read the patched paths through fork')
+    rng = np.random.default_rng(10)
+    names = sorted(set(MANUAL_INGREDIENT_MAP.values()))
+    bls_path = str(tmp_path / 'bls.csv')
+    pd.DataFrame({
+        'Code': [f'X{i}' for i in range(len(names))],
+        'Lebensmittelbezeichnung': names,
+        'ENERCC Energie (Kilokalorien) [kcal/100g]': (rng.random(len(names)) * 500).round(1),
+        'LACS Lactose [g/100g]': (rng.random(len(names)) * 5).round(2),
+    }).to_csv(bls_path, index=False)
+    mappings_path = str(tmp_path / 'ingredient_mappings.csv')
+    monkeypatch.setattr(recipe_add_audit_trails, 'BLS_DATABASE', bls_path)
+    monkeypatch.setattr(recipe_add_audit_trails, 'PATH_INGREDIENT_MAPPINGS', mappings_path)
+
+    py_rng = random.Random(10)
+    schema_jsons = [json.dumps({'recipeIngredient': build_ingredients(MANUAL_INGREDIENT_MAP, py_rng.randint(2, 12),
+                                                                      py_rng)})
+                    for _ in range(60)]
+    schema_jsons[7] = 'kein json'
+    return bls_path, mappings_path, schema_jsons
+
+
+def run(bls_path, mappings_path, schema_jsons, workers):
+    """Pass 1 + 2 of recipe_add_audit_trails.main() for all recipes."""
+    bls_matrix = open_nutrient_matrix(bls_path)
+    matcher = load_matcher(MANUAL_INGREDIENT_MAP, bls_path, bls_names=bls_matrix.names, mappings_path=mappings_path)
+    match_cache = load_match_cache(matcher, mappings_path)
+    weights = RecipeWeightMatrix(len(schema_jsons), bls_matrix)
+    trails = []
+    for pos, result in enumerate(iter_recipe_matches(schema_jsons, MANUAL_INGREDIENT_MAP, match_cache,
+                                                     bls_matrix.names, workers)):
+        if result is None:
+            trails.append(None)
+            continue
+        audit_trail, matches, _ = result
+        entry_ids = [weights.add(pos, bls_row, weight) for bls_row, weight in matches]
+        fill_nutrient_contributions(audit_trail, entry_ids, weights, bls_matrix.columns)
+        trails.append(audit_trail)
+    return trails, weights.totals(), match_cache
+
+
+def test_workers_equal_serial(setup):
+    serial_trails, serial_totals, serial_cache = run(*setup, workers=1)
+    parallel_trails, parallel_totals, parallel_cache = run(*setup, workers=3)
+    assert parallel_trails == serial_trails
+    assert parallel_trails[7] is None and any(entry['matched'] for entry in parallel_trails[0])
+    np.testing.assert_array_equal(parallel_totals, serial_totals)
+    assert parallel_cache.hits + parallel_cache.misses == serial_cache.hits + serial_cache.misses
+    assert dict(parallel_cache.entries) == dict(serial_cache.entries)
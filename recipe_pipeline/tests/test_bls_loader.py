@@ -0,0 +1,66 @@
+"""Nutrient matrix cache (bls_loader.open_nutrient_matrix): rebuilds and matrix/index consistency."""
+
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from bls_loader import MATRIX_INDEX_FILE, get_cache_dir, open_nutrient_matrix
+
+
+def write_csv(path, rows):
+    lines = ['Code,Lebensmittelbezeichnung,ENERCC Energie (Kilokalorien) [kcal/100g],PROT625 Protein [g/100g]']
+    lines += [f'X{i},{name},{kcal},{prot}' for i, (name, kcal, prot) in enumerate(rows)]
+    path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+
+
+@pytest.fixture
+def bls_csv(tmp_path):
+    path = tmp_path / 'bls.csv'
+    write_csv(path, [('Speisezwiebel roh', 28, 1.2), ('Hühnerei roh', 137, 12.9)])
+    return str(path)
+
+
+def test_open_builds_and_reuses(bls_csv):
+    matrix = open_nutrient_matrix(bls_csv)
+    assert matrix.values.shape == (2, 2)
+    assert matrix.row(matrix.row_of('Hühnerei roh')).tolist() == pytest.approx([137, 12.9])
+    cache = os.listdir(get_cache_dir(bls_csv))
+    assert not [name for name in cache if name.endswith('.tmp')]
+    assert open_nutrient_matrix(bls_csv).values.shape == (2, 2)
+
+
+def test_changed_csv_gets_new_matrix_file(bls_csv):
+    old = open_nutrient_matrix(bls_csv)
+    write_csv(Path(bls_csv),
+              [('Speisezwiebel roh', 28, 1.2), ('Hühnerei roh', 137, 12.9), ('Reis roh', 349, 7.0)])
+    new = open_nutrient_matrix(bls_csv)
+    assert new.values.shape == (3, 2)
+    assert new.values.filename != old.values.filename
+    np.testing.assert_allclose(old.values[1], [137, 12.9], rtol=1e-6)  # the old mapping stays readable
+    matrices = [name for name in os.listdir(get_cache_dir(bls_csv)) if name.endswith('.f32')]
+    assert matrices == [os.path.basename(new.values.filename)]
+
+
+def test_index_with_wrong_shape_is_rebuilt(bls_csv):
+    open_nutrient_matrix(bls_csv)
+    index_path = os.path.join(get_cache_dir(bls_csv), MATRIX_INDEX_FILE)
+    with open(index_path, encoding='utf-8') as f:
+        index = json.load(f)
+    index['shape'] = [5, 2]
+    with open(index_path, 'w', encoding='utf-8') as f:
+        json.dump(index, f)
+    assert open_nutrient_matrix(bls_csv).values.shape == (2, 2)
+
+
+def open_shape(path):
+    return open_nutrient_matrix(path).values.shape
+
+
+def test_concurrent_builds(bls_csv):
+    with ProcessPoolExecutor(4) as pool:
+        assert set(pool.map(open_shape, [bls_csv] * 8)) == {(2, 2)}
+    assert not [name for name in os.listdir(get_cache_dir(bls_csv)) if name.endswith('.tmp')]
@@ -0,0 +1,104 @@
+"""Trigram index search (TrigramIndex.search) and batch mode (TfidfIndex) vs. the full SequenceMatcher scan."""
+
+import random
+from difflib import SequenceMatcher
+
+import numpy as np
+import pytest
+
+from benchmark_bls_search import synthetic_bls_names
+import bls_search
+from bls_search import TfidfIndex, TrigramIndex, similarity, trigrams
+from ingredient_mapping_config import MANUAL_INGREDIENT_MAP
+from ingredient_parser import TEST_CASES
+
+
+def synthetic_queries(count, rng):
+    keys = list(MANUAL_INGREDIENT_MAP)
+    queries = list(TEST_CASES) + ['ei', 'öl', 'x', '', '700 g kartoffeln']
+    while len(queries) < count:
+        query = rng.choice(keys)
+        if rng.random() < 0.3:
+            query = rng.choice(['200 g ', 'frische ', '']) + query + rng.choice(['', 'n', ', gehackt'])
+        elif rng.random() < 0.3:
+            query = query[:rng.randint(2, max(2, len(query)))]
+        queries.append(query)
+    return queries
+
+
+@pytest.fixture(scope='module')
+def index():
+    return TrigramIndex(synthetic_bls_names(800, random.Random(4)) + [None])
+
+
+def test_trigrams():
+    assert trigrams('ei') == {'ei'}
+    assert trigrams('') == set()
+    assert trigrams('zwiebel') == {'zwi', 'wie', 'ieb', 'ebe', 'bel'}
+
+
+def test_similarity_substring_bonus():
+    assert similarity('zwiebel', 'zwiebel') == 1.0
+    assert similarity('zwiebel', 'zwiebel roh') == pytest.approx(min(1.0, 14 / 18 + 0.2))
+
+
+@pytest.mark.parametrize('threshold, k', [(0.4, 3), (0.5, 3), (0.3, 10)])
+def test_search_equals_full_scan(index, threshold, k):
+    for query in synthetic_queries(100, random.Random(k)):
+        assert index.search(query, threshold=threshold, k=k) == index.search_linear(query, threshold=threshold, k=k), query
+
+
+def test_bounds_never_below_ratio(index):
+    ids = np.arange(len(index))
+    for query in ['zwiebel', 'rote linsen', 'kartoffeln festkochend']:
+        ratios = np.array([SequenceMatcher(None, query, name).ratio() for name in index.lowered])
+        assert (index.ratio_bound(query) >= ratios - 1e-12).all()
+        assert (index.lcs_bound(query, ids) >= ratios - 1e-12).all()
+
+
+def test_shortlist_contains_substring_candidates(index):
+    for query in ['zwiebel', 'öl', 'reis']:
+        shortlist = set(index.shortlist(query).tolist())
+        assert {i for i, name in enumerate(index.lowered) if query in name} <= shortlist
+
+
+def word_score(query, name):
+    """Custom score in the style of auto_mapping_workflow.fuzzy_score."""
+    words = query.split()
+    word_match = sum(word in name for word in words) / len(words) if words else 0
+    return SequenceMatcher(None, query, name).ratio() * 0.7 + word_match * 0.3
+
+
+@pytest.fixture(scope='module')
+def tfidf(index):
+    return TfidfIndex(index.names)
+
+
+def test_batch_default_score_equals_exact_search(index, tfidf):
+    queries = synthetic_queries(100, random.Random(7))
+    assert tfidf.search_batch(queries, threshold=0.4, k=3) == [index.search(q, threshold=0.4, k=3) for q in queries]
+
+
+def test_batch_custom_score_equals_full_scan(tfidf):
+    queries = synthetic_queries(100, random.Random(8))
+    results = tfidf.search_batch(queries, threshold=0.6, k=3, score=word_score, bound=lambda upper: 0.7 * upper + 0.3)
+    for query, result in zip(queries, results):
+        query = query.lower().strip()
+        full = sorted(((word_score(query, name), i) for i, name in enumerate(tfidf.lowered)),
+                      key=lambda item: (-item[0], item[1]))
+        assert result == [(score, tfidf.names[i]) for score, i in full[:3] if score > 0.6], query
+
+
+def test_custom_score_needs_bound(tfidf):
+    with pytest.raises(ValueError):
+        tfidf.search_batch(['zwiebel'], score=word_score)
+
+
+def test_top_k_without_scipy(index, tfidf, monkeypatch):
+    queries = synthetic_queries(50, random.Random(9))
+    ids, sims = tfidf.top_k(queries, k=5)
+    monkeypatch.setattr(bls_search, 'sparse', None)
+    fallback_ids, fallback_sims = TfidfIndex(index.names).top_k(queries, k=5)
+    np.testing.assert_array_equal(ids, fallback_ids)
+    np.testing.assert_allclose(sims, fallback_sims)
+    assert ids.shape == (len(queries), 5)
@@ -0,0 +1,79 @@
+"""Shared ingredient grammar (parse_recipe_ingredient) and its differences to the old pipelines."""
+
+import os
+
+import pytest
+
+from benchmark_ingredient_grammar import (UNMATCHED_CORPUS, classify, compare, explain_parse_ingredient,
+                                          load_corpus, parse_recipe_ingredient_legacy)
+from benchmark_ingredient_parser import DEFAULT_CORPUS as PARSER_CORPUS
+from benchmark_ingredient_parser import load_corpus as load_parser_corpus
+from benchmark_ingredient_parser import parse_ingredient_legacy
+from ingredient_parser import (TEST_CASES, parse_ingredient, parse_number, parse_quantity, parse_recipe_ingredient,
+                               parse_recipe_ingredients)
+
+
+@pytest.mark.parametrize('ingredient, expected', [
+    ("10 g Ingwer, frisch", ("Ingwer", 10.0, "10 g", "g", True)),
+    ("2-3 EL Olivenöl", ("Olivenöl", 2.5, "2-3 EL", "el", True)),
+    ("1 - 2 Tropfen Bittermandelaroma", ("Bittermandelaroma", 1.5, "1 - 2 Tropfen", "tropfen", True)),
+    ("1 ½ Brötchen", ("Brötchen", 1.5, "1 ½", "", True)),
+    ("1/2 TL Salz", ("Salz", 0.5, "1/2 TL", "tl", True)),
+    ("1,5 kg Kartoffeln", ("Kartoffeln", 1.5, "1,5 kg", "kg", True)),
+    ("½ Bund Koriander", ("Koriander", 0.5, "½ Bund", "bund", True)),
+    ("1 Prise Zucker (optional)", ("Zucker", 1.0, "1 Prise", "prise", True)),
+    ("3 Stängel Minze", ("Minze", 3.0, "3", "", True)),
+    ("Salz", ("Salz", 1.0, "1", "", False)),
+])
+def test_parse_recipe_ingredient(ingredient, expected):
+    assert parse_recipe_ingredient(ingredient) == expected
+
+
+@pytest.mark.parametrize('ingredient', ["2 Lauchzwiebeln", "1 Lorbeerblatt", "4 Gläser Wasser"])
+def test_units_match_whole_words_only(ingredient):
+    name, qty, qty_str, unit, has_qty = parse_recipe_ingredient(ingredient)
+    assert unit == ''
+    assert name == ingredient.split(' ', 1)[1]
+
+
+@pytest.mark.parametrize('text, value', [("1.5", 1.5), ("1,5", 1.5), ("1/2", 0.5), ("½", 0.5), ("1½", 1.5),
+                                         ("1 ½", 1.5), ("⅓", 1 / 3), ("1/0", 0.0)])
+def test_parse_number(text, value):
+    assert parse_number(text) == pytest.approx(value)
+
+
+def test_parse_quantity_range_gives_mean():
+    assert parse_quantity("2-3") == 2.5
+    assert parse_quantity("1 – 2") == 1.5
+    assert parse_quantity("") == 1.0
+
+
+def test_parse_recipe_ingredients_unescapes_html():
+    ingredients = parse_recipe_ingredients({'recipeIngredient': "&frac12; TL Salz"})
+    assert ingredients == [{'original': "½ TL Salz", 'name': "Salz", 'qty': 0.5, 'qty_str': "½ TL",
+                            'unit': "tl", 'has_qty': True}]
+
+
+def test_recipe_grammar_differences_are_explained():
+    if not os.path.exists(UNMATCHED_CORPUS):
+        pytest.skip('unmatched_ingredients.csv not found')
+    categories, examples = compare(load_corpus([UNMATCHED_CORPUS]), parse_recipe_ingredient_legacy,
+                                   lambda item: parse_recipe_ingredient(item)[:3], classify)
+    assert 'UNEXPECTED' not in categories, examples.get('UNEXPECTED', [])[:5]
+    assert categories['identical'] > 0
+
+
+def test_parse_ingredient_differences_are_explained():
+    items = list(TEST_CASES)
+    if os.path.exists(PARSER_CORPUS):
+        items += load_parser_corpus(PARSER_CORPUS)
+    categories, examples = compare(items, parse_ingredient_legacy, parse_ingredient, explain_parse_ingredient)
+    assert 'UNEXPECTED' not in categories, examples.get('UNEXPECTED', [])[:5]
+
+
+def test_old_unit_prefix_bug_is_fixed():
+    # The old pipelines read "1 L" + "orbeerblatt"
+    assert parse_recipe_ingredient_legacy("1 Lorbeerblatt")[0] == "orbeerblatt"
+    assert parse_recipe_ingredient("1 Lorbeerblatt")[0] == "Lorbeerblatt"
+    assert parse_ingredient_legacy("1 Lorbeerblatt")[0] == "orbeerblatt"
+    assert parse_ingredient("1 Lorbeerblatt")[0] == "lorbeerblatt"
@@ -0,0 +1,60 @@
+"""Aho–Corasick matcher (IngredientMatcher.match_key) vs. the linear key scan, and the match cache bound."""
+
+import random
+
+import pytest
+
+from benchmark_matcher import build_ingredients, build_mapping
+from ingredient_mapping_config import MANUAL_INGREDIENT_MAP
+from ingredient_matcher import IngredientMatcher, KeywordAutomaton, MatchCache
+from ingredient_parser import TEST_CASES
+
+
+def test_automaton_returns_highest_priority_key():
+    automaton = KeywordAutomaton(['rote zwiebel', 'zwiebel', 'ei'])
+    assert automaton.best('2 rote zwiebeln') == 0
+    assert automaton.best('1 zwiebel') == 1
+    assert automaton.best('4 eier') == 2
+    assert automaton.best('reis') == 2  # plain substring, as in the linear scan
+    assert automaton.best('mehl') is None
+
+
+def test_automaton_finds_key_ending_inside_longer_key():
+    # 'bcd' ends inside 'abcde' – only the failure links find it
+    automaton = KeywordAutomaton(['abcde', 'bcd'])
+    assert automaton.best('xabcdx') == 1
+
+
+def test_match_key_equals_linear_scan_on_mapping_table():
+    resolved = {key: i for i, key in enumerate(MANUAL_INGREDIENT_MAP)}
+    matcher = IngredientMatcher(MANUAL_INGREDIENT_MAP, resolved)
+    ingredients = list(TEST_CASES) + list(MANUAL_INGREDIENT_MAP)
+    ingredients += build_ingredients(MANUAL_INGREDIENT_MAP, 2000, random.Random(1))
+    for ingredient in ingredients:
+        assert matcher.match_key(ingredient) == matcher.match_key_linear(ingredient), ingredient
+
+
+@pytest.mark.parametrize('size', [500, 5000])
+def test_match_key_equals_linear_scan_on_synthetic_keys(size):
+    rng = random.Random(size)
+    mapping = build_mapping(size, rng)
+    matcher = IngredientMatcher(mapping, {key: 0 for key in mapping})
+    for ingredient in build_ingredients(mapping, 1000, rng):
+        assert matcher.match_key(ingredient) == matcher.match_key_linear(ingredient), ingredient
+
+
+def test_unresolved_keys_are_skipped():
+    matcher = IngredientMatcher({'zwiebel': 'Zwiebel roh', 'rote zwiebel': 'Unbekannt'},
+                                {'zwiebel': 3, 'rote zwiebel': None})
+    assert matcher.match_key('1 rote zwiebel') == 'zwiebel'
+    assert matcher.match('1 rote zwiebel') == 3
+
+
+def test_match_cache_stays_bounded():
+    matcher = IngredientMatcher({'zwiebel': 'Zwiebel roh'}, {'zwiebel': 7})
+    cache = MatchCache(matcher, max_size=3)
+    for name in ['a', 'b', 'c', 'zwiebel']:
+        cache.match(name)
+    cache.update({f'worker {i}': None for i in range(5)})
+    assert len(cache.entries) == 3
+    assert list(cache.entries) == ['worker 2', 'worker 3', 'worker 4']
@@ -0,0 +1,67 @@
+"""Compiled tokenizer (parse_ingredient) vs. the per-call-regex steps it replaced."""
+
+import os
+
+import pandas as pd
+import pytest
+
+from benchmark_ingredient_grammar import parse_ingredient_amount_grammar
+from benchmark_ingredient_parser import DEFAULT_CORPUS, load_corpus, parse_ingredient_legacy
+from ingredient_parser import TEST_CASES, normalize_ingredient, parse_ingredient, parse_many
+
+
+@pytest.fixture(scope='module')
+def corpus():
+    if not os.path.exists(DEFAULT_CORPUS):
+        pytest.skip('unmatched_ingredients.csv not found')
+    return load_corpus(DEFAULT_CORPUS)
+
+
+@pytest.mark.parametrize('ingredient, expected', [
+    ("10 g ingwer, frisch", ("ingwer", "10 g", "frisch")),
+    ("½ bund koriander", ("koriander", "½ bund", "")),
+    ("1 rote paprika", ("paprika", "1", "rot")),
+    ("2 prisen muskat", ("muskat", "2 prisen", "")),
+    ("400 g fusilli aus grünen erbsen, getrocknet", ("fusilli aus grünen erbsen", "400 g", "getrocknet")),
+    ("½ tl paprika edelsüß", ("paprika edelsüß", "½ tl", "")),
+    ("2 dosen maiskörner", ("maiskörner", "2 dosen", "")),
+    ("ingwer, frisch", ("ingwer", "", "frisch")),
+    ("Pizzagewürz", ("pizzagewürz", "", "")),
+    ("", ("", "", "")),
+    (None, ("", "", "")),
+])
+def test_parse_ingredient(ingredient, expected):
+    assert parse_ingredient(ingredient) == expected
+
+
+def test_tokenizer_equals_legacy_steps_on_test_cases():
+    # Steps 2–5 (color, modifiers, ge- prefix, cleanup) as in the per-call-regex version
+    for ingredient in TEST_CASES:
+        assert parse_ingredient(ingredient) == parse_ingredient_amount_grammar(ingredient), ingredient
+
+
+def test_tokenizer_equals_legacy_steps_on_corpus(corpus):
+    mismatches = [item for item in corpus if parse_ingredient(item) != parse_ingredient_amount_grammar(item)]
+    assert mismatches == []
+
+
+def test_legacy_differs_only_in_amount(corpus):
+    # Without a leading amount, the original implementation gives the same result
+    for item in corpus:
+        if not item.strip()[:1].isdigit() and item.strip()[:1] not in '½⅓¼¾':
+            assert parse_ingredient(item) == parse_ingredient_legacy(item), item
+
+
+def test_normalize_ingredient():
+    assert normalize_ingredient("1 rote paprika") == "paprika"
+    assert normalize_ingredient("10 g ingwer, frisch") == "ingwer"
+
+
+def test_parse_many_columns_equal_parse_ingredient():
+    series = pd.Series(list(TEST_CASES) + ["2-3 EL olivenöl", "1 Lorbeerblatt", "", None, "10 g ingwer, frisch"])
+    frame = parse_many(series).to_frame()
+    assert list(frame.columns) == ['base_name', 'quantity', 'unit', 'variant']
+    assert list(frame[['base_name', 'quantity', 'variant']].itertuples(index=False, name=None)) == \
+        [parse_ingredient(item) for item in series]
+    assert frame['unit'].tolist()[:3] == ['g', 'bund', '']
+    assert frame['unit'].tolist()[-5:] == ['el', '', '', '', 'g']
@@ -0,0 +1,76 @@
+"""Sparse recipe nutrient totals (RecipeWeightMatrix) vs. the old per-ingredient accumulation loop."""
+
+import numpy as np
+import pytest
+
+import recipe_nutrients
+from bls_loader import NutrientMatrix
+from recipe_nutrients import RecipeWeightMatrix
+
+
+@pytest.fixture(scope='module')
+def nutrient_matrix():
+    rng = np.random.default_rng(8)
+    values = (rng.random((60, 7)) * 100).astype(np.float32)
+    values[rng.random(values.shape) < 0.3] = 0.0
+    return NutrientMatrix(values, [f'Lebensmittel {i}' for i in range(60)], [f'N{j} [g/100g]' for j in range(7)])
+
+
+@pytest.fixture(scope='module')
+def entries():
+    rng = np.random.default_rng(9)
+    count = 400
+    # Repeated (recipe, food) pairs and recipes without any ingredient included
+    return list(zip(rng.integers(0, 45, count).tolist(), rng.integers(0, 60, count).tolist(),
+                    (rng.random(count) * 500).round(1).tolist()))
+
+
+def accumulate_per_ingredient(n_recipes, nutrient_matrix, entries):
+    """Reference: the old loop, one dict of running sums per recipe."""
+    columns = nutrient_matrix.columns
+    recipe_nutrients = [{} for _ in range(n_recipes)]
+    for recipe_idx, bls_row, weight in entries:
+        values = nutrient_matrix.row(bls_row) * weight / 100.0
+        for col, value in zip(columns, values.tolist()):
+            recipe_nutrients[recipe_idx][col] = recipe_nutrients[recipe_idx].get(col, 0) + value
+    return np.array([[nutrients.get(col, 0) for col in columns] for nutrients in recipe_nutrients])
+
+
+def build(n_recipes, nutrient_matrix, entries):
+    weights = RecipeWeightMatrix(n_recipes, nutrient_matrix)
+    ids = [weights.add(*entry) for entry in entries]
+    return weights, ids
+
+
+@pytest.mark.parametrize('use_scipy', [True, False])
+def test_totals_equal_per_ingredient_loop(nutrient_matrix, entries, use_scipy, monkeypatch):
+    if use_scipy and recipe_nutrients.sparse is None:
+        pytest.skip('scipy not installed')
+    if not use_scipy:
+        monkeypatch.setattr(recipe_nutrients, 'sparse', None)
+    weights, _ = build(50, nutrient_matrix, entries)
+    totals = weights.totals()
+    assert totals.shape == (50, 7) and totals.dtype == np.float64
+    np.testing.assert_allclose(totals, accumulate_per_ingredient(50, nutrient_matrix, entries), rtol=1e-5, atol=1e-4)
+    assert not totals[45:].any()
+
+
+def test_contributions_equal_rows(nutrient_matrix, entries):
+    weights, ids = build(50, nutrient_matrix, entries)
+    picked = ids[::7]
+    expected = [nutrient_matrix.row(entries[i][1]) * entries[i][2] / 100.0 for i in picked]
+    np.testing.assert_allclose(weights.contributions(picked), expected, rtol=1e-6)
+    assert weights.contributions([]).shape == (0, 7)
+
+
+def test_add_after_totals(nutrient_matrix, entries):
+    weights, _ = build(50, nutrient_matrix, entries[:100])
+    weights.totals()
+    for entry in entries[100:]:
+        weights.add(*entry)
+    np.testing.assert_allclose(weights.totals(), accumulate_per_ingredient(50, nutrient_matrix, entries),
+                               rtol=1e-5, atol=1e-4)
+
+
+def test_empty(nutrient_matrix):
+    assert RecipeWeightMatrix(3, nutrient_matrix).totals().tolist() == [[0.0] * 7] * 3
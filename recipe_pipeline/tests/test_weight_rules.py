@@ -0,0 +1,66 @@
+"""Table-driven weight rules (weight_rules.resolve_weights)."""
+
+import numpy as np
+import pytest
+
+from ingredient_parser import parse_recipe_ingredient
+from weight_rules import MULTIPLIERS, resolve_weight, resolve_weights
+
+
+@pytest.mark.parametrize('args, expected', [
+    (('Petersilie', 1, '', False), (10.0, 'default:petersilie')),
+    (('Salz', 1, '', False), (1.0, 'default')),
+    (('Weizenmehl', 1, 'kg'), (1000.0, 'unit:kg')),
+    (('Olivenöl', 2, 'EL'), (30.0, 'unit:el')),
+    (('Zucker', 1, 'Prise'), (0.5, 'unit:prise')),
+    (('Reis', 200), (200.0, 'grams')),
+    (('Zwiebeln', 2), (200.0, 'piece:zwiebel')),
+    (('Eier', 3), (165.0, 'piece:eier')),
+    (('Knoblauchzehen', 2), (8.0, 'piece:knoblauch')),
+    (('Eigelb', 2), (36.0, 'piece:eigelb')),
+    (('Reis', 2), (2.0, 'qty')),
+    # No amount: one piece for piece keys, fixed grams for herbs/spices
+    (('Zwiebel', 1, '', False), (100.0, 'piece:zwiebel')),
+    (('Ei', 1, '', False), (55.0, 'piece:ei')),
+    (('Avocado', 1, '', False), (180.0, 'piece:avocado')),
+    (('Knoblauch', 1, '', False), (4.0, 'default:knoblauch')),
+    (('Reis', 1, '', False), (1.0, 'default')),
+])
+def test_resolve_weight(args, expected):
+    assert resolve_weight(*args) == expected
+
+
+@pytest.mark.parametrize('name', ['Reis', 'Weizen', 'Kreis', 'Speise'])
+def test_short_keys_match_whole_words_only(name):
+    assert MULTIPLIERS.lookup(name) is None
+    assert resolve_weight(name, 3) == (3.0, 'qty')
+
+
+def test_longest_key_wins():
+    assert MULTIPLIERS.lookup('Eigelb') == 'eigelb'
+    assert MULTIPLIERS.lookup('1 Ei') == 'ei'
+    assert MULTIPLIERS.lookup('rote Zwiebeln') == 'zwiebel'
+
+
+def test_resolve_weights_equals_single_lookups():
+    names = ['Zwiebeln', 'Mehl', 'Petersilie', None, 'Eier', 'Milch']
+    qtys = [2, 500, 1, 1, 3, 0.25]
+    units = ['', 'g', '', '', None, 'l.']
+    has_qty = [True, True, False, True, True, True]
+    weights, rules = resolve_weights(names, qtys, units, has_qty)
+    singles = [resolve_weight(*args) for args in zip(names, qtys, units, has_qty)]
+    np.testing.assert_allclose(weights, [weight for weight, _ in singles])
+    assert rules == [rule for _, rule in singles]
+    assert rules[-1] == 'unit:l'
+
+
+@pytest.mark.parametrize('line, expected', [
+    ("Zwiebel", (100.0, 'piece:zwiebel')),
+    ("Ei", (55.0, 'piece:ei')),
+    ("Petersilie, frisch", (10.0, 'default:petersilie')),
+    ("Salz", (1.0, 'default')),
+])
+def test_parsed_lines_without_amount(line, expected):
+    name, qty, _, unit, has_qty = parse_recipe_ingredient(line)
+    assert has_qty is False
+    assert resolve_weight(name, qty, unit, has_qty) == expected
@@ -20,11 +20,26 @@ import pandas as pd
 import re
 from ingredient_mapping_config import MANUAL_INGREDIENT_MAP
 from recipe_config import BLS_DATABASE
-
-# Load BLS database
+from bls_loader import BLSFoods, load_bls
+
+# Nutrients shown for a valid mapping (label -> BLS column)
+SHOWN_NUTRIENTS = {
+    'Energy (kcal)': 'ENERCC Energie (Kilokalorien) [kcal/100g]',
+    'Protein': 'PROT625 Protein (Nx6,25) [g/100g]',
+    'Fat': 'FAT Fett [g/100g]',
+    'Carbs': 'CHO Kohlenhydrate, verfügbar [g/100g]',
+    'Fiber': 'FIBT Rohfaser [g/100g]',
+    'Lactose': 'LACS Lactose [g/100g]',
+    'Iron': 'FE Eisen [mg/100g]',
+    'Calcium': 'CA Calcium [mg/100g]',
+    'Vitamin C': 'VITC Vitamin C [mg/100g]',
+}
+
+# Load BLS database (only the columns shown below)
 print("Loading BLS database...")
 try:
-    bls_df = pd.read_csv(BLS_DATABASE, low_memory=False)
+    bls_df = load_bls(BLS_DATABASE, columns=list(SHOWN_NUTRIENTS.values()))
+    bls_foods = BLSFoods(bls_df)
     print(f"✓ Loaded {len(bls_df)} BLS entries\n")
 except FileNotFoundError:
     print("❌ Error: BLS_4_0_Daten_2025_DE.csv not found")
@@ -51,27 +66,14 @@ if ingredient_to_test in MANUAL_INGREDIENT_MAP:
     print(f"   Maps to: '{bls_entry}'")
 
     # Check if BLS entry exists
-    bls_match = bls_df[bls_df['Lebensmittelbezeichnung'] == bls_entry]
+    row = bls_foods.get_food(bls_entry)
 
-    if len(bls_match) > 0:
+    if row is not None:
         print(f"✅ BLS entry EXISTS in database")
-        row = bls_match.iloc[0]
 
         # Show key nutrients that will be used
         print(f"\n   Nutrients (per 100g):")
-        nutrients = {
-            'Energy (kcal)': 'ENERCC Energie (Kilokalorien) [kcal/100g]',
-            'Protein': 'PROT625 Protein (Nx6,25) [g/100g]',
-            'Fat': 'FAT Fett [g/100g]',
-            'Carbs': 'CHO Kohlenhydrate, verfügbar [g/100g]',
-            'Fiber': 'FIBT Rohfaser [g/100g]',
-            'Lactose': 'LACS Lactose [g/100g]',
-            'Iron': 'FE Eisen [mg/100g]',
-            'Calcium': 'CA Calcium [mg/100g]',
-            'Vitamin C': 'VITC Vitamin C [mg/100g]',
-        }
-
-        for nutrient_name, col in nutrients.items():
+        for nutrient_name, col in SHOWN_NUTRIENTS.items():
             if col in row.index:
                 value = row[col]
                 print(f"     • {nutrient_name}: {value}")
@@ -0,0 +1,138 @@
+"""
+Weight Rules
+============
+
+Table-driven ingredient weights (grams), replacing the copy-pasted
+get_weight() if-chains. Driven by recipe_config.py:
+
+  WEIGHT_DEFAULTS     herb/spice without amount ("Petersilie")  → fixed grams
+  UNIT_WEIGHTS        amount with a weight/volume/spoon unit      → qty × grams per unit
+  WEIGHT_MULTIPLIERS  piece counts ("2 Zwiebeln")                → qty × grams per piece
+
+Rules, first match wins (the rule name is recorded in the audit trail):
+
+  default:<key>             no amount, herb/spice: WEIGHT_DEFAULTS[key]
+  piece:<key>               no amount, piece key ("Zwiebel", "Ei"): 1 × WEIGHT_MULTIPLIERS[key]
+  default                   no amount, anything else: WEIGHT_DEFAULTS['default']
+  unit:<unit>               qty × UNIT_WEIGHTS[unit]
+  grams                     no unit, qty ≥ 10: qty is taken as grams
+  piece:<key>               qty × WEIGHT_MULTIPLIERS[key]
+  qty                       qty as grams
+
+Keyword lookup: compiled, case-insensitive; the longest matching key wins.
+Keys shorter than 4 characters only match whole words (with plural
+endings), so 'ei' matches "Ei"/"Eier" but not "Reis" or "Weizen".
+
+Usage:
+  weights, rules = resolve_weights(names, qtys, units, has_qty)   # arrays
+  weight, rule = resolve_weight('Zwiebeln', 2)                      # 200.0, 'piece:zwiebel'
+"""
+
+import hashlib
+import json
+import re
+from functools import lru_cache
+from typing import NamedTuple
+
+import numpy as np
+
+from recipe_config import UNIT_WEIGHTS, WEIGHT_DEFAULTS, WEIGHT_MULTIPLIERS
+
+SHORT_KEY_LENGTH = 4
+PLURAL_SUFFIX = '(?:e|n|en|er|s)?'
+
+
+class KeywordTable:
+    """key → value with longest-key-wins lookup over an ingredient name."""
+
+    def __init__(self, table):
+        self.table = {key.lower(): value for key, value in table.items() if key != 'default'}
+        self.keys = sorted(self.table, key=len, reverse=True)
+        parts = []
+        for i, key in enumerate(self.keys):
+            pattern = re.escape(key)
+            if len(key) < SHORT_KEY_LENGTH:
+                pattern = rf'\b{pattern}{PLURAL_SUFFIX}\b'
+            parts.append(f'(?P<k{i}>{pattern})')
+        # Zero-width lookahead at every position: finds keys at all start positions, even overlapping ones
+        self.regex = re.compile('(?=(?:' + '|'.join(parts) + '))', re.IGNORECASE)
+        self.lookup = lru_cache(maxsize=65536)(self._lookup)
+
+    def _lookup(self, name):
+        """Longest key found in name (None if no key matches)."""
+        best = None
+        for match in self.regex.finditer(name):
+            index = int(match.lastgroup[1:])
+            if best is None or index < best:  # keys are sorted longest first
+                best = index
+        return None if best is None else self.keys[best]
+
+
+DEFAULTS = KeywordTable(WEIGHT_DEFAULTS)
+MULTIPLIERS = KeywordTable(WEIGHT_MULTIPLIERS)
+
+# Fingerprint of the weight tables (audit_state.py recomputes everything when they change)
+WEIGHT_TABLES_SHA1 = hashlib.sha1(json.dumps(
+    [WEIGHT_DEFAULTS, WEIGHT_MULTIPLIERS, UNIT_WEIGHTS], sort_keys=True, ensure_ascii=False
+).encode('utf-8')).hexdigest()
+
+
+class WeightResolution(NamedTuple):
+    weights: np.ndarray  # grams (float)
+    rules: list          # rule name per ingredient
+
+
+def resolve_weights(names, qtys, units=None, has_qty=None) -> WeightResolution:
+    """
+    Weights for whole arrays of ingredients.
+
+    Args:
+        names: ingredient names
+        qtys: parsed quantities
+        units: units ('' / None = no unit), default: none
+        has_qty: False where the line had no amount at all, default: all True
+    """
+    names = [name if isinstance(name, str) else '' for name in names]
+    count = len(names)
+    qtys = np.asarray(qtys, dtype=float).reshape(count)
+    units = [''] * count if units is None else [(unit or '').lower().rstrip('.') for unit in units]
+    has_qty = np.ones(count, dtype=bool) if has_qty is None else np.asarray(has_qty, dtype=bool).reshape(count)
+
+    # Keyword lookups are cached per distinct name
+    default_keys = [DEFAULTS.lookup(name) for name in names]
+    piece_keys = [MULTIPLIERS.lookup(name) for name in names]
+    default_weights = np.array([DEFAULTS.table.get(key, WEIGHT_DEFAULTS['default']) for key in default_keys], dtype=float)
+    unit_factors = np.array([UNIT_WEIGHTS.get(unit, np.nan) for unit in units], dtype=float)
+    piece_factors = np.array([MULTIPLIERS.table.get(key, np.nan) for key in piece_keys], dtype=float)
+    no_unit = np.array([not unit for unit in units], dtype=bool)
+
+    has_default = np.array([key is not None for key in default_keys], dtype=bool)
+    has_piece = ~np.isnan(piece_factors)
+
+    # A line without amount is one piece ("Zwiebel" = 1 Zwiebel); herbs and spices keep their fixed grams
+    conditions = [~has_qty & has_default, ~has_qty & has_piece, ~has_qty,
+                  ~np.isnan(unit_factors), no_unit & (qtys >= 10), has_piece]
+    choices = [default_weights, piece_factors, default_weights,
+               qtys * unit_factors, qtys, qtys * piece_factors]
+    weights = np.select(conditions, choices, qtys)
+    chosen = np.select(conditions, [0, 3, 0, 1, 2, 3], 4).tolist()
+
+    rules = []
+    for rule, default_key, unit, piece_key in zip(chosen, default_keys, units, piece_keys):
+        if rule == 0:
+            rules.append('default' if default_key is None else f'default:{default_key}')
+        elif rule == 1:
+            rules.append(f'unit:{unit}')
+        elif rule == 2:
+            rules.append('grams')
+        elif rule == 3:
+            rules.append(f'piece:{piece_key}')
+        else:
+            rules.append('qty')
+    return WeightResolution(weights, rules)
+
+
+def resolve_weight(name, qty, unit='', has_qty=True):
+    """Single ingredient: (weight_g, rule)."""
+    resolution = resolve_weights([name], [qty], [unit], [has_qty])
+    return float(resolution.weights[0]), resolution.rules[0]
@@ -10,8 +10,11 @@ Identifies:
 
 import pandas as pd
 import json
+import os
 import sys
-from collections import Counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'recipe_pipeline'))
+from ingredient_parser import parse_many
 
 # ==========================================
 # 1. LOAD DATABASE
@@ -67,6 +70,10 @@ for idx, row in recipes_df.iterrows():
 print(f"Found {len(unmatched_ingredients)} unmatched ingredients")
 print(f"Found {len(weight_anomalies)} weight anomalies\n")
 
+# Normalize all unmatched strings (quantity/unit/modifiers removed; each distinct string parsed once)
+unmatched_df = pd.DataFrame(unmatched_ingredients, columns=['original', 'parsed_name', 'recipe_name', 'recipe_idx'])
+unmatched_df['base_name'] = parse_many(unmatched_df['original']).base_names
+
 # ==========================================
 # 3. PATTERN ANALYSIS - UNMATCHED
 # ==========================================
@@ -75,12 +82,11 @@ print("UNMATCHED INGREDIENTS ANALYSIS")
 print("=" * 80)
 
 # Find most common unmatched ingredient names
-unmatched_parsed = [ing['parsed_name'].lower() for ing in unmatched_ingredients]
-parsed_counts = Counter(unmatched_parsed)
+base_name_counts = unmatched_df.loc[unmatched_df['base_name'] != '', 'base_name'].value_counts()
 
 print(f"\nMost frequently unmatched ingredient names (top 20):")
 print("-" * 80)
-for ingredient, count in parsed_counts.most_common(20):
+for ingredient, count in base_name_counts.head(20).items():
     print(f"  {count:3d}x  {ingredient}")
 
 # Show some examples
@@ -94,7 +100,6 @@ for i, ing in enumerate(unmatched_ingredients[:50], 1):
 # ==========================================
 # 4. EXPORT UNMATCHED TO CSV
 # ==========================================
-unmatched_df = pd.DataFrame(unmatched_ingredients)
 unmatched_df.to_csv('unmatched_ingredients.csv', index=False, encoding='utf-8-sig')
 print(f"\n✓ Exported {len(unmatched_df)} unmatched ingredients to: unmatched_ingredients.csv")
 
@@ -131,7 +136,7 @@ print("=" * 80)
 
 print(f"\nUnmatched Ingredient Statistics:")
 print(f"  Total unmatched: {len(unmatched_ingredients)}")
-print(f"  Unique ingredient names: {len(set(ing['parsed_name'].lower() for ing in unmatched_ingredients))}")
+print(f"  Unique ingredient names: {len(base_name_counts)}")
 print(f"  Average unmatched per recipe: {len(unmatched_ingredients)/len(recipes_df):.1f}")
 
 # Recipes with most unmatched